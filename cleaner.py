@@ -1,121 +1,93 @@
 import os
-import shutil
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
 import ctypes
-from ctypes import wintypes
 import time
+import queue
+import itertools
+
+from cleaner_core import (
+    is_admin, format_size, ParallelSizer, TopK, ScanIndex, DirRollup,
+    WalkGuard, ScanProgress, expected_entries, record_entries, junk_targets, risk_tag, scan_junk, estimate_targets, format_estimate, iter_large_files, clean_path,
+    age_cutoff,
+)
+from cleaner_risk import LEVELS, load_risk_rules
+from cleaner_dupes import find_duplicates
+from cleaner_rules import load_rules
+from cleaner_store import ResultStore
+from cleaner_throttle import Throttle, system_monitor
+from cleaner_watch import LiveIndex
+from cleaner_snapshot import SnapshotWriter, diff_snapshots, snapshot_path, list_snapshots, prune_snapshots, rel_display
+from cleaner_trends import TrendIndex
+from cleaner_perf import PhaseTimer
+
+# 快速估算模式下每个垃圾目标的抽样时间 (秒)
+JUNK_ESTIMATE_BUDGET = 1.0
+
+# 大文件列表最多显示的行数，其余结果留在 ResultStore 里，排序/筛选后重新取前面这些
+LARGE_VIEW_LIMIT = 2000
 
 # ==========================================
-# Windows API 定义 (Shell & Kernel)
+# 后台线程 -> 界面 的结果通道
 # ==========================================
-# 1. 回收站相关
-FILEOP_FLAGS = wintypes.WORD
-class SHFILEOPSTRUCT(ctypes.Structure):
-    _pack_ = 8
-    _fields_ = [
-        ("hwnd", wintypes.HWND),
-        ("wFunc", wintypes.UINT),
-        ("pFrom", wintypes.LPCWSTR),
-        ("pTo", wintypes.LPCWSTR),
-        ("fFlags", FILEOP_FLAGS),
-        ("fAnyOperationsAborted", wintypes.BOOL),
-        ("hNameMappings", wintypes.LPVOID),
-        ("lpszProgressTitle", wintypes.LPCWSTR),
-    ]
-
-FO_DELETE = 3
-FOF_ALLOWUNDO = 0x40
-FOF_NOCONFIRMATION = 0x10
-FOF_NOERRORUI = 0x0400
-FOF_SILENT = 0x0004
-
-# 2. 内存相关
-class MEMORYSTATUSEX(ctypes.Structure):
-    _fields_ = [
-        ("dwLength", wintypes.DWORD),
-        ("dwMemoryLoad", wintypes.DWORD),
-        ("ullTotalPhys", ctypes.c_ulonglong),
-        ("ullAvailPhys", ctypes.c_ulonglong),
-        ("ullTotalPageFile", ctypes.c_ulonglong),
-        ("ullAvailPageFile", ctypes.c_ulonglong),
-        ("ullTotalVirtual", ctypes.c_ulonglong),
-        ("ullAvailVirtual", ctypes.c_ulonglong),
-        ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
-    ]
-    def __init__(self):
-        self.dwLength = ctypes.sizeof(self)
-
-# 3. CPU 相关
-class FILETIME(ctypes.Structure):
-    _fields_ = [("dwLowDateTime", wintypes.DWORD), ("dwHighDateTime", wintypes.DWORD)]
-
-def send_to_recycle_bin(path):
-    if not os.path.exists(path): return 0
-    pFrom = os.path.abspath(path) + "\0\0"
-    fileop = SHFILEOPSTRUCT()
-    fileop.wFunc = FO_DELETE
-    fileop.pFrom = pFrom
-    fileop.fFlags = FOF_ALLOWUNDO | FOF_NOCONFIRMATION | FOF_NOERRORUI | FOF_SILENT
-    result = ctypes.windll.shell32.SHFileOperationW(ctypes.byref(fileop))
-    return result == 0
-
-def is_admin():
-    try: return ctypes.windll.shell32.IsUserAnAdmin()
-    except: return False
-
-def format_size(size):
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size < 1024: return f"{size:.2f} {unit}"
-        size /= 1024
-    return f"{size:.2f} TB"
-
-# ==========================================
-# 系统监控类 (纯 WinAPI 实现，无需 psutil)
-# ==========================================
-class SystemMonitor:
-    def __init__(self):
-        self.last_idle = 0
-        self.last_kernel = 0
-        self.last_user = 0
-        
-    def get_memory_usage(self):
-        stat = MEMORYSTATUSEX()
-        ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat))
-        return stat.dwMemoryLoad
-
-    def get_cpu_usage(self):
-        idle = FILETIME()
-        kernel = FILETIME()
-        user = FILETIME()
-        ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user))
-        
-        def ft_to_int(ft):
-            return (ft.dwHighDateTime << 32) + ft.dwLowDateTime
-        
-        idle_time = ft_to_int(idle)
-        kernel_time = ft_to_int(kernel)
-        user_time = ft_to_int(user)
-        
-        if self.last_idle == 0:
-            self.last_idle = idle_time
-            self.last_kernel = kernel_time
-            self.last_user = user_time
-            return 0
-            
-        usr_diff = user_time - self.last_user
-        ker_diff = kernel_time - self.last_kernel
-        idle_diff = idle_time - self.last_idle
-        
-        sys_time = usr_diff + ker_diff
-        
-        self.last_idle = idle_time
-        self.last_kernel = kernel_time
-        self.last_user = user_time
-        
-        if sys_time == 0: return 0
-        return int((sys_time - idle_diff) * 100 / sys_time)
+class UiChannel:
+    """Tk 不是线程安全的，扫描/清理线程不能直接操作控件。
+    后台线程把界面操作放进队列，由主线程用 root.after 定时批量取出执行：
+    每轮最多占用 budget_ms 毫秒，剩下的留到下一轮，保证界面不卡；
+    状态栏文字和进度条只保留最新值，每轮最多刷新一次。
+    timer 为当前运行的 PhaseTimer 时，记下执行队列操作 (主要是 Treeview 插入/删除) 的实际耗时。"""
+
+    def __init__(self, root, interval_ms=50, budget_ms=30):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget = budget_ms / 1000
+        self.ops = queue.Queue()
+        self.ids = itertools.count()
+        self.lock = threading.Lock()
+        self.pending_status = None
+        self.pending_progress = None
+        self.lbl_status = None
+        self.progress = None
+        self.timer = None
+        self.root.after(self.interval_ms, self._drain)
+
+    def bind(self, lbl_status, progress):
+        self.lbl_status = lbl_status
+        self.progress = progress
+
+    def call(self, fn, *args, **kwargs):
+        self.ops.put((fn, args, kwargs))
+
+    def insert(self, tree, values, tags=(), parent="", **options):
+        """插入一行并立即返回行 id (预先分配)，后台线程可以马上用它删除/移动该行或作为父节点。"""
+        iid = f"r{next(self.ids)}"
+        self.ops.put((tree.insert, (parent, "end"), dict(options, iid=iid, values=values, tags=tags)))
+        return iid
+
+    def status(self, text):
+        with self.lock: self.pending_status = text
+
+    def set_progress(self, value):
+        with self.lock: self.pending_progress = value
+
+    def _drain(self):
+        # 先刷新状态/进度，再执行队列：收尾操作 (finish_scan 等) 排在后面，能覆盖扫描中的状态文字
+        with self.lock:
+            text, value = self.pending_status, self.pending_progress
+            self.pending_status = self.pending_progress = None
+        if text is not None: self.lbl_status.config(text=text)
+        if value is not None: self.progress['value'] = value
+        timer = self.timer; n = 0
+        t0 = time.perf_counter(); deadline = t0 + self.budget
+        while time.perf_counter() < deadline:
+            try: fn, args, kwargs = self.ops.get_nowait()
+            except queue.Empty: break
+            try: fn(*args, **kwargs)
+            except tk.TclError: pass  # 行已被删除等
+            n += 1
+        if timer and n: timer.add("treeview", time.perf_counter() - t0, n)
+        self.root.after(self.interval_ms, self._drain)
 
 # ==========================================
 # 主程序逻辑
@@ -134,9 +106,23 @@ class MonitorCleanerApp:
         self.enable_backup_var = tk.IntVar(value=0)
         self.is_working = False
         self.stop_event = False
-        self.sys_mon = SystemMonitor()
+        self.use_index_var = tk.IntVar(value=0)
+        self.sys_mon = system_monitor()
+        self.throttle_var = tk.IntVar(value=0)
+        self.max_cpu_var = tk.StringVar(value="70")
+        self.index = None
+        self.throttle = None
+        self.profile_var = tk.IntVar(value=0)
+        self.timer = None
+        self.junk_files = {}  # 垃圾目标路径 -> 按闲置天数筛出的删除范围 (None 为整个目录)
+        self.junk_rows = {}   # 规范化路径 -> (列表行 iid, 原始路径, 最少闲置天数)，实时监视据此更新
+        self.junk_sizes = {}  # 原始路径 -> 可清理字节数，仪表盘显示其合计
+        self.watch_var = tk.IntVar(value=0)
+        self.live = None
+        self.ui = UiChannel(self.root)
 
         self.setup_ui()
+        self.ui.bind(self.lbl_status, self.progress)
         
         # 启动定时器刷新系统状态
         self.update_system_stats()
@@ -164,6 +150,19 @@ class MonitorCleanerApp:
         self.lbl_mem = tk.Label(mem_frame, text="0%", width=5)
         self.lbl_mem.pack(side="left")
 
+        # 低负载模式：扫描/清理线程按 CPU、内存、I/O 读数自动降速
+        thr_frame = tk.Frame(dash_frame)
+        thr_frame.pack(side="left", padx=10)
+        tk.Checkbutton(thr_frame, text="低负载模式", variable=self.throttle_var).pack(side="left")
+        tk.Label(thr_frame, text="CPU上限%:").pack(side="left")
+        tk.Entry(thr_frame, textvariable=self.max_cpu_var, width=4).pack(side="left")
+        # 各阶段耗时总是记录；勾选后另用 cProfile/tracemalloc 做详细分析 (会拖慢扫描)
+        tk.Checkbutton(thr_frame, text="性能分析", variable=self.profile_var).pack(side="left", padx=(5, 0))
+
+        # 垃圾扫描结果的合计，实时监视开启时随目录变化更新
+        self.lbl_reclaim = tk.Label(dash_frame, text="可清理: -", font=("Arial", 9, "bold"))
+        self.lbl_reclaim.pack(side="left", padx=10)
+
         # --- 1. 备份设置 ---
         bk_frame = tk.LabelFrame(self.root, text="🛡️ 安全备份设置", padx=10, pady=5)
         bk_frame.pack(fill="x", padx=10, pady=5)
@@ -186,6 +185,18 @@ class MonitorCleanerApp:
         self.notebook.add(self.tab_large, text="   🐘 大文件搜索   ")
         self.setup_large_tab()
 
+        self.tab_space = tk.Frame(self.notebook)
+        self.notebook.add(self.tab_space, text="   📁 空间分布   ")
+        self.setup_space_tab()
+
+        self.tab_dupe = tk.Frame(self.notebook)
+        self.notebook.add(self.tab_dupe, text="   🧬 重复文件   ")
+        self.setup_dupe_tab()
+
+        self.tab_trend = tk.Frame(self.notebook)
+        self.notebook.add(self.tab_trend, text="   📈 增长趋势   ")
+        self.setup_trend_tab()
+
         # --- 3. 底部进度 ---
         self.progress = ttk.Progressbar(self.root, orient="horizontal", mode="determinate")
         self.progress.pack(fill="x", padx=10, pady=5)
@@ -221,6 +232,26 @@ class MonitorCleanerApp:
         # 1000ms 后再次调用
         self.root.after(1000, self.update_system_stats)
 
+    def make_throttle(self):
+        """低负载模式开启时为本次扫描/清理新建一个 Throttle，否则返回 None"""
+        if not self.throttle_var.get(): return None
+        try: max_cpu = max(5, min(100, int(self.max_cpu_var.get())))
+        except ValueError: max_cpu = 70
+        return Throttle(max_cpu=max_cpu)
+
+    def make_timer(self, run):
+        """为本次运行新建 PhaseTimer (在主线程读取"性能分析"开关)；由后台线程 start()，Tk 线程的列表插入时间一并记入"""
+        timer = PhaseTimer(run, bool(self.profile_var.get()))
+        self.ui.timer = timer
+        return timer
+
+    def report_timing(self, timer):
+        """排在本次运行的界面操作之后执行：写出 JSON 报告，并把各阶段耗时附在状态栏文字后面"""
+        if self.ui.timer is timer: self.ui.timer = None
+        try: timer.dump()
+        except OSError: pass
+        self.lbl_status.config(text=f"{self.lbl_status.cget('text')}；{timer.summary()}")
+
     def toggle_backup_ui(self):
         state = "normal" if self.enable_backup_var.get() else "disabled"
         self.entry_backup.config(state=state)
@@ -247,8 +278,9 @@ class MonitorCleanerApp:
         if tree:
             selected = tree.selection()
             if selected:
-                vals = tree.item(selected[0])['values']
-                path = vals[3]
+                # 空间分布树的行 id 就是目录路径
+                if tree is self.tree_space: path = selected[0]
+                else: path = tree.item(selected[0])['values'][3]
                 if os.path.isfile(path): path = os.path.dirname(path)
                 if os.path.exists(path): os.startfile(path)
 
@@ -259,6 +291,7 @@ class MonitorCleanerApp:
             if col == "#1":
                 item = tree.identify_row(event.y)
                 val = tree.item(item)['values']
+                if not val or val[0] not in ("☐", "☑"): return  # 分组行没有勾选框
                 new_mark = "☑" if val[0] == "☐" else "☐"
                 new_vals = list(val)
                 new_vals[0] = new_mark
@@ -275,14 +308,20 @@ class MonitorCleanerApp:
         self.btn_stop_junk.pack(side="left", padx=5)
         self.btn_clean_junk = tk.Button(af, text="🗑️ 清理选中", command=self.start_junk_clean, state="disabled", bg="#d32f2f", fg="white", padx=15)
         self.btn_clean_junk.pack(side="left", padx=20)
+        tk.Checkbutton(af, text="增量索引 (跳过未变化目录)", variable=self.use_index_var).pack(side="left")
+        self.estimate_var = tk.IntVar(value=0)
+        tk.Checkbutton(af, text="快速估算 (先抽样，再后台精确统计)", variable=self.estimate_var).pack(side="left")
+        tk.Checkbutton(af, text="实时监视", variable=self.watch_var, command=self.toggle_watch).pack(side="left")
 
-        cols = ("check", "risk", "category", "path", "size", "status")
+        cols = ("check", "risk", "category", "path", "size", "unique", "status")
         self.tree_junk = ttk.Treeview(self.tab_clean, columns=cols, show="headings")
         self.tree_junk.heading("check", text="选"); self.tree_junk.column("check", width=40, anchor="center")
         self.tree_junk.heading("risk", text="风险"); self.tree_junk.column("risk", width=80, anchor="center")
         self.tree_junk.heading("category", text="分类"); self.tree_junk.column("category", width=80, anchor="center")
         self.tree_junk.heading("path", text="路径"); self.tree_junk.column("path", width=450)
         self.tree_junk.heading("size", text="占用"); self.tree_junk.column("size", width=80, anchor="e")
+        # 硬链接只算一次后的实际占用，才是清理后真正能腾出的空间
+        self.tree_junk.heading("unique", text="实际占用"); self.tree_junk.column("unique", width=80, anchor="e")
         self.tree_junk.heading("status", text="状态"); self.tree_junk.column("status", width=80, anchor="center")
         
         self.tree_junk.tag_configure('safe', foreground='#2E7D32')
@@ -299,40 +338,135 @@ class MonitorCleanerApp:
 
     def start_junk_scan(self):
         if self.is_working: return
-        self.is_working = True; self.stop_event = False
+        self.is_working = True; self.stop_event = False; self.throttle = self.make_throttle(); self.timer = self.make_timer("junk")
         self.btn_scan_junk.config(state="disabled"); self.btn_stop_junk.config(state="normal"); self.btn_clean_junk.config(state="disabled")
-        threading.Thread(target=self.run_junk_scan, daemon=True).start()
-
-    def run_junk_scan(self):
+        self.stop_watch()
         for item in self.tree_junk.get_children(): self.tree_junk.delete(item)
+        self.junk_files = {}; self.junk_rows = {}; self.junk_sizes = {}
         self.progress['value'] = 0
-        local_app = os.environ.get('LOCALAPPDATA', '')
-        targets = [
-            ("开发工具", "Pip 缓存", os.path.join(local_app, "pip", "Cache"), True, "🟢 低"),
-            ("开发工具", "uv 缓存", os.path.join(local_app, "uv", "cache"), True, "🟢 低"),
-            ("系统", "系统临时", os.path.join(os.environ['WINDIR'], 'Temp'), True, "🟢 低"),
-            ("系统", "用户临时", os.environ.get('TEMP'), True, "🟢 低"),
-            ("系统", "错误报告", os.path.join(os.environ['ProgramData'], 'Microsoft/Windows/WER'), True, "🟢 低"),
-            ("浏览器", "Chrome缓存", os.path.join(local_app, r"Google\Chrome\User Data\Default\Cache\Cache_Data"), True, "🟢 低"),
-            ("浏览器", "Edge缓存", os.path.join(local_app, r"Microsoft\Edge\User Data\Default\Cache\Cache_Data"), True, "🟢 低"),
-            ("系统风险", "Win更新包", os.path.join(os.environ['WINDIR'], 'SoftwareDistribution', 'Download'), False, "🟡 中"),
-            ("系统风险", "预读取", os.path.join(os.environ['WINDIR'], 'Prefetch'), False, "🟡 中"),
-        ]
+        threading.Thread(target=self.run_junk_scan, args=(self.use_index_var.get(), self.estimate_var.get()), daemon=True).start()
+
+    def get_scan_index(self):
+        if self.index is None: self.index = ScanIndex()
+        return self.index
+
+    def run_junk_scan(self, use_index=False, estimate=False):
+        timer = self.timer.start()
+        targets = junk_targets()
+        idx = self.get_scan_index() if use_index else None
         total = 0
-        for i, (cat, name, path, df, risk) in enumerate(targets):
-            if self.stop_event: break
-            self.lbl_status.config(text=f"扫描中: {name}")
-            if path and os.path.exists(path):
-                sz = self.get_folder_size(path)
-                if sz > 0:
-                    tag = 'safe'
-                    if "高" in risk: tag='danger'
-                    elif "中" in risk: tag='warn'
-                    self.tree_junk.insert("", "end", values=("☑" if df else "☐", risk, cat, path, format_size(sz), "待清理"), tags=(tag,))
-                    total += sz
-            self.progress['value'] = (i+1)/len(targets)*100
-        
-        self.finish_scan(f"扫描完成，发现 {format_size(total)}", self.btn_scan_junk, self.btn_stop_junk, self.btn_clean_junk)
+        guard = WalkGuard()
+        rows = {}  # 估算模式下 路径 -> 已显示的估算行，精确统计完成后原地更新
+        if estimate:
+            self.ui.status(f"快速估算: 共 {len(targets)} 个目标")
+            est_total = 0
+            with timer.phase("estimate", len(targets)):
+                for (cat, name, path, df, risk, days), est in estimate_targets(targets, JUNK_ESTIMATE_BUDGET, lambda: self.stop_event, timer=timer):
+                    if est.size <= 0 or self.stop_event: continue
+                    rows[path] = self.ui.insert(self.tree_junk, ("☑" if df else "☐", risk, cat, path, format_estimate(est), "-", "估算"), (risk_tag(risk),))
+                    est_total += est.size
+            if self.stop_event:
+                timer.stop()
+                self.ui.call(self.disable_estimates, rows)
+                self.ui.call(self.finish_scan, "", self.btn_scan_junk, self.btn_stop_junk, self.btn_clean_junk)
+                self.ui.call(self.report_timing, timer); return
+            self.ui.status(f"估算约 {format_size(est_total)}，正在精确统计 (可随时停止，保留估算值)...")
+        else:
+            self.ui.status(f"扫描中: 共 {len(targets)} 个目标")
+        failed = []
+
+        def on_error(target, exc):
+            # 统计出错的目标不能当作 0 字节：保留估算行并标明失败，没有估算行时新增一行
+            path = target[2]; failed.append(target[1])
+            # 没有删除范围，取消勾选以免清理时整个目录被清空
+            if path in rows: self.ui.call(self.update_junk_row, rows[path], "-", "-", f"统计失败: {exc}", "☐")
+            else: rows[path] = self.ui.insert(self.tree_junk, ("☐", target[4], target[0], path, "-", "-", f"统计失败: {exc}"), (risk_tag(target[4]),))
+
+        for i, ((cat, name, path, df, risk, days), sz, uniq, files) in enumerate(scan_junk(targets, idx, lambda: self.stop_event, guard=guard, throttle=self.throttle, timer=timer, on_error=on_error)):
+            # 停止后的结果只是部分统计，不再入列
+            if sz > 0 and not self.stop_event:
+                uniq_text = "-" if uniq is None else format_size(uniq)
+                # 带闲置天数的目标大小只含过期文件，清理时也只删这些
+                self.junk_files[path] = files
+                status = f"待清理 (闲置≥{days}天)" if days else "待清理"
+                if path in rows: self.ui.call(self.update_junk_row, rows[path], format_size(sz), uniq_text, status)
+                else: rows[path] = self.ui.insert(self.tree_junk, ("☑" if df else "☐", risk, cat, path, format_size(sz), uniq_text, status), (risk_tag(risk),))
+                self.junk_rows[os.path.normpath(os.path.abspath(path))] = (rows[path], path, days)
+                # 状态栏合计和"可清理"看板用同一个口径 (逻辑大小)：实时监视从索引更新时也只有这个值
+                self.junk_sizes[path] = sz
+                total += sz
+            elif sz <= 0 and path in rows and not self.stop_event:
+                self.ui.call(self.tree_junk.delete, rows[path])
+            self.ui.status(f"已完成: {name} ({i+1}/{len(targets)})")
+            self.ui.set_progress((i+1)/len(targets)*100)
+
+        msg = f"扫描完成，发现 {format_size(total)}"
+        if failed: msg += f"；{len(failed)} 个目标统计失败: {', '.join(failed)}"
+        if guard.summary(): msg += f"；{guard.summary()}"
+        if self.throttle and self.throttle.summary(): msg += f"；{self.throttle.summary()}"
+        timer.count("targets", len(targets)); timer.count("found", len(rows))
+        timer.stop()
+        if self.stop_event: self.ui.call(self.disable_estimates, rows)
+        self.ui.call(self.finish_scan, msg, self.btn_scan_junk, self.btn_stop_junk, self.btn_clean_junk)
+        self.ui.call(self.report_timing, timer)
+        self.ui.call(self.update_reclaim)
+        if not self.stop_event: self.ui.call(self.start_watch)
+
+    def disable_estimates(self, rows):
+        # 停止时还没精确统计的估算行没有删除范围 (带闲置天数的目标会被整个清空)，取消勾选并标明；清理时另有拦截
+        for path, iid in rows.items():
+            if path in self.junk_files or not self.tree_junk.exists(iid): continue
+            vals = list(self.tree_junk.item(iid)['values'])
+            if vals[6] != "估算": continue
+            vals[0] = "☐"; vals[6] = "估算 (未统计完，不可清理)"
+            self.tree_junk.item(iid, values=vals)
+
+    def update_reclaim(self):
+        text = f"可清理: {format_size(sum(self.junk_sizes.values()))}" if self.junk_sizes else "可清理: -"
+        if self.live: text += " (实时)"
+        self.lbl_reclaim.config(text=text)
+
+    # ---------------- 实时监视 ----------------
+    def toggle_watch(self):
+        if self.watch_var.get(): self.start_watch()
+        else: self.stop_watch()
+
+    def start_watch(self):
+        """监视已扫描出的垃圾目标；首次同步索引在后台线程里做 (已索引的目录只是增量核对)"""
+        if not self.watch_var.get() or self.live or not self.junk_rows: return
+        self.live = LiveIndex(self.get_scan_index(), self.on_live_update)
+        live = self.live
+        threading.Thread(target=live.start, args=(list(self.junk_rows), lambda: self.live is not live), daemon=True).start()
+        self.update_reclaim()
+
+    def stop_watch(self):
+        if self.live:
+            live, self.live = self.live, None
+            threading.Thread(target=live.stop, daemon=True).start()
+            self.update_reclaim()
+
+    def on_live_update(self, root, total):
+        # 监视线程里执行：带闲置天数的目标按索引里的 touched 时间重新筛选，和扫描时的口径一致
+        row = self.junk_rows.get(root)
+        if row is None: return
+        iid, path, days = row
+        if days:
+            files = self.get_scan_index().stale_files(root, age_cutoff(days))
+            total = sum(size for _, size in files); self.junk_files[path] = [p for p, _ in files]
+        if self.junk_sizes.get(path) == total: return
+        self.junk_sizes[path] = total
+        status = f"实时 (闲置≥{days}天)" if days else "实时"
+        # 索引不记录文件号，变化后的实际占用无法去重，显示为 "-"
+        self.ui.call(self.update_junk_row, iid, format_size(total), "-", status)
+        self.ui.call(self.update_reclaim)
+
+    def update_junk_row(self, iid, size_text, uniq_text, status, check=None):
+        # 只替换大小和状态列，保留用户在估算阶段改过的勾选 (check 不为 None 时强制设置)
+        if not self.tree_junk.exists(iid): return
+        vals = list(self.tree_junk.item(iid)['values'])
+        vals[4] = size_text; vals[5] = uniq_text; vals[6] = status
+        if check is not None: vals[0] = check
+        self.tree_junk.item(iid, values=vals)
 
     # ================= 大文件搜索逻辑 =================
     def setup_large_tab(self):
@@ -340,6 +474,8 @@ class MonitorCleanerApp:
         cf.pack(fill="x")
         tk.Label(cf, text="最小(MB):").pack(side="left")
         self.entry_size = tk.Entry(cf, width=6); self.entry_size.insert(0, "100"); self.entry_size.pack(side="left")
+        tk.Label(cf, text="前N(0=全部):").pack(side="left")
+        self.entry_topk = tk.Entry(cf, width=5); self.entry_topk.insert(0, "0"); self.entry_topk.pack(side="left")
         tk.Label(cf, text="路径:").pack(side="left")
         self.entry_path = tk.Entry(cf, width=25); self.entry_path.insert(0, os.path.expanduser("~")); self.entry_path.pack(side="left")
         tk.Button(cf, text="...", command=lambda: self.select_search_path(), width=3).pack(side="left")
@@ -349,15 +485,26 @@ class MonitorCleanerApp:
         self.btn_stop_large.pack(side="left", padx=5)
         self.btn_clean_large = tk.Button(cf, text="🗑️ 删除", command=self.start_large_clean, state="disabled", bg="#d32f2f", fg="white", padx=10)
         self.btn_clean_large.pack(side="left")
+        tk.Checkbutton(cf, text="增量索引", variable=self.use_index_var).pack(side="left", padx=5)
+        tk.Label(cf, text="筛选:").pack(side="left")
+        self.entry_large_filter = tk.Entry(cf, width=10); self.entry_large_filter.pack(side="left")
+        self.entry_large_filter.bind("<Return>", lambda e: self.filter_large())
 
-        cols = ("check", "risk", "name", "path", "size", "type")
+        cols = ("check", "risk", "name", "path", "size", "alloc", "type")
         self.tree_large = ttk.Treeview(self.tab_large, columns=cols, show="headings")
         self.tree_large.heading("check", text="选"); self.tree_large.column("check", width=40, anchor="center")
         self.tree_large.heading("risk", text="风险"); self.tree_large.column("risk", width=80, anchor="center")
         self.tree_large.heading("name", text="文件名"); self.tree_large.column("name", width=150)
         self.tree_large.heading("path", text="完整路径"); self.tree_large.column("path", width=400)
         self.tree_large.heading("size", text="大小"); self.tree_large.column("size", width=80, anchor="e")
+        # 稀疏/压缩文件的逻辑大小会夸大占用，阈值和排序都按实际分配的磁盘空间
+        self.tree_large.heading("alloc", text="占用空间"); self.tree_large.column("alloc", width=80, anchor="e")
         self.tree_large.heading("type", text="类型"); self.tree_large.column("type", width=60, anchor="center")
+        # 点击表头按该列排序 (再点一次反向)，排序在 ResultStore 的列上做，不解析界面文字
+        for col, key in (("risk", "risk"), ("name", "name"), ("path", "path"), ("size", "size"), ("alloc", "alloc"), ("type", "ext")):
+            self.tree_large.heading(col, command=lambda k=key: self.sort_large(k))
+        self.large_store = ResultStore()
+        self.large_sort = ("alloc", True)
         
         self.tree_large.tag_configure('safe', foreground='#2E7D32')
         self.tree_large.tag_configure('warn', foreground='#E65100')
@@ -376,42 +523,333 @@ class MonitorCleanerApp:
 
     def start_large_scan(self):
         if self.is_working: return
-        try: limit = float(self.entry_size.get())
+        try: limit = float(self.entry_size.get()); top_n = int(self.entry_topk.get() or 0)
         except: return
         path = self.entry_path.get()
-        self.is_working = True; self.stop_event = False
+        self.is_working = True; self.stop_event = False; self.throttle = self.make_throttle(); self.timer = self.make_timer("large")
         self.btn_scan_large.config(state="disabled"); self.btn_stop_large.config(state="normal"); self.btn_clean_large.config(state="disabled")
-        threading.Thread(target=self.run_large_scan, args=(path, limit), daemon=True).start()
-
-    def run_large_scan(self, start_path, limit_mb):
         for item in self.tree_large.get_children(): self.tree_large.delete(item)
-        self.progress['value'] = 0; self.progress.configure(mode='indeterminate'); self.progress.start(10)
+        # 知道大概有多少条目 (上次扫描记录或卷的已用 inode 数) 时显示真实百分比，否则来回滚动
+        use_index = self.use_index_var.get()
+        expected = None if use_index else expected_entries(path)
+        self.progress['value'] = 0
+        if not expected: self.progress.configure(mode='indeterminate'); self.progress.start(10)
+        threading.Thread(target=self.run_large_scan, args=(path, limit, use_index, top_n, expected), daemon=True).start()
+
+    def report_progress(self, p):
+        # 在遍历线程里回调，只写 UiChannel 的最新值槽
+        self.ui.status(p.text())
+        if p.fraction() is not None: self.ui.set_progress(p.fraction() * 100)
+
+    def run_large_scan(self, start_path, limit_mb, use_index=False, top_n=0, expected=None):
+        timer = self.timer.start()
+        clock = time.perf_counter
         limit_b = limit_mb * 1024 * 1024
         count = 0
-        
+        progress = ScanProgress(expected, self.report_progress)
+        # 前 N 模式：堆里只留最大的 N 个，被挤出的行随即从列表删除
+        top = TopK(top_n) if top_n > 0 else None
+        rows = {}  # 前 N 模式下 路径 -> (列表行 id, 逻辑大小, 修改时间, 风险等级)，随堆一起增删
+        # 全部结果存进列式存储 (前 N 模式等遍历结束按最终名单写入，内存随 N 而不随入堆次数增长)；
+        # 扫描中列表只实时显示前 LARGE_VIEW_LIMIT 个，结束后按排序重新显示
+        store = ResultStore()
+        # 同一遍遍历顺带统计目录空间分布，扫描结束后显示在"空间分布"页
+        rollup = DirRollup(start_path)
+        # 每次扫描重新读取规则文件，修改后无需重启
+        prune = load_rules()
+        classifier = load_risk_rules()
+        guard = WalkGuard()
+        # 所有文件写进快照，下次扫描同一路径时可以看出哪些目录在增长
+        snap = SnapshotWriter(snapshot_path(start_path), start_path)
+
         try:
-            for root, dirs, files in os.walk(start_path):
+            idx = None
+            if use_index:
+                self.ui.status("正在更新索引...")
+                idx = self.get_scan_index()
+            for fp, sz, alloc, mtime in iter_large_files(start_path, limit_b, idx, lambda: self.stop_event, top_n, rollup, prune, guard,
+                                                  self.throttle, progress, snap, timer):
                 if self.stop_event: break
-                if "Windows" in root and "WinSxS" in root: continue
-                for name in files:
-                    if self.stop_event: break
-                    try:
-                        fp = os.path.join(root, name)
-                        sz = os.path.getsize(fp)
-                        if sz > limit_b:
-                            ext = os.path.splitext(name)[1].lower()
-                            risk = "🟢 低"
-                            tag = 'safe'
-                            if r"c:\windows" in fp.lower() or ext in ['.sys','.dll','.exe','.vhdx']: risk="🔴 高"; tag='danger'
-                            elif ext in ['.msi','.iso','.wim']: risk="🟡 中"; tag='warn'
-                            
-                            self.tree_large.insert("", "end", values=("☐", risk, name, fp, format_size(sz), ext), tags=(tag,))
-                            count += 1
-                    except: pass
-        except: pass
-        
+                if top:
+                    kept, out = top.push(alloc, fp)
+                    if not kept: continue
+                    if out is not None: self.ui.call(self.tree_large.delete, rows.pop(out)[0])
+                t = clock(); level = classifier.level(fp); timer.add("classify", clock() - t)
+                if not top:
+                    t = clock(); store.add(fp, sz, alloc, mtime, level); timer.add("store", clock() - t)
+                count += 1
+                if top or count <= LARGE_VIEW_LIMIT:
+                    name = os.path.basename(fp)
+                    ext = os.path.splitext(name)[1].lower()
+                    risk, tag = LEVELS[level]
+                    iid = self.ui.insert(self.tree_large, ("☐", risk, name, fp, format_size(sz), format_size(alloc), ext), (tag,))
+                    if top: rows[fp] = (iid, sz, mtime, level)
+            error = None
+        except Exception as e:
+            # 出错中断的扫描和停止一样只是部分结果：不记条目数、不存快照，状态栏说明原因
+            error = e
+        if top:
+            # 堆里剩下的就是最终名单 (停止或出错时为目前为止最大的 N 个)
+            t = clock()
+            for alloc, fp in top.items():
+                if fp not in rows: continue   # 出错时刚入堆、还没显示的那个
+                _, sz, mtime, level = rows[fp]
+                store.add(fp, sz, alloc, mtime, level)
+            timer.add("store", clock() - t)
+            count = len(rows)
+
+        complete = not self.stop_event and error is None
+        self.ui.call(self.show_large_results, store)
+        if complete: self.ui.call(self.show_rollup, rollup.finish())
+        # 完整遍历的条目数留给下次估计进度
+        if complete and not use_index and progress.done: record_entries(start_path, progress.done)
+        with timer.phase("snapshot", 0): change = self.save_snapshot(snap, start_path, complete)
+        self.ui.call(self.end_indeterminate)
+        msg = f"扫描出错，结果不完整 ({error})，找到 {count} 个文件" if error else f"扫描完成，找到 {count} 个文件"
+        if progress.done: msg += f" (共扫描 {progress.done} 项，{progress.rate():.0f} 项/秒)"
+        if count > LARGE_VIEW_LIMIT: msg += f" (列表显示前 {LARGE_VIEW_LIMIT} 个)"
+        if prune.summary(): msg += f"；{prune.summary()}"
+        if guard.summary(): msg += f"；{guard.summary()}"
+        if self.throttle and self.throttle.summary(): msg += f"；{self.throttle.summary()}"
+        if change: msg += f"；{change}"
+        timer.count("entries", progress.done); timer.count("found", count)
+        timer.stop()
+        self.ui.call(self.finish_scan, msg, self.btn_scan_large, self.btn_stop_large, self.btn_clean_large)
+        self.ui.call(self.report_timing, timer)
+
+    def save_snapshot(self, snap, root, complete=True):
+        """完整扫描才保存快照；与同一路径的上一次快照比较，返回如 "比上次 +1.20 GB，增长最多: ..." 的说明"""
+        if not complete:
+            snap.abort(); return ""
+        try:
+            previous = list_snapshots(root)
+            snap.close(); prune_snapshots(root)
+            if not previous: return ""
+            self.ui.status("正在与上次扫描比较...")
+            d = diff_snapshots(previous[-1], snap.path)
+        except (OSError, ValueError):
+            return ""
+        signed = lambda v: ("+" if v >= 0 else "-") + format_size(abs(v))
+        text = f"比上次 {signed(d.new_total - d.old_total)}"
+        grown = d.top(3)
+        if grown: text += "，增长最多: " + ", ".join(f"{rel_display(k)} ({signed(n - o)})" for k, o, n in grown)
+        return text
+
+    def show_large_results(self, store):
+        self.large_store = store
+        self.large_sort = ("alloc", True)
+        self.render_large()
+
+    def render_large(self):
+        """按当前排序和筛选，从 ResultStore 取前 LARGE_VIEW_LIMIT 行重新填充列表；已勾选的行保持勾选"""
+        st = self.large_store
+        checked = {i for i in self.tree_large.get_children() if self.tree_large.item(i)['values'][0] == "☑"}
+        self.tree_large.delete(*self.tree_large.get_children())
+        rows = st.filter(name=self.entry_large_filter.get().strip())
+        key, reverse = self.large_sort
+        for r in st.sorted_rows(key, reverse, LARGE_VIEW_LIMIT, rows):
+            iid = f"s{r}"
+            risk, tag = LEVELS[st.risk[r]]
+            self.tree_large.insert("", "end", iid=iid, tags=(tag,), values=(
+                "☑" if iid in checked else "☐", risk, st.name[r], st.path(r),
+                format_size(st.size[r]), format_size(st.alloc[r]), st.ext(r)))
+        return len(rows)
+
+    def sort_large(self, key):
+        if self.is_working: return
+        old_key, reverse = self.large_sort
+        # 同一列再点一次反向；数值列首次点击从大到小，文字列从小到大
+        self.large_sort = (key, not reverse) if key == old_key else (key, key in ("size", "alloc", "risk", "mtime"))
+        total = self.render_large()
+        if total > LARGE_VIEW_LIMIT: self.lbl_status.config(text=f"共 {total} 个文件，列表显示前 {LARGE_VIEW_LIMIT} 个")
+
+    def filter_large(self):
+        if self.is_working: return
+        total = self.render_large()
+        msg = f"筛选出 {total} 个文件"
+        if total > LARGE_VIEW_LIMIT: msg += f"，列表显示前 {LARGE_VIEW_LIMIT} 个"
+        self.lbl_status.config(text=msg)
+
+    # ================= 重复文件 =================
+    def setup_dupe_tab(self):
+        cf = tk.Frame(self.tab_dupe, pady=5)
+        cf.pack(fill="x")
+        tk.Label(cf, text="最小(MB):").pack(side="left")
+        self.entry_dupe_size = tk.Entry(cf, width=6); self.entry_dupe_size.insert(0, "1"); self.entry_dupe_size.pack(side="left")
+        tk.Label(cf, text="路径:").pack(side="left")
+        self.entry_dupe_path = tk.Entry(cf, width=25); self.entry_dupe_path.insert(0, os.path.expanduser("~")); self.entry_dupe_path.pack(side="left")
+        tk.Button(cf, text="...", command=lambda: self.select_path_into(self.entry_dupe_path), width=3).pack(side="left")
+        self.btn_scan_dupe = tk.Button(cf, text="🔍 查找", command=self.start_dupe_scan, bg="#7B1FA2", fg="white", padx=10)
+        self.btn_scan_dupe.pack(side="left", padx=10)
+        self.btn_stop_dupe = tk.Button(cf, text="🛑 停止", command=self.stop_current_action, state="disabled", padx=10)
+        self.btn_stop_dupe.pack(side="left", padx=5)
+        self.btn_clean_dupe = tk.Button(cf, text="🗑️ 删除", command=self.start_dupe_clean, state="disabled", bg="#d32f2f", fg="white", padx=10)
+        self.btn_clean_dupe.pack(side="left")
+
+        # 每组一个父节点 (显示可回收空间)，组内每个副本一行，列布局与大文件列表一致
+        cols = ("check", "risk", "name", "path", "size", "type")
+        self.tree_dupe = ttk.Treeview(self.tab_dupe, columns=cols, show="tree headings")
+        self.tree_dupe.column("#0", width=30, stretch=False)
+        self.tree_dupe.heading("check", text="选"); self.tree_dupe.column("check", width=40, anchor="center")
+        self.tree_dupe.heading("risk", text="风险"); self.tree_dupe.column("risk", width=80, anchor="center")
+        self.tree_dupe.heading("name", text="文件名"); self.tree_dupe.column("name", width=150)
+        self.tree_dupe.heading("path", text="完整路径"); self.tree_dupe.column("path", width=400)
+        self.tree_dupe.heading("size", text="大小"); self.tree_dupe.column("size", width=80, anchor="e")
+        self.tree_dupe.heading("type", text="可回收"); self.tree_dupe.column("type", width=90, anchor="e")
+
+        self.tree_dupe.tag_configure('safe', foreground='#2E7D32')
+        self.tree_dupe.tag_configure('warn', foreground='#E65100')
+        self.tree_dupe.tag_configure('danger', foreground='#D32F2F')
+        self.tree_dupe.tag_configure('group', font=("Arial", 9, "bold"))
+
+        scroll = ttk.Scrollbar(self.tab_dupe, orient="vertical", command=self.tree_dupe.yview)
+        self.tree_dupe.configure(yscroll=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.tree_dupe.pack(fill="both", expand=True)
+        self.tree_dupe.bind("<Button-1>", lambda e: self.on_check_click(e, self.tree_dupe))
+        self.tree_dupe.bind("<Button-3>", lambda e: self.show_context_menu(e, self.tree_dupe))
+
+    def select_path_into(self, entry):
+        p = filedialog.askdirectory()
+        if p: entry.delete(0, tk.END); entry.insert(0, p)
+
+    def start_dupe_scan(self):
+        if self.is_working: return
+        try: limit = float(self.entry_dupe_size.get())
+        except: return
+        path = self.entry_dupe_path.get()
+        self.is_working = True; self.stop_event = False; self.throttle = self.make_throttle()
+        self.btn_scan_dupe.config(state="disabled"); self.btn_stop_dupe.config(state="normal"); self.btn_clean_dupe.config(state="disabled")
+        for item in self.tree_dupe.get_children(): self.tree_dupe.delete(item)
+        self.progress['value'] = 0; self.progress.configure(mode='indeterminate'); self.progress.start(10)
+        threading.Thread(target=self.run_dupe_scan, args=(path, limit), daemon=True).start()
+
+    def run_dupe_scan(self, start_path, limit_mb):
+        self.ui.status("查找重复文件: 按大小分组...")
+        groups = []; error = None
+        prune = load_rules()
+        guard = WalkGuard()
+        try:
+            groups = find_duplicates(start_path, int(limit_mb * 1024 * 1024), lambda: self.stop_event,
+                                     on_stage=lambda stage, n: self.ui.status(f"查找重复文件: {stage} ({n} 个候选)"), prune=prune, guard=guard, throttle=self.throttle)
+            # 所有副本一次批量评估风险
+            labels = iter(load_risk_rules().classify_many([fp for g in groups for fp in g.paths]))
+            for g in groups:
+                if self.stop_event: break
+                parent = self.ui.insert(self.tree_dupe, ("", "", f"{len(g.paths)} 个相同文件", "", format_size(g.size), format_size(g.reclaim)), ('group',), open=True)
+                for fp in g.paths:
+                    risk, tag = next(labels)
+                    self.ui.insert(self.tree_dupe, ("☐", risk, os.path.basename(fp), fp, format_size(g.size), ""), (tag,), parent)
+        except Exception as e:
+            # 与大文件搜索一致：保留异常，状态栏注明结果不完整
+            error = e
+
+        reclaim = sum(g.reclaim for g in groups)
+        self.ui.call(self.end_indeterminate)
+        msg = f"查找出错，结果不完整 ({error})，" if error else "查找完成，"
+        msg += f"{len(groups)} 组重复文件，可回收 {format_size(reclaim)}"
+        if guard.summary(): msg += f"；{guard.summary()}"
+        if self.throttle and self.throttle.summary(): msg += f"；{self.throttle.summary()}"
+        self.ui.call(self.finish_scan, msg, self.btn_scan_dupe, self.btn_stop_dupe, self.btn_clean_dupe)
+
+    # ================= 空间分布 (目录累计大小) =================
+    def setup_space_tab(self):
+        tk.Label(self.tab_space, text="完成一次大文件搜索后，这里按目录显示累计占用 (展开时才加载子目录，大的在前)",
+                 fg="gray", anchor="w").pack(fill="x", padx=5, pady=5)
+        cols = ("size", "files", "share")
+        self.tree_space = ttk.Treeview(self.tab_space, columns=cols, show="tree headings")
+        self.tree_space.heading("#0", text="目录"); self.tree_space.column("#0", width=500)
+        self.tree_space.heading("size", text="累计大小"); self.tree_space.column("size", width=100, anchor="e")
+        self.tree_space.heading("files", text="文件数"); self.tree_space.column("files", width=80, anchor="e")
+        self.tree_space.heading("share", text="占上级"); self.tree_space.column("share", width=70, anchor="e")
+
+        scroll = ttk.Scrollbar(self.tab_space, orient="vertical", command=self.tree_space.yview)
+        self.tree_space.configure(yscroll=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.tree_space.pack(fill="both", expand=True)
+        self.tree_space.bind("<<TreeviewOpen>>", self.on_space_open)
+        self.tree_space.bind("<Button-3>", lambda e: self.show_context_menu(e, self.tree_space))
+        self.rollup = None
+
+    def show_rollup(self, rollup):
+        self.rollup = rollup
+        for item in self.tree_space.get_children(): self.tree_space.delete(item)
+        size, files = rollup.total(rollup.top)
+        self.insert_space_node("", rollup.top, size, files, size)
+
+    def insert_space_node(self, parent, path, size, files, parent_size):
+        share = f"{size * 100 / parent_size:.1f}%" if parent_size else "-"
+        text = path if parent == "" else os.path.basename(path)
+        self.tree_space.insert(parent, "end", iid=path, text=text, values=(format_size(size), files, share))
+        # 占位子节点让目录显示展开箭头，真正展开时再替换
+        if self.rollup.kids.get(path): self.tree_space.insert(path, "end", iid="?" + path)
+
+    def on_space_open(self, event):
+        node = self.tree_space.focus()
+        placeholder = "?" + node
+        if not self.rollup or not self.tree_space.exists(placeholder): return
+        self.tree_space.delete(placeholder)
+        parent_size = self.rollup.total(node)[0]
+        for path, size, files in self.rollup.children(node):
+            self.insert_space_node(node, path, size, files, parent_size)
+
+    # ================= 增长趋势 =================
+    def setup_trend_tab(self):
+        cf = tk.Frame(self.tab_trend, pady=5)
+        cf.pack(fill="x")
+        tk.Label(cf, text="路径:").pack(side="left")
+        self.entry_trend_path = tk.Entry(cf, width=25); self.entry_trend_path.insert(0, "C:\\"); self.entry_trend_path.pack(side="left")
+        tk.Button(cf, text="...", command=lambda: self.select_path_into(self.entry_trend_path), width=3).pack(side="left")
+        tk.Button(cf, text="📈 分析", command=self.start_trends, bg="#00897B", fg="white", padx=10).pack(side="left", padx=10)
+        tk.Label(cf, text="根据该路径历次大文件搜索保存的快照 (至少 3 次)", fg="gray").pack(side="left")
+
+        cols = ("path", "rate", "size", "runs", "note")
+        self.tree_trend = ttk.Treeview(self.tab_trend, columns=cols, show="headings")
+        self.tree_trend.heading("path", text="目录"); self.tree_trend.column("path", width=450)
+        self.tree_trend.heading("rate", text="增长/天"); self.tree_trend.column("rate", width=100, anchor="e")
+        self.tree_trend.heading("size", text="当前大小"); self.tree_trend.column("size", width=90, anchor="e")
+        self.tree_trend.heading("runs", text="扫描次数"); self.tree_trend.column("runs", width=70, anchor="e")
+        self.tree_trend.heading("note", text="备注"); self.tree_trend.column("note", width=220)
+        self.tree_trend.tag_configure('warn', foreground='#E65100')
+
+        scroll = ttk.Scrollbar(self.tab_trend, orient="vertical", command=self.tree_trend.yview)
+        self.tree_trend.configure(yscroll=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.tree_trend.pack(fill="both", expand=True)
+
+    def start_trends(self):
+        root = self.entry_trend_path.get()
+        for item in self.tree_trend.get_children(): self.tree_trend.delete(item)
+        self.lbl_status.config(text="正在汇总历史快照...")
+        threading.Thread(target=self.run_trends, args=(root,), daemon=True).start()
+
+    def run_trends(self, root):
+        # 新快照读一遍汇总进库，之后的查询只查库
+        try:
+            trends = TrendIndex()
+            trends.sync(root)
+            runs = trends.runs(root)
+            growth = trends.growth(root)
+            regrowth = {r[0]: r for r in trends.regrowth(root)}
+        except (OSError, ValueError) as e:
+            self.ui.status(f"趋势分析失败: {e}"); return
+        if len(runs) < 3:
+            self.ui.status(f"{root} 只有 {len(runs)} 次快照，至少需要 3 次完整的大文件搜索"); return
+        notes = lambda r: f"缓存: 清理 {r[1]} 次, 回涨 {r[2]} 次" + (f", 平均 {r[3]:.1f} 天" if r[3] is not None else "")
+        for d, rate, size, n in growth:
+            r = regrowth.pop(d, None)
+            self.ui.insert(self.tree_trend, (os.path.join(root, d.replace("/", os.sep)),
+                                             f"+{format_size(rate)}", format_size(size), n, notes(r) if r else ""),
+                           ('warn',) if r and r[2] else ())
+        # 增长不在前列但清理后又长回来的缓存也列出
+        for d, r in regrowth.items():
+            if r[2]: self.ui.insert(self.tree_trend, (os.path.join(root, d.replace("/", os.sep)),
+                                                       "-", format_size(r[4]), "-", notes(r)), ('warn',))
+        span = (runs[-1][1] - runs[0][1]) / 86400
+        self.ui.status(f"共 {len(runs)} 次快照，跨度 {span:.1f} 天；总量 {format_size(runs[0][2])} → {format_size(runs[-1][2])}")
+
+    def end_indeterminate(self):
         self.progress.stop(); self.progress.configure(mode='determinate'); self.progress['value'] = 100
-        self.finish_scan(f"扫描完成，找到 {count} 个文件", self.btn_scan_large, self.btn_stop_large, self.btn_clean_large)
 
     def finish_scan(self, msg, btn_scan, btn_stop, btn_clean):
         if self.stop_event: msg = "扫描已停止"
@@ -424,12 +862,26 @@ class MonitorCleanerApp:
     # ================= 通用清理逻辑 =================
     def start_junk_clean(self): self._do_clean(self.tree_junk, "junk")
     def start_large_clean(self): self._do_clean(self.tree_large, "large")
+    def start_dupe_clean(self):
+        # 每组至少要留一份不勾选，否则这份内容就一个副本都不剩了
+        t = self.tree_dupe
+        full = [g for g in t.get_children() if t.get_children(g) and all(t.set(c, "check") == "☑" for c in t.get_children(g))]
+        if full:
+            t.selection_set(full); t.see(full[0])
+            messagebox.showwarning("提示", f"有 {len(full)} 组重复文件的所有副本都被勾选了，每组至少要保留一份 (已选中这些组)")
+            return
+        self._do_clean(t, "large")
+
+    def iter_rows(self, tree, parent=""):
+        for i in tree.get_children(parent):
+            yield i
+            yield from self.iter_rows(tree, i)
 
     def _do_clean(self, tree, mode):
         items = []
-        for i in tree.get_children():
+        for i in self.iter_rows(tree):
             v = tree.item(i)['values']
-            if v[0] == "☑": items.append((i, v[3])) # path is index 3
+            if v and v[0] == "☑": items.append((i, v[3])) # path is index 3
         if not items: messagebox.showinfo("提示", "未勾选项目"); return
         
         bk = None
@@ -440,47 +892,53 @@ class MonitorCleanerApp:
             
         if not messagebox.askyesno("确认", f"删除 {len(items)} 个项目到回收站？"): return
 
-        self.is_working = True
+        self.is_working = True; self.throttle = self.make_throttle(); self.timer = self.make_timer("clean")
         threading.Thread(target=self.run_clean, args=(tree, items, bk, mode), daemon=True).start()
 
+    def mark_cleaned(self, tree, iid, mode):
+        if mode=="large":
+            tree.delete(iid)
+            if tree is self.tree_large and iid.startswith("s"): self.large_store.kill(int(iid[1:]))
+            return
+        vals = list(tree.item(iid)['values'])
+        vals[0]="☐"; vals[4]="0 KB"; vals[5]="0 KB"; vals[6]="已清理"
+        tree.item(iid, values=vals)
+        if tree is self.tree_junk and vals[3] in self.junk_sizes:
+            self.junk_sizes[vals[3]] = 0; self.update_reclaim()
+
+    def finish_clean(self, refused=()):
+        self.lbl_status.config(text="清理完成")
+        self.is_working = False
+        if refused: messagebox.showwarning("完成", "清理结束，以下目标没有完成精确统计，未清理 (请重新扫描):\n" + "\n".join(refused))
+        else: messagebox.showinfo("完成", "清理结束")
+
     def run_clean(self, tree, items, bk, mode):
+        timer = self.timer.start()
         tot = len(items)
+        # 带闲置天数的垃圾目标删除前逐个复核，扫描之后又被用过的文件不删；
+        # 闲置天数取自目标定义而不是扫描结果，没有精确统计过 (估算行、统计失败) 的目标不清理
+        days_of = {t[2]: t[5] for t in junk_targets()} if mode == "junk" else {}
+        refused = []
         for i, (iid, path) in enumerate(items):
-            self.lbl_status.config(text=f"清理: {path}")
+            if mode == "junk" and os.path.normpath(os.path.abspath(path)) not in self.junk_rows:
+                refused.append(path); timer.count("refused"); self.ui.set_progress((i+1)/tot*100); continue
+            self.ui.status(f"清理: {path}")
+            if self.throttle:
+                with timer.phase("throttle"): self.throttle.gate()
             try:
-                if bk:
-                    ts = time.strftime("%H%M%S")
-                    dst = os.path.join(bk, os.path.basename(path) + "_" + ts)
-                    if os.path.isfile(path): shutil.copy2(path, dst)
-                    else: shutil.copytree(path, dst, dirs_exist_ok=True)
-                
-                if mode=="large": send_to_recycle_bin(path)
-                else:
-                    if os.path.isdir(path):
-                        for e in os.scandir(path): send_to_recycle_bin(e.path)
-                    else: send_to_recycle_bin(path)
-                
-                vals = list(tree.item(iid)['values'])
-                vals[0]="☐"; vals[4]="0 KB"; vals[5]="已清理"
-                if mode=="large": tree.delete(iid)
-                else: tree.item(iid, values=vals)
-            except: pass
-            self.progress['value'] = (i+1)/tot*100
-            
-        self.lbl_status.config(text="清理完成")
-        self.is_working = False
-        messagebox.showinfo("完成", "清理结束")
-
-    def get_folder_size(self, path):
-        t = 0
-        try:
-            with os.scandir(path) as it:
-                for e in it:
-                    if self.stop_event: break
-                    if e.is_file(): t+=e.stat().st_size
-                    elif e.is_dir(): t+=self.get_folder_size(e.path)
-        except: pass
-        return t
+                clean_path(path, mode, bk, files=self.junk_files.get(path) if mode == "junk" else None, timer=timer,
+                           cutoff=age_cutoff(days_of.get(path, 0)))
+                self.ui.call(self.mark_cleaned, tree, iid, mode)
+            except: timer.count("failed")
+            self.ui.set_progress((i+1)/tot*100)
+
+        timer.count("items", tot)
+        timer.stop()
+        self.ui.call(self.finish_clean, refused)
+        self.ui.call(self.report_timing, timer)
+
+    def get_folder_size(self, path, workers=None):
+        return ParallelSizer(workers, should_stop=lambda: self.stop_event).size(path)
 
 if __name__ == "__main__":
     root = tk.Tk()
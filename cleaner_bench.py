@@ -0,0 +1,263 @@
+"""C盘深度清理专家 - 性能基准
+
+在本地磁盘生成可复现的合成目录树，无界面地运行扫描/清理引擎，输出 JSON 报告：
+    python cleaner_bench.py --out bench.json
+    python cleaner_bench.py --scale 0.2 --baseline bench.json      # 与基线比较，变慢超过阈值时退出码为 1
+目录树 (同一 seed 和 scale 生成的结构和大小完全相同)：
+  wide    一层很多子目录，每个目录几个小文件
+  deep    很深的单链目录，每层两个文件
+  tiny    大量 0-1KB 的小文件
+  sparse  少数几个很大的稀疏文件 (逻辑大小大，几乎不占磁盘)
+引擎：
+  size         ParallelSizer.size           (界面的 get_folder_size)
+  large        iter_large_files + ResultStore + DirRollup  (界面的 run_large_scan，无界面部分)
+  index-cold   ScanIndex.refresh 空库       index-warm  ScanIndex.refresh 已索引、无变化
+  clean        clean_path(junk, 直接删除)    (界面的 run_clean；每次重新生成目录树，生成不计时)
+每项取 repeat 次中最快的一次计时，另跑一次 tracemalloc 取 Python 分配的峰值内存 (tracemalloc 本身会拖慢，不计时)。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cleaner_core import ParallelSizer, ScanIndex, DirRollup, ScanProgress, iter_large_files, clean_path
+from cleaner_store import ResultStore
+
+REPORT_VERSION = 1
+# 生成的文件和目录统一设成这个修改时间：结果可复现，增量索引也不会把刚建的目录当成"可能还在变"而重新枚举
+TREE_MTIME = 1577836800  # 2020-01-01
+# 与基线相比吞吐量下降超过这个比例算退步
+REGRESSION_THRESHOLD = 0.10
+
+
+# ==========================================
+# 合成目录树
+# ==========================================
+def _write(path, size):
+    with open(path, "wb") as f:
+        if size: f.write(b"\0" * size)
+
+
+def _make_sparse(path, size):
+    """创建逻辑大小为 size 的稀疏文件；Windows 需先用 FSCTL_SET_SPARSE 标记，否则 NTFS 会真的分配空间"""
+    with open(path, "wb") as f:
+        if os.name == "nt":
+            import ctypes, msvcrt
+            from ctypes import wintypes
+            FSCTL_SET_SPARSE = 0x000900C4
+            returned = wintypes.DWORD()
+            ctypes.windll.kernel32.DeviceIoControl(wintypes.HANDLE(msvcrt.get_osfhandle(f.fileno())), FSCTL_SET_SPARSE,
+                                                   None, 0, None, 0, ctypes.byref(returned), None)
+        f.truncate(size)
+
+
+def gen_wide(root, rng, scale):
+    n_dirs = max(1, int(2000 * scale))
+    stats = [0, 0, 0]  # 文件数, 目录数, 逻辑字节数
+    for i in range(n_dirs):
+        d = os.path.join(root, f"d{i:05d}"); os.mkdir(d); stats[1] += 1
+        for j in range(5):
+            size = rng.randint(0, 8192)
+            _write(os.path.join(d, f"f{j}.dat"), size); stats[0] += 1; stats[2] += size
+    return stats
+
+
+def gen_deep(root, rng, scale):
+    depth = max(1, int(400 * scale))
+    stats = [0, 0, 0]
+    d = root
+    for i in range(depth):
+        d = os.path.join(d, f"l{i % 10}"); os.mkdir(d); stats[1] += 1
+        for j in range(2):
+            size = rng.randint(0, 4096)
+            _write(os.path.join(d, f"f{j}.txt"), size); stats[0] += 1; stats[2] += size
+    return stats
+
+
+def gen_tiny(root, rng, scale):
+    n_files = max(1, int(20000 * scale))
+    stats = [0, 0, 0]
+    per_dir = 200
+    for i in range(n_files):
+        if i % per_dir == 0:
+            d = os.path.join(root, f"t{i // per_dir:04d}"); os.mkdir(d); stats[1] += 1
+        size = rng.randint(0, 1024)
+        _write(os.path.join(d, f"{i:06d}.tmp"), size); stats[0] += 1; stats[2] += size
+    return stats
+
+
+def gen_sparse(root, rng, scale):
+    n_files = max(1, int(8 * min(1.0, scale * 4)))
+    stats = [0, 0, 0]
+    for i in range(n_files):
+        size = rng.randint(1, 4) * 1024 ** 3
+        _make_sparse(os.path.join(root, f"huge{i}.vhdx"), size); stats[0] += 1; stats[2] += size
+    return stats
+
+
+TREES = {"wide": gen_wide, "deep": gen_deep, "tiny": gen_tiny, "sparse": gen_sparse}
+
+
+def make_tree(kind, root, seed=0, scale=1.0):
+    """在 root 下生成 kind 目录树，返回 {"files", "dirs", "bytes"}"""
+    os.makedirs(root, exist_ok=True)
+    files, dirs, size = TREES[kind](root, random.Random(f"{kind}:{seed}"), scale)
+    # 自底向上，先改内容再改所在目录
+    for d, _, names in os.walk(root, topdown=False):
+        for n in names: os.utime(os.path.join(d, n), (TREE_MTIME, TREE_MTIME))
+        os.utime(d, (TREE_MTIME, TREE_MTIME))
+    return {"files": files, "dirs": dirs, "bytes": size}
+
+
+# ==========================================
+# 被测引擎 (与界面里对应方法做的事一致，只是不碰 Tk)
+# ==========================================
+def run_size(root, ctx):
+    ParallelSizer().size(root)
+
+
+def run_large(root, ctx):
+    store = ResultStore(); rollup = DirRollup(root); progress = ScanProgress()
+    for fp, sz, alloc, mtime in iter_large_files(root, 1024 * 1024, rollup=rollup, progress=progress):
+        store.add(fp, sz, alloc, mtime)
+    rollup.finish()
+    store.sorted_rows("alloc", True, 2000)
+
+
+def run_index_cold(root, ctx):
+    db = os.path.join(ctx["work"], f"index_{time.monotonic_ns()}.db")
+    ScanIndex(db).refresh(root)
+
+
+def _prepare_index_warm(root, ctx):
+    ctx["warm_db"] = os.path.join(ctx["work"], "index_warm.db")
+    ScanIndex(ctx["warm_db"]).refresh(root)
+
+
+def run_index_warm(root, ctx):
+    ScanIndex(ctx["warm_db"]).refresh(root)
+
+
+def run_clean(root, ctx):
+    clean_path(root, "junk", permanent=True)
+
+
+# 引擎名 -> (计时函数, 每轮前的准备, 是否会破坏目录树)
+ENGINES = {
+    "size": (run_size, None, False),
+    "large": (run_large, None, False),
+    "index-cold": (run_index_cold, None, False),
+    "index-warm": (run_index_warm, _prepare_index_warm, False),
+    "clean": (run_clean, None, True),
+}
+
+
+def _measure(fn, root, ctx, trace=False):
+    if trace:
+        tracemalloc.start()
+        try:
+            fn(root, ctx)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    t = time.perf_counter()
+    fn(root, ctx)
+    return time.perf_counter() - t
+
+
+def bench(work, trees=None, engines=None, scale=1.0, seed=0, repeat=3, log=None):
+    """在 work 目录下逐个生成目录树并运行各引擎，返回结果列表"""
+    # deep 树的路径远超 MAX_PATH (260)，Windows 上改用 \\?\ 扩展长度路径
+    if os.name == "nt" and not work.startswith("\\\\?\\"): work = "\\\\?\\" + os.path.abspath(work)
+    results = []
+    for kind in trees or TREES:
+        root = os.path.join(work, kind)
+        stats = make_tree(kind, root, seed, scale)
+        entries = stats["files"] + stats["dirs"]
+        for name in engines or ENGINES:
+            fn, prepare, destructive = ENGINES[name]
+            ctx = {"work": work}
+            best = None; peak = 0
+            for i in range(repeat + 1):
+                if destructive and i:
+                    shutil.rmtree(root); make_tree(kind, root, seed, scale)
+                if prepare: prepare(root, ctx)
+                # 最后一轮只量内存
+                if i == repeat: peak = _measure(fn, root, ctx, trace=True)
+                else:
+                    t = _measure(fn, root, ctx)
+                    best = t if best is None else min(best, t)
+            if destructive:
+                shutil.rmtree(root); make_tree(kind, root, seed, scale)
+            for f in os.listdir(work):
+                if f.startswith("index_"): os.remove(os.path.join(work, f))
+            r = {"name": f"{name}/{kind}", "engine": name, "tree": kind, "entries": entries, "bytes": stats["bytes"],
+                 "seconds": round(best, 6), "entries_per_sec": round(entries / best, 1) if best else None,
+                 "mb_per_sec": round(stats["bytes"] / 1024 ** 2 / best, 2) if best else None, "peak_kb": peak // 1024}
+            results.append(r)
+            if log: log(r)
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """与基线报告逐项比较吞吐量 (entries/sec)；ratio < 1 为变慢"""
+    base = {r["name"]: r for r in baseline.get("results", [])}
+    out = []
+    for r in results:
+        b = base.get(r["name"])
+        if not b or not b.get("entries_per_sec") or not r.get("entries_per_sec"): continue
+        ratio = r["entries_per_sec"] / b["entries_per_sec"]
+        out.append({"name": r["name"], "ratio": round(ratio, 3), "baseline_seconds": b["seconds"], "seconds": r["seconds"],
+                    "peak_kb_delta": r["peak_kb"] - b.get("peak_kb", 0), "regression": ratio < 1 - threshold})
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cleaner_bench", description="C盘深度清理专家 性能基准 (JSON 报告)")
+    parser.add_argument("--dir", help="生成目录树的位置 (默认系统临时目录，应在本地磁盘上)")
+    parser.add_argument("--trees", nargs="+", choices=list(TREES), help="只跑这些目录树")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), help="只跑这些引擎")
+    parser.add_argument("--scale", type=float, default=1.0, help="目录树规模倍数，默认 1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="每项计时次数 (取最快)，默认 3")
+    parser.add_argument("--out", help="报告写到该文件 (默认只输出到 stdout)")
+    parser.add_argument("--baseline", help="与该基线报告比较")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="吞吐量下降超过该比例算退步，默认 0.10")
+    args = parser.parse_args(argv)
+
+    work = tempfile.mkdtemp(prefix="sdc_bench_", dir=args.dir)
+    log = lambda r: sys.stderr.write(f"{r['name']:<20} {r['seconds']:>9.4f}s {r['entries_per_sec'] or 0:>12.0f} 项/秒 "
+                                     f"{r['mb_per_sec'] or 0:>10.1f} MB/秒 峰值 {r['peak_kb']} KB\n")
+    t0 = time.time()
+    try:
+        results = bench(work, args.trees, args.engines, args.scale, args.seed, args.repeat, log)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    report = {"version": REPORT_VERSION, "created": time.time(), "wall_seconds": round(time.time() - t0, 3),
+              "platform": platform.platform(), "python": platform.python_version(), "cpu_count": os.cpu_count(),
+              "scale": args.scale, "seed": args.seed, "repeat": args.repeat, "results": results}
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+        if baseline.get("scale") != args.scale: sys.stderr.write("警告: 基线的 scale 与本次不同，比较结果仅供参考\n")
+        report["comparison"] = compare(results, baseline, args.threshold)
+        regressions = [c["name"] for c in report["comparison"] if c["regression"]]
+        report["regressions"] = regressions
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        tmp = args.out + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: f.write(text)
+        os.replace(tmp, args.out)
+    sys.stdout.write(text + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
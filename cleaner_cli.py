@@ -0,0 +1,490 @@
+"""C盘深度清理专家 - 命令行入口 (无需图形界面，适合计划任务/服务器)
+
+结果以 JSON Lines 逐行输出到 stdout，可直接管道给其它工具:
+    python cleaner_cli.py scan-junk
+    python cleaner_cli.py scan-large D:\\ --min-mb 500 --top 100
+    python cleaner_cli.py scan-dirs D:\\ --depth 2
+    python cleaner_cli.py scan-dupes D:\\ --min-mb 10
+    python cleaner_cli.py estimate D:\\ --budget 2 --refine
+    python cleaner_cli.py watch
+    python cleaner_cli.py scan-dirs D:\\ --snapshot && python cleaner_cli.py diff --root D:\\
+    python cleaner_cli.py trends D:\\ --top 20
+    python cleaner_cli.py scan-junk | python cleaner_cli.py clean --stdin --mode junk
+扫描/清理命令加 --metrics-file FILE 时，结束后另把结果写成 Prometheus 文本格式 (见 cleaner_metrics)。
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+import threading
+
+from cleaner_core import (
+    ScanIndex, TopK, DirRollup, WalkGuard, ParallelSizer, walk_entries, junk_targets, scan_junk, iter_large_files,
+    clean_path, stale_files, age_cutoff, estimate_size, estimate_range, ScanProgress, expected_entries, record_entries,
+)
+from cleaner_dupes import find_duplicates
+from cleaner_rules import RULES_FILE, load_rules
+from cleaner_risk import load_risk_rules
+from cleaner_throttle import Throttle
+from cleaner_watch import LiveIndex
+from cleaner_trends import TrendIndex
+from cleaner_perf import PhaseTimer
+from cleaner_metrics import RunMetrics
+from cleaner_snapshot import (
+    SnapshotWriter, SnapshotReader, diff_snapshots, snapshot_path, list_snapshots, prune_snapshots, rel_display,
+)
+
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def rules_from(args):
+    return load_rules(args.rules, args.exclude_prefix, args.exclude_glob, args.exclude_regex,
+                      defaults=not args.no_default_rules)
+
+
+def guard_from(args):
+    return WalkGuard(one_filesystem=args.one_filesystem)
+
+
+def throttle_from(args):
+    if not args.throttle: return None
+    return Throttle(args.max_cpu, args.max_mem, args.max_io)
+
+
+def throttle_info(throttle):
+    # 汇总记录里的限速信息：累计等待秒数 (各线程合计) 和最后一次负载读数
+    return None if throttle is None else {"waited": round(throttle.throttled, 3), "load": throttle.load}
+
+
+def timer_from(args, command):
+    # 只在要写指标时计时，不写时引擎不做任何额外的计时调用
+    return PhaseTimer(command).start() if args.metrics_file else None
+
+
+def finish_metrics(args, metrics, seconds, stop, guard=None, timer=None, entries=None):
+    """写出 --metrics-file；写失败只提示，不影响已输出的结果"""
+    if not args.metrics_file: return
+    if timer: timer.stop()
+    metrics.finish(seconds, stop.is_set(), guard.skipped if guard else None, timer, entries)
+    try: metrics.write(args.metrics_file)
+    except OSError as e: sys.stderr.write(f"写指标文件失败: {e}\n")
+
+
+def snapshot_from(args, root):
+    # --snapshot 不带文件名时存到默认位置 (按根目录和时间命名，diff --root 据此找最近两次)
+    if args.snapshot is None: return None
+    return SnapshotWriter(args.snapshot or snapshot_path(root), root)
+
+
+def finish_snapshot(snap, args, root, stop):
+    """完整扫描才写出快照，返回汇总记录里的快照信息"""
+    if snap is None: return None
+    if stop.is_set():
+        snap.abort(); return None
+    n = snap.close()
+    if not args.snapshot: prune_snapshots(root)
+    return {"path": snap.path, "entries": n}
+
+
+def cmd_scan_junk(args, stop):
+    idx = ScanIndex() if args.index else None
+    guard = guard_from(args); throttle = throttle_from(args)
+    timer = timer_from(args, "scan-junk"); metrics = RunMetrics("scan-junk")
+    total = total_unique = 0; t0 = time.time()
+    failed = []
+
+    def on_error(target, exc):
+        failed.append(target[2])
+        emit({"type": "error", "category": target[0], "name": target[1], "path": target[2], "error": str(exc)})
+
+    for (cat, name, path, df, risk, days), sz, uniq, files in scan_junk(junk_targets(), idx, stop.is_set, guard=guard,
+                                                                         throttle=throttle, timer=timer, on_error=on_error):
+        if stop.is_set(): continue
+        # 指标里存在但为空的目标也记为 0，目标被清空后曲线能回到 0
+        if path and os.path.isdir(path):
+            metrics.set("sdc_junk_reclaimable_bytes", max(sz, 0), target=name, category=cat, path=path)
+            if uniq is not None: metrics.set("sdc_junk_reclaimable_unique_bytes", uniq, target=name, category=cat, path=path)
+        if sz <= 0: continue
+        # 带闲置天数的目标 size 只含过期文件；clean --stdin 按 min_age_days 重新筛选后删除
+        emit({"type": "junk", "category": cat, "name": name, "path": path, "size": sz,
+              "unique": uniq, "risk": risk, "selected": df, "min_age_days": days,
+              "stale_files": None if files is None else len(files)})
+        total += sz; total_unique += sz if uniq is None else uniq
+    finish_metrics(args, metrics, time.time() - t0, stop, guard, timer)
+    emit({"type": "summary", "command": "scan-junk", "total": total, "unique": total_unique, "skipped": guard.skipped,
+          "throttle": throttle_info(throttle), "failed": len(failed),
+          "seconds": round(time.time() - t0, 3), "stopped": stop.is_set()})
+
+
+def cmd_scan_large(args, stop):
+    idx = ScanIndex() if args.index else None
+    limit_b = args.min_mb * 1024 * 1024
+    top = TopK(args.top) if args.top > 0 else None
+    sizes = {}  # 前 N 模式下堆内文件的 (逻辑大小, 修改时间)，随堆一起增删
+    prune = rules_from(args)
+    classifier = load_risk_rules()
+    guard = guard_from(args); throttle = throttle_from(args)
+    # --progress 时进度写到 stderr，不混进 stdout 的结果流
+    report = (lambda p: sys.stderr.write(p.text() + "\n")) if args.progress else None
+    progress = ScanProgress(None if idx else expected_entries(args.path), report, interval=1.0)
+    snap = snapshot_from(args, args.path)
+    timer = timer_from(args, "scan-large"); metrics = RunMetrics("scan-large")
+    count = found = 0; t0 = time.time()
+    for fp, sz, alloc, mtime in iter_large_files(args.path, limit_b, idx, stop.is_set, args.top, prune=prune, guard=guard,
+                                          throttle=throttle, progress=progress, snapshot=snap, timer=timer):
+        if stop.is_set(): break
+        if top:
+            kept, out = top.push(alloc, fp)
+            if kept: sizes[fp] = (sz, mtime)
+            if out is not None: sizes.pop(out)
+            continue
+        risk, _ = classifier.classify(fp)
+        # 和界面一样大文件默认不勾选：clean --stdin 要加 --all 才会删
+        emit({"type": "large", "path": fp, "size": sz, "alloc": alloc, "mtime": mtime, "risk": risk, "selected": False})
+        count += 1; found += alloc
+    # 前 N 模式要等遍历结束才知道最终名单
+    if top:
+        items = top.items()
+        for (alloc, fp), (risk, _) in zip(items, classifier.classify_many([fp for _, fp in items])):
+            sz, mtime = sizes[fp]
+            emit({"type": "large", "path": fp, "size": sz, "alloc": alloc, "mtime": mtime, "risk": risk, "selected": False})
+        count = len(top.heap); found = sum(alloc for alloc, _ in items)
+    if not stop.is_set() and not idx and progress.done: record_entries(args.path, progress.done)
+    snapshot = finish_snapshot(snap, args, args.path, stop)
+    root = os.path.abspath(args.path)
+    metrics.set("sdc_large_files", count, root=root, min_mb=args.min_mb)
+    metrics.set("sdc_large_files_bytes", found, root=root, min_mb=args.min_mb)
+    finish_metrics(args, metrics, time.time() - t0, stop, guard, timer, None if idx else progress.done)
+    emit({"type": "summary", "command": "scan-large", "count": count, "entries": progress.done, "pruned": dict(prune.hits), "skipped": guard.skipped,
+          "throttle": throttle_info(throttle), "snapshot": snapshot,
+          "seconds": round(time.time() - t0, 3), "stopped": stop.is_set()})
+
+
+def cmd_scan_dirs(args, stop):
+    t0 = time.time()
+    prune = rules_from(args)
+    guard = guard_from(args); throttle = throttle_from(args)
+    snap = snapshot_from(args, args.path)
+    timer = timer_from(args, "scan-dirs"); metrics = RunMetrics("scan-dirs")
+    if args.index:
+        idx = ScanIndex()
+        idx.refresh(args.path, stop.is_set, guard, throttle, timer)
+        rollup = idx.rollup(args.path)
+        if snap:
+            for fp, sz, alloc, mtime in idx.files(args.path): snap.add(fp, sz, alloc, mtime)
+    else:
+        rollup = DirRollup(args.path)
+        for e in walk_entries(args.path, stop.is_set, rollup, prune, guard, throttle, timer=timer):
+            if snap and not e.is_dir: snap.add(e.path, e.size, e.alloc, e.mtime)
+        rollup.finish()
+    # 从根开始逐层输出，每层只取最大的 --top 个子目录
+    size, files = rollup.total(rollup.top)
+    emit({"type": "dir", "path": rollup.top, "depth": 0, "size": size, "files": files})
+    metrics.set("sdc_dir_bytes", size, path=rollup.top, depth=0)
+    level = [rollup.top]
+    for depth in range(1, args.depth + 1):
+        nxt = []
+        for d in level:
+            for path, size, files in rollup.children(d)[:args.top]:
+                emit({"type": "dir", "path": path, "depth": depth, "size": size, "files": files})
+                metrics.set("sdc_dir_bytes", size, path=path, depth=depth)
+                nxt.append(path)
+        level = nxt
+    snapshot = finish_snapshot(snap, args, args.path, stop)
+    finish_metrics(args, metrics, time.time() - t0, stop, guard, timer)
+    emit({"type": "summary", "command": "scan-dirs", "dirs": len(rollup.totals), "pruned": dict(prune.hits), "skipped": guard.skipped,
+          "throttle": throttle_info(throttle), "snapshot": snapshot,
+          "seconds": round(time.time() - t0, 3), "stopped": stop.is_set()})
+
+
+def cmd_scan_dupes(args, stop):
+    t0 = time.time()
+    prune = rules_from(args)
+    guard = guard_from(args); throttle = throttle_from(args)
+    groups = find_duplicates(args.path, int(args.min_mb * 1024 * 1024), stop.is_set, prune=prune, guard=guard,
+                             throttle=throttle)
+    classifier = load_risk_rules()
+    for g in groups:
+        emit({"type": "dupes", "size": g.size, "hash": g.digest, "reclaim": g.reclaim,
+              "files": [{"path": p, "risk": r} for p, (r, _) in zip(g.paths, classifier.classify_many(g.paths))]})
+    metrics = RunMetrics("scan-dupes"); root = os.path.abspath(args.path)
+    metrics.set("sdc_dupes_groups", len(groups), root=root)
+    metrics.set("sdc_dupes_reclaimable_bytes", sum(g.reclaim for g in groups), root=root)
+    finish_metrics(args, metrics, time.time() - t0, stop, guard)
+    emit({"type": "summary", "command": "scan-dupes", "groups": len(groups), "pruned": dict(prune.hits), "skipped": guard.skipped,
+          "throttle": throttle_info(throttle),
+          "reclaim": sum(g.reclaim for g in groups), "seconds": round(time.time() - t0, 3), "stopped": stop.is_set()})
+
+
+def cmd_estimate(args, stop):
+    paths = args.paths or [t[2] for t in junk_targets() if t[2] and os.path.exists(t[2])]
+    t0 = time.time()
+    for path in paths:
+        if stop.is_set(): break
+        est = estimate_size(path, args.budget, should_stop=stop.is_set)
+        # low/high 为大致范围 (见 estimate_range)，不是严格的置信区间，只有下探结果时 high 为 null；known 为已 stat 过的字节数
+        low, high = estimate_range(est)
+        emit({"type": "estimate", "path": path, "size": est.size, "stderr": int(est.stderr), "low": low, "high": high,
+              "known": est.known, "exact": est.exact, "stratified": est.stratified, "probes": est.probes, "dirs": est.dirs})
+    # 先给出全部估算，再逐个精确统计
+    if args.refine:
+        guard = guard_from(args); throttle = throttle_from(args)
+        for path in paths:
+            if stop.is_set(): break
+            emit({"type": "size", "path": path, "size": ParallelSizer(should_stop=stop.is_set, guard=guard, throttle=throttle).size(path)})
+    emit({"type": "summary", "command": "estimate", "paths": len(paths), "seconds": round(time.time() - t0, 3),
+          "stopped": stop.is_set()})
+
+
+def cmd_diff(args, stop):
+    old, new = args.old, args.new
+    if args.root and not new:
+        # 默认位置下该根目录最近的两次快照 (只给一个文件时与最近一次比较)
+        found = [p for p in list_snapshots(args.root) if p != old]
+        if old: new = found[-1] if found else None
+        else: old, new = (found[-2], found[-1]) if len(found) >= 2 else (None, None)
+    if not old or not new:
+        sys.stderr.write("需要两个快照文件，或用 --root 指定已有至少两次快照的根目录\n"); return
+    t0 = time.time()
+    d = diff_snapshots(old, new)
+    root = SnapshotReader(new).root
+    for kind, grow in (("grow", True), ("shrink", False)):
+        for key, o, n in d.top(args.top, grow, args.depth):
+            emit({"type": kind, "path": os.path.join(root, rel_display(key)), "old": o, "new": n, "delta": n - o})
+    emit({"type": "summary", "command": "diff", "old": old, "new": new,
+          "old_created": d.old_meta.get("created"), "new_created": d.new_meta.get("created"),
+          "old_total": d.old_total, "new_total": d.new_total, "delta": d.new_total - d.old_total,
+          "added": d.added, "removed": d.removed, "changed": d.changed, "unchanged": d.same,
+          "seconds": round(time.time() - t0, 3)})
+
+
+def cmd_trends(args, stop):
+    t0 = time.time()
+    trends = TrendIndex()
+    added = sum(trends.ingest(snap) for snap in args.add) + trends.sync(args.path)
+    since = time.time() - args.days * 86400 if args.days else None
+    root = os.path.normpath(os.path.abspath(args.path))
+    for d, rate, size, n in trends.growth(args.path, args.top, since, args.min_runs):
+        emit({"type": "trend", "path": os.path.join(root, d.replace("/", os.sep)), "bytes_per_day": int(rate), "size": size, "runs": n})
+    for d, cleans, regrows, days, size in trends.regrowth(args.path):
+        emit({"type": "regrowth", "path": os.path.join(root, d.replace("/", os.sep)), "cleanings": cleans, "regrowths": regrows,
+              "days_to_regrow": None if days is None else round(days, 2), "size": size})
+    runs = trends.runs(args.path)
+    emit({"type": "summary", "command": "trends", "runs": len(runs), "ingested": added,
+          "first": runs[0][1] if runs else None, "last": runs[-1][1] if runs else None, "seconds": round(time.time() - t0, 3)})
+
+
+def cmd_watch(args, stop):
+    paths = args.paths or [t[2] for t in junk_targets() if t[2] and os.path.exists(t[2])]
+    t0 = time.time(); updates = [0]
+
+    def on_update(path, total):
+        updates[0] += 1
+        emit({"type": "total", "path": path, "size": total, "time": round(time.time(), 3)})
+
+    live = LiveIndex(ScanIndex(), on_update, args.debounce, args.poll).start(paths, stop.is_set)
+    try:
+        # --duration 0 为一直监视，直到 Ctrl+C
+        while not stop.wait(0.5):
+            if args.duration and time.time() - t0 >= args.duration: break
+    finally:
+        live.stop()
+        emit({"type": "summary", "command": "watch", "paths": len(live.roots), "backend": type(live.watcher).__name__,
+              "updates": updates[0], "seconds": round(time.time() - t0, 3)})
+
+
+# 扫描结果的记录类型 -> 清理方式；其它带 path 的记录 (dir、estimate 等) 不是清理对象
+CLEAN_MODE_OF = {"junk": "junk", "large": "large"}
+
+
+def cmd_clean(args, stop):
+    # (路径, 最少闲置天数, 清理方式)；命令行给出的路径用 --min-age-days 和 --mode (默认 large)
+    paths = [(p, args.min_age_days, args.mode or "large") for p in args.paths]
+    sizes = {}  # 扫描结果里记录的大小，只用于指标
+    if args.stdin:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line: continue
+            rec = json.loads(line)
+            # 没有 selected 字段的记录按未勾选处理，手写或其它工具产生的记录也要 --all 才删
+            if "path" not in rec or not (args.all or rec.get("selected", False)): continue
+            # 清理方式取自记录类型：scan-junk 的目标只清空内容，不能连目录本身一起删掉
+            mode = CLEAN_MODE_OF.get(rec.get("type"))
+            if mode is None or (args.mode and args.mode != mode):
+                why = f"记录类型 {rec.get('type')!r} 不能清理" if mode is None else f"记录类型 {rec['type']!r} 与 --mode {args.mode} 不符"
+                emit({"type": "clean", "path": rec["path"], "ok": False, "error": why + "，已跳过"})
+                continue
+            days = rec.get("min_age_days", 0) if args.min_age_days is None else args.min_age_days
+            paths.append((rec["path"], days, mode))
+            if isinstance(rec.get("size"), int): sizes[rec["path"]] = rec["size"]
+    throttle = throttle_from(args)
+    timer = timer_from(args, "clean"); metrics = RunMetrics("clean")
+    ok = failed = reclaimed = 0; t0 = time.time()
+    for path, days, mode in paths:
+        if stop.is_set(): break
+        if throttle: throttle.gate()
+        try:
+            files = stale_files(path, days, stop.is_set) if mode == "junk" and days else None
+            done = clean_path(path, mode, args.backup, args.permanent, files, timer, age_cutoff(days) if files is not None else None)
+            error = None if done else "删除失败"
+        except Exception as e:
+            done = False; error = str(e)
+        if done: ok += 1; reclaimed += sizes.get(path, 0)
+        else: failed += 1
+        emit({"type": "clean", "path": path, "ok": bool(done), "error": error})
+    metrics.set("sdc_clean_items", ok, result="ok")
+    metrics.set("sdc_clean_items", failed, result="failed")
+    if sizes: metrics.set("sdc_clean_reclaimed_bytes", reclaimed)
+    finish_metrics(args, metrics, time.time() - t0, stop, timer=timer)
+    emit({"type": "summary", "command": "clean", "cleaned": ok, "failed": failed, "throttle": throttle_info(throttle),
+          "seconds": round(time.time() - t0, 3), "stopped": stop.is_set()})
+
+
+def add_rule_args(p):
+    p.add_argument("--rules", default=RULES_FILE, help="排除规则文件 (JSON)")
+    p.add_argument("--exclude-prefix", action="append", default=[], metavar="PATH", help="排除该路径前缀 (可重复)")
+    p.add_argument("--exclude-glob", action="append", default=[], metavar="GLOB", help="排除匹配通配符的目录 (可重复)")
+    p.add_argument("--exclude-regex", action="append", default=[], metavar="REGEX", help="排除匹配正则的目录 (可重复)")
+    p.add_argument("--no-default-rules", action="store_true", help="不使用内置排除规则 (WinSxS)")
+
+
+def add_walk_args(p):
+    p.add_argument("--one-filesystem", action="store_true", help="不进入其它文件系统/卷的挂载点")
+    add_throttle_args(p)
+
+
+def add_snapshot_arg(p):
+    p.add_argument("--snapshot", nargs="?", const="", default=None, metavar="FILE",
+                   help="扫描完成后把所有文件写成快照 (供 diff 比较)；不给文件名时存到默认位置")
+
+
+def add_metrics_arg(p):
+    p.add_argument("--metrics-file", metavar="FILE",
+                   help="结束后把结果写成 Prometheus 文本格式 (node_exporter textfile collector)，原子替换；多个命令可共用一个文件")
+
+
+def add_throttle_args(p):
+    p.add_argument("--throttle", action="store_true", help="低负载模式：按系统负载自动降低并发并插入等待")
+    p.add_argument("--max-cpu", type=int, default=70, metavar="PCT", help="低负载模式的 CPU 上限 (%%)，默认 70")
+    p.add_argument("--max-mem", type=int, default=90, metavar="PCT", help="低负载模式的内存上限 (%%)，默认 90")
+    p.add_argument("--max-io", type=int, default=60, metavar="PCT", help="低负载模式的 I/O 压力上限 (%%)，默认 60")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cleaner_cli", description="C盘深度清理专家 命令行版 (JSON Lines 输出)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("scan-junk", help="扫描系统垃圾目标")
+    p.add_argument("--index", action="store_true", help="使用增量索引")
+    add_walk_args(p)
+    add_metrics_arg(p)
+    p.set_defaults(func=cmd_scan_junk)
+
+    p = sub.add_parser("scan-large", help="搜索大文件")
+    p.add_argument("path")
+    p.add_argument("--min-mb", type=float, default=100, help="最小占用空间 (MB，按实际分配大小)，默认 100")
+    p.add_argument("--top", type=int, default=0, help="只保留最大的 N 个，0 为全部")
+    p.add_argument("--index", action="store_true", help="使用增量索引")
+    p.add_argument("--progress", action="store_true", help="每秒向 stderr 输出进度和预计剩余时间")
+    add_snapshot_arg(p)
+    add_rule_args(p)
+    add_walk_args(p)
+    add_metrics_arg(p)
+    p.set_defaults(func=cmd_scan_large)
+
+    p = sub.add_parser("scan-dirs", help="按目录统计累计占用")
+    p.add_argument("path")
+    p.add_argument("--depth", type=int, default=2, help="输出的目录层数，默认 2")
+    p.add_argument("--top", type=int, default=10, help="每个目录最多输出的子目录数，默认 10")
+    p.add_argument("--index", action="store_true", help="使用增量索引 (不应用排除规则)")
+    add_snapshot_arg(p)
+    add_rule_args(p)
+    add_walk_args(p)
+    add_metrics_arg(p)
+    p.set_defaults(func=cmd_scan_dirs)
+
+    p = sub.add_parser("scan-dupes", help="查找重复文件")
+    p.add_argument("path")
+    p.add_argument("--min-mb", type=float, default=1, help="只比较不小于该大小的文件 (MB)，默认 1")
+    add_rule_args(p)
+    add_walk_args(p)
+    add_metrics_arg(p)
+    p.set_defaults(func=cmd_scan_dupes)
+
+    p = sub.add_parser("estimate", help="限时抽样估算目录大小 (给出大致范围)")
+    p.add_argument("paths", nargs="*", help="默认为各垃圾目标")
+    p.add_argument("--budget", type=float, default=1.0, help="每个路径的估算时间 (秒)，默认 1")
+    p.add_argument("--refine", action="store_true", help="估算后再逐个精确统计")
+    add_walk_args(p)
+    p.set_defaults(func=cmd_estimate)
+
+    p = sub.add_parser("diff", help="比较两次扫描快照，列出增长/缩减最多的目录")
+    p.add_argument("old", nargs="?", help="旧快照文件")
+    p.add_argument("new", nargs="?", help="新快照文件")
+    p.add_argument("--root", help="不给文件时取该目录在默认位置最近的两次快照")
+    p.add_argument("--top", type=int, default=20, help="增长和缩减各列出多少个目录，默认 20")
+    p.add_argument("--depth", type=int, default=None,
+                   help="只看前几层目录；默认不限层数，但变化几乎全部来自某个子目录的父目录不单独列出")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("trends", help="根据历次快照列出增长最快的目录和清理后很快回涨的缓存")
+    p.add_argument("path", help="扫描根目录 (默认位置下的快照自动收录)")
+    p.add_argument("--add", action="append", default=[], metavar="SNAPSHOT", help="另外收录的快照文件 (可重复)")
+    p.add_argument("--top", type=int, default=20, help="列出多少个增长最快的目录，默认 20")
+    p.add_argument("--days", type=float, default=0, help="只看最近多少天的快照，默认 0 (全部)")
+    p.add_argument("--min-runs", type=int, default=3, help="至少出现在这么多次快照里的目录才计算增长速度，默认 3")
+    p.set_defaults(func=cmd_trends)
+
+    p = sub.add_parser("watch", help="监视目录变化，持续输出最新总量")
+    p.add_argument("paths", nargs="*", help="默认为各垃圾目标")
+    p.add_argument("--poll", action="store_true", help="不用系统通知接口，改为定时轮询")
+    p.add_argument("--debounce", type=float, default=1.0, help="最后一次变化后等待多少秒再汇总，默认 1")
+    p.add_argument("--duration", type=float, default=0, help="监视多少秒后退出，默认 0 (直到 Ctrl+C)")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("clean", help="清理指定路径")
+    p.add_argument("paths", nargs="*")
+    p.add_argument("--stdin", action="store_true", help="从 stdin 读取扫描结果 (JSON Lines) 中的 path")
+    p.add_argument("--all", action="store_true", help="配合 --stdin，连默认不勾选的条目 (含全部大文件、没有 selected 字段的记录) 也清理")
+    p.add_argument("--mode", choices=["junk", "large"], default=None,
+                   help="junk: 清空目录内容保留目录；large: 删除路径本身 (命令行给出的路径默认 large)。"
+                        "--stdin 时按每条记录的类型决定，给出 --mode 则只清理该类型的记录")
+    p.add_argument("--backup", help="删除前备份到该目录")
+    p.add_argument("--permanent", action="store_true", help="直接删除而不是移入回收站 (非 Windows 必须指定)")
+    p.add_argument("--min-age-days", type=float, default=None,
+                   help="junk 模式只删除这么多天内没有修改/访问过的文件 (默认取扫描结果里各目标的设置)")
+    add_throttle_args(p)
+    add_metrics_arg(p)
+    p.set_defaults(func=cmd_clean)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    stop = threading.Event()
+
+    def on_sigint(signum, frame):
+        # 第一次 Ctrl+C 只通知扫描线程尽快退出，命令照常输出已有结果和汇总；再按一次立即中断
+        stop.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        sys.stderr.write("正在停止，再按一次 Ctrl+C 立即退出\n")
+
+    try: previous = signal.signal(signal.SIGINT, on_sigint)
+    except ValueError: previous = None   # 不在主线程 (如被其它程序调用) 时无法安装
+    try:
+        args.func(args, stop)
+    except KeyboardInterrupt:
+        stop.set()
+        return 130
+    finally:
+        if previous is not None: signal.signal(signal.SIGINT, previous)
+    return 130 if stop.is_set() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
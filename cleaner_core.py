@@ -0,0 +1,1153 @@
+"""C盘深度清理专家 - 无界面核心：目录遍历、大小统计、扫描索引、风险评估与清理。
+
+图形界面 (cleaner.py) 和命令行 (cleaner_cli.py) 共用本模块，不依赖 tkinter。
+"""
+import os
+import shutil
+import threading
+import ctypes
+from ctypes import wintypes
+import time
+import stat
+import heapq
+import json
+import math
+import random
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque, namedtuple
+
+# ==========================================
+# Windows API 定义 (Shell)
+# ==========================================
+# 回收站相关
+FILEOP_FLAGS = wintypes.WORD
+class SHFILEOPSTRUCT(ctypes.Structure):
+    _pack_ = 8
+    _fields_ = [
+        ("hwnd", wintypes.HWND),
+        ("wFunc", wintypes.UINT),
+        ("pFrom", wintypes.LPCWSTR),
+        ("pTo", wintypes.LPCWSTR),
+        ("fFlags", FILEOP_FLAGS),
+        ("fAnyOperationsAborted", wintypes.BOOL),
+        ("hNameMappings", wintypes.LPVOID),
+        ("lpszProgressTitle", wintypes.LPCWSTR),
+    ]
+
+FO_DELETE = 3
+FOF_ALLOWUNDO = 0x40
+FOF_NOCONFIRMATION = 0x10
+FOF_NOERRORUI = 0x0400
+FOF_SILENT = 0x0004
+
+# 索引、规则等数据文件存放目录
+APP_DIR = os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser("~"), "SafeDiskCleaner")
+
+# 垃圾扫描时同时统计的目标数，每个目标内部还有自己的 ParallelSizer 线程
+JUNK_SCAN_WORKERS = 4
+
+def send_to_recycle_bin(path):
+    if not os.path.exists(path): return 0
+    pFrom = os.path.abspath(path) + "\0\0"
+    fileop = SHFILEOPSTRUCT()
+    fileop.wFunc = FO_DELETE
+    fileop.pFrom = pFrom
+    fileop.fFlags = FOF_ALLOWUNDO | FOF_NOCONFIRMATION | FOF_NOERRORUI | FOF_SILENT
+    result = ctypes.windll.shell32.SHFileOperationW(ctypes.byref(fileop))
+    return result == 0
+
+# 磁盘分配大小相关
+INVALID_FILE_SIZE = 0xFFFFFFFF
+_cluster_cache = {}
+
+if os.name == "nt":
+    # 返回值是无符号 DWORD：按默认的 c_int 解释时 2 GiB 以上的低 32 位会变成负数，也永远不等于 INVALID_FILE_SIZE
+    _GetCompressedFileSizeW = ctypes.WinDLL("kernel32", use_last_error=True).GetCompressedFileSizeW
+    _GetCompressedFileSizeW.restype = wintypes.DWORD
+    _GetCompressedFileSizeW.argtypes = [wintypes.LPCWSTR, ctypes.POINTER(wintypes.DWORD)]
+
+def cluster_size(path):
+    """path 所在卷的簇大小 (字节)，按盘符缓存；非 Windows 或查询失败返回 4096。"""
+    if os.name != "nt": return 4096
+    root = os.path.splitdrive(os.path.abspath(path))[0] + "\\"
+    if root not in _cluster_cache:
+        spc, bps, free, total = wintypes.DWORD(), wintypes.DWORD(), wintypes.DWORD(), wintypes.DWORD()
+        ok = ctypes.windll.kernel32.GetDiskFreeSpaceW(root, ctypes.byref(spc), ctypes.byref(bps), ctypes.byref(free), ctypes.byref(total))
+        _cluster_cache[root] = spc.value * bps.value if ok else 4096
+    return _cluster_cache[root]
+
+def allocated_size(st, path, cluster):
+    """文件实际占用的磁盘空间。
+    Linux/macOS 直接用 st_blocks；Windows 对压缩/稀疏文件调用 GetCompressedFileSizeW，
+    普通文件按簇大小向上取整 (零碎小文件的簇浪费也算进去)。"""
+    blocks = getattr(st, "st_blocks", None)
+    if blocks is not None: return blocks * 512
+    size = st.st_size
+    if getattr(st, "st_file_attributes", 0) & (stat.FILE_ATTRIBUTE_COMPRESSED | stat.FILE_ATTRIBUTE_SPARSE_FILE):
+        high = wintypes.DWORD()
+        # 低 32 位恰好是 0xFFFFFFFF 时要靠错误码区分成功与失败，先清零
+        ctypes.set_last_error(0)
+        low = _GetCompressedFileSizeW(path, ctypes.byref(high))
+        if low != INVALID_FILE_SIZE or ctypes.get_last_error() == 0: size = (high.value << 32) + low
+    return -(-size // cluster) * cluster
+
+def is_admin():
+    try: return ctypes.windll.shell32.IsUserAnAdmin()
+    except: return False
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024: return f"{size:.2f} {unit}"
+        size /= 1024
+    return f"{size:.2f} TB"
+
+# ==========================================
+# 目录遍历 (垃圾扫描与大文件搜索共用)
+# ==========================================
+# 遍历记录：目录的 size 恒为 0，由调用方按需累加。size 为逻辑大小，alloc 为实际分配的磁盘空间。
+# nlink/dev/ino 用于硬链接去重，只有 link_info=True 时在 Windows 上才是准确值；
+# touched 为修改/访问/创建 (Linux 上是元数据变更) 时间中最晚的一个，用于按时间筛选垃圾文件
+Entry = namedtuple("Entry", "path size mtime is_dir alloc nlink dev ino touched", defaults=(0, 1, 0, 0, 0.0))
+
+# 目录联接 (junction) 和卷挂载点在 Windows 上是带重解析标记的目录，DirEntry.is_symlink() 认不出来
+_LINK_TAGS = (getattr(stat, "IO_REPARSE_TAG_MOUNT_POINT", 0xA0000003), getattr(stat, "IO_REPARSE_TAG_SYMLINK", 0xA000000C))
+
+def is_link_entry(e):
+    """DirEntry 是否为符号链接、目录联接或卷挂载点 (只用缓存的 lstat 数据)"""
+    if e.is_symlink(): return True
+    if os.name != "nt": return False
+    st = e.stat(follow_symlinks=False)
+    return bool(st.st_file_attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT) and st.st_reparse_tag in _LINK_TAGS
+
+class WalkGuard:
+    """遍历防护：默认不跟随链接，按 (st_dev, st_ino) 记录已进入的目录防止环路，可选不跨文件系统。
+    follow_links=True 时跟随指向目录的链接 (环路靠已访问集合截断)，指向文件的链接仍不计大小。
+    同一个 guard 可以被多个线程、多个根目录共用；skipped 统计被跳过的链接/挂载点/重复目录，
+    samples 保留前几个被跳过的路径便于排查。"""
+
+    MAX_SAMPLES = 20
+
+    def __init__(self, one_filesystem=False, follow_links=False):
+        self.one_filesystem = one_filesystem
+        self.follow_links = follow_links
+        self.devices = set()   # 各根目录所在的设备
+        self.visited = set()
+        self.skipped = {"link": 0, "mount": 0, "loop": 0}
+        self.samples = []
+        self.lock = threading.Lock()
+        # Windows 下不跟随链接时不可能出现环路 (挂载点本身就是重解析目录)，省掉每个目录一次 os.stat
+        self._track = os.name != "nt" or follow_links or one_filesystem
+
+    def start(self, top):
+        """登记一个遍历根目录"""
+        try: st = os.stat(top)
+        except OSError: return
+        with self.lock:
+            self.devices.add(st.st_dev)
+            if self._track: self.visited.add((st.st_dev, st.st_ino))
+
+    def skip(self, kind, path):
+        with self.lock:
+            self.skipped[kind] += 1
+            if len(self.samples) < self.MAX_SAMPLES: self.samples.append((kind, path))
+
+    def admit(self, e):
+        """子目录 e (DirEntry) 是否应当进入"""
+        if is_link_entry(e):
+            if not self.follow_links:
+                self.skip("link", e.path); return False
+            try: st = os.stat(e.path)
+            except OSError: return False
+        elif not self._track: return True
+        else: st = os.stat(e.path) if os.name == "nt" else e.stat(follow_symlinks=False)
+        if self.one_filesystem and st.st_dev not in self.devices:
+            self.skip("mount", e.path); return False
+        key = (st.st_dev, st.st_ino)
+        with self.lock:
+            if key in self.visited: seen = True
+            else: self.visited.add(key); seen = False
+        if seen: self.skip("loop", e.path)
+        return not seen
+
+    def summary(self):
+        """如 "跳过 链接 3 个, 其它文件系统 1 个"；无跳过返回空串"""
+        names = (("link", "链接"), ("mount", "其它文件系统"), ("loop", "重复目录"))
+        parts = [f"{label} {self.skipped[k]} 个" for k, label in names if self.skipped[k]]
+        return "跳过 " + ", ".join(parts) if parts else ""
+
+def iter_dir(path, link_info=False, guard=None, timer=None):
+    """枚举单个目录，逐条产出 Entry。
+    大小和修改时间取自 DirEntry 自带的 stat 数据 (Windows 下随 FindNextFile 一并返回，无额外系统调用)，
+    不再对每个文件单独 os.path.getsize。无权限或已消失的条目直接跳过。
+    Windows 的缓存 stat 里没有链接数和文件号，link_info=True 时对文件补一次 os.stat (较慢)；
+    其它平台 DirEntry.stat() 本身就带这些字段。
+    符号链接 (含目录联接) 一律不跟随，既不计大小也不产出；
+    传入 WalkGuard 时由它决定子目录是否进入，并统计被跳过的链接。
+    timer 为 cleaner_perf.PhaseTimer 时，目录结束后记一次 "stat" (取文件 stat/分配大小) 和 "enumerate" (其余时间)，
+    调用方拿着条目处理的时间不计入；因出错跳过的条目 (含打不开的目录本身) 计入 "errors" 计数。"""
+    full_stat = link_info and os.name == "nt"
+    follow = guard is not None and guard.follow_links
+    clock = time.perf_counter if timer is not None else None
+    if clock: t_begin = clock(); t_stat = t_out = 0.0; n_stat = n_err = 0
+    cluster = cluster_size(path)
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    if e.is_file(follow_symlinks=False):
+                        if clock: t = clock()
+                        st = os.stat(e.path) if full_stat else e.stat(follow_symlinks=False)
+                        ent = Entry(e.path, st.st_size, st.st_mtime, False, allocated_size(st, e.path, cluster),
+                                    st.st_nlink, st.st_dev, st.st_ino, max(st.st_mtime, st.st_atime, st.st_ctime))
+                        if clock: t_stat += clock() - t; n_stat += 1
+                    elif e.is_dir(follow_symlinks=follow):
+                        if guard is not None:
+                            if not guard.admit(e): continue
+                        elif is_link_entry(e): continue
+                        ent = Entry(e.path, 0, e.stat(follow_symlinks=follow).st_mtime, True)
+                    else:
+                        if guard is not None and e.is_symlink(): guard.skip("link", e.path)
+                        continue
+                except OSError:
+                    if clock: n_err += 1
+                    continue
+                if clock: t = clock()
+                yield ent
+                if clock: t_out += clock() - t
+    except OSError:
+        if clock: n_err += 1
+    finally:
+        if clock:
+            if n_err: timer.count("errors", n_err)
+            timer.add("stat", t_stat, n_stat)
+            timer.add("enumerate", clock() - t_begin - t_stat - t_out)
+
+def walk_entries(top, should_stop=None, rollup=None, prune=None, guard=None, throttle=None, progress=None, timer=None):
+    """显式栈实现的单遍深度优先遍历，不受 Python 递归深度限制。
+    产出 top 之下所有文件和目录的 Entry (不含 top 本身)；每进入一个目录检查一次 should_stop。
+    传入 DirRollup 时顺带记录每个目录的直属文件大小/个数，不需要再走一遍。
+    传入 PruneRules (cleaner_rules) 时，命中规则的目录既不产出也不进入，整棵子树跳过。
+    guard 为 WalkGuard，未传入时用默认设置 (不跟随链接、防环路)；throttle 为 cleaner_throttle.Throttle，每个目录前限速一次；
+    progress 为 ScanProgress，每个目录处理完后累加其条目数；timer 为 PhaseTimer，另记限速等待的时间。"""
+    guard = guard or WalkGuard()
+    guard.start(top)
+    stack = [top]
+    while stack:
+        if should_stop and should_stop(): return
+        if throttle:
+            if timer:
+                with timer.phase("throttle"): throttle.gate(should_stop=should_stop)
+            else: throttle.gate(should_stop=should_stop)
+        d = stack.pop()
+        if rollup: rollup.enter(d)
+        n = 0
+        for ent in iter_dir(d, guard=guard, timer=timer):
+            n += 1
+            if ent.is_dir:
+                if prune and prune.match(ent.path): continue
+                stack.append(ent.path)
+                if rollup: rollup.add_dir(d, ent.path)
+            elif rollup: rollup.add_file(d, ent.alloc)
+            yield ent
+        if progress: progress.add(n)
+
+# ==========================================
+# 扫描进度 (按上次扫描的条目数或卷的已用 inode 数估计总量)
+# ==========================================
+SCAN_COUNTS_FILE = os.path.join(APP_DIR, "scan_counts.json")
+
+def _counts_key(path):
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+def _load_counts(counts_file):
+    try:
+        with open(counts_file, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def expected_entries(path, counts_file=SCAN_COUNTS_FILE):
+    """预计 path 之下的条目数 (文件+目录)，不知道时返回 None。
+    优先用上次完整扫描同一路径记下的数目；没有记录而 path 是卷的挂载点时，用 statvfs 的已用 inode 数
+    (含硬链接、不计排除规则，只是近似；Windows 没有 statvfs)。"""
+    n = _load_counts(counts_file).get(_counts_key(path))
+    if n: return n
+    if hasattr(os, "statvfs") and os.path.ismount(path):
+        try: st = os.statvfs(path)
+        except OSError: return None
+        used = st.f_files - st.f_ffree
+        if used > 0: return used
+    return None
+
+def record_entries(path, n, counts_file=SCAN_COUNTS_FILE):
+    """记下一次完整扫描的条目数，供下次估计进度"""
+    counts = _load_counts(counts_file)
+    counts[_counts_key(path)] = n
+    try:
+        os.makedirs(os.path.dirname(counts_file), exist_ok=True)
+        tmp = counts_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(counts, f, ensure_ascii=False)
+        os.replace(tmp, counts_file)
+    except OSError: pass
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    if seconds < 60: return f"{seconds} 秒"
+    if seconds < 3600: return f"{seconds // 60} 分 {seconds % 60} 秒"
+    return f"{seconds // 3600} 小时 {seconds % 3600 // 60} 分"
+
+class ScanProgress:
+    """遍历进度：已处理条目数、速度和预计剩余时间。
+    expected 为预计条目数 (None 表示未知，只报速度)；on_update(self) 最多每 interval 秒回调一次，在遍历线程里执行。"""
+
+    def __init__(self, expected=None, on_update=None, interval=0.25):
+        self.expected = expected
+        self.on_update = on_update
+        self.interval = interval
+        self.done = 0
+        self.t0 = time.monotonic()
+        self._next = self.t0 + interval
+
+    def add(self, n):
+        self.done += n
+        if self.on_update:
+            now = time.monotonic()
+            if now >= self._next:
+                self._next = now + self.interval
+                self.on_update(self)
+
+    def rate(self):
+        elapsed = time.monotonic() - self.t0
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def fraction(self):
+        """完成比例；超过预计数目后停在 0.99，直到遍历真正结束"""
+        if not self.expected: return None
+        return min(0.99, self.done / self.expected)
+
+    def eta(self):
+        """预计剩余秒数，不知道时返回 None"""
+        rate = self.rate()
+        if not self.expected or not rate or self.done >= self.expected: return None
+        return (self.expected - self.done) / rate
+
+    def text(self):
+        """如 "已扫描 12345 项 (3456 项/秒)，约 42%，剩余约 1 分 20 秒" """
+        msg = f"已扫描 {self.done} 项 ({self.rate():.0f} 项/秒)"
+        frac = self.fraction()
+        if frac is not None:
+            msg += f"，约 {frac * 100:.0f}%"
+            eta = self.eta()
+            msg += f"，剩余约 {format_duration(eta)}" if eta is not None else "，即将完成"
+        return msg
+
+class DirRollup:
+    """按目录汇总的空间分布 (按实际分配的磁盘空间计)。
+    遍历时记录直属文件，finish() 后自底向上得到每个目录的累计大小和文件数。"""
+
+    def __init__(self, top):
+        self.top = top
+        self.order = []   # 进入目录的先序顺序
+        self.kids = {}    # 目录 -> 子目录列表
+        self.own = {}     # 目录 -> [直属文件字节数, 直属文件个数]
+        self.totals = {}  # 目录 -> (累计字节数, 累计文件数)
+
+    def enter(self, path):
+        self.order.append(path)
+
+    def add_dir(self, parent, path):
+        self.kids.setdefault(parent, []).append(path)
+
+    def add_file(self, parent, size):
+        o = self.own.get(parent)
+        if o is None: self.own[parent] = [size, 1]
+        else: o[0] += size; o[1] += 1
+
+    def finish(self):
+        # 先序列表倒过来即保证子目录先于父目录汇总；中途停止时未进入的子目录按 0 计
+        totals = self.totals
+        for d in reversed(self.order):
+            size, files = self.own.get(d, (0, 0))
+            for k in self.kids.get(d, ()):
+                ks, kf = totals.get(k, (0, 0))
+                size += ks; files += kf
+            totals[d] = (size, files)
+        return self
+
+    def total(self, path):
+        return self.totals.get(path, (0, 0))
+
+    def children(self, path):
+        """子目录 [(path, 字节数, 文件数)]，大的在前"""
+        rows = [(k,) + self.total(k) for k in self.kids.get(path, ())]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows
+
+# ==========================================
+# 并行目录大小统计 (工作窃取线程池)
+# ==========================================
+class ParallelSizer:
+    """多线程统计目录总大小。
+    每个工作线程有自己的目录双端队列：自己从队尾取(深度优先，缓存友好)，
+    空闲时从其它线程队头窃取(拿到的是靠近根部的大子树)，最后合并各线程的累计字节数。
+    should_stop 返回 True 时尽快退出，返回已统计的部分结果。
+    size() 为表观逻辑大小 (每个路径各算一次)；sizes() 额外给出实际磁盘占用：
+    按分配大小计，且按 (st_dev, st_ino) 去重，硬链接到同一物理文件的多个路径只算一次。
+    stale_sizes() 只统计 cutoff 之前最后一次修改/访问的文件，并在同一遍遍历里收集这些文件的路径。
+    guard 为 WalkGuard (线程间共用)，未传入时每次统计用默认设置：不跟随链接、同一目录只统计一次。
+    throttle 为 cleaner_throttle.Throttle 时按系统负载减少同时工作的线程并插入等待。
+    timer 为 PhaseTimer 时各线程的枚举/stat 时间累加记入 (总和可能超过实际耗时)。"""
+
+    def __init__(self, workers=None, should_stop=None, guard=None, throttle=None, timer=None):
+        # 目录枚举是 IO 密集型，scandir 会释放 GIL，线程数可以多于 CPU 核数
+        self.workers = max(1, workers or min(32, (os.cpu_count() or 1) * 4))
+        self.should_stop = should_stop or (lambda: False)
+        self.guard = guard
+        self.throttle = throttle
+        self.timer = timer
+
+    def size(self, path):
+        return self._run(path, False)[0]
+
+    def sizes(self, path):
+        """返回 (表观逻辑字节数, 去重后实际分配的字节数)"""
+        return self._run(path, True)[:2]
+
+    def stale_sizes(self, path, cutoff):
+        """只算 touched 早于 cutoff (时间戳) 的文件，返回 (表观逻辑字节数, 去重后分配字节数, 文件路径列表)"""
+        return self._run(path, True, cutoff)
+
+    def _run(self, path, unique, cutoff=None):
+        n = self.workers
+        queues = [deque() for _ in range(n)]
+        stale = [[] for _ in range(n)]    # cutoff 模式下各线程收集的过期文件
+        totals = [0] * n
+        singles = [0] * n                 # 链接数为 1 的文件的分配大小，必然不重复
+        linked = [dict() for _ in range(n)]  # 链接数 > 1 的文件 (dev, ino) -> 分配大小，最后合并去重
+        pending = [1]  # 已入队但未处理完的目录数，归零即全部完成
+        lock = threading.Lock()
+        done = threading.Event()
+        guard = self.guard or WalkGuard()
+        guard.start(path)
+        queues[0].append(path)
+
+        def steal(idx):
+            for k in range(1, n):
+                try: return queues[(idx + k) % n].popleft()
+                except IndexError: pass
+            return None
+
+        throttle = self.throttle; timer = self.timer
+        halt = lambda: done.is_set() or self.should_stop()
+
+        def worker(idx):
+            own = queues[idx]
+            while not done.is_set():
+                if throttle:
+                    if timer:
+                        with timer.phase("throttle"): throttle.gate(idx, n, halt)
+                    else: throttle.gate(idx, n, halt)
+                try: d = own.pop()
+                except IndexError:
+                    d = steal(idx)
+                    if d is None:
+                        done.wait(0.001)
+                        continue
+                if self.should_stop():
+                    done.set(); break
+                t = 0; single = 0; subs = []
+                seen = linked[idx]; old = stale[idx]
+                for ent in iter_dir(d, unique, guard, timer):
+                    if ent.is_dir: subs.append(ent.path)
+                    else:
+                        if cutoff is not None:
+                            if ent.touched >= cutoff: continue
+                            old.append(ent.path)
+                        t += ent.size
+                        if not unique: continue
+                        if ent.nlink > 1: seen[(ent.dev, ent.ino)] = ent.alloc
+                        else: single += ent.alloc
+                totals[idx] += t; singles[idx] += single
+                # 先登记新子目录再减去当前目录，避免其它线程窃取后提前把计数减到 0
+                with lock:
+                    pending[0] += len(subs) - 1
+                    finished = pending[0] == 0
+                own.extend(subs)
+                if finished: done.set()
+
+        if n == 1:
+            worker(0)
+        else:
+            run = timer.profiled(worker) if timer else worker
+            threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(n)]
+            for th in threads: th.start()
+            for th in threads: th.join()
+        files = [p for part in stale for p in part] if cutoff is not None else None
+        if not unique: return sum(totals), None, files
+        merged = {}
+        for part in linked: merged.update(part)
+        return sum(totals), sum(singles) + sum(merged.values()), files
+
+# ==========================================
+# 抽样估算目录大小 (限时，给出大致范围)
+# ==========================================
+# size 为估计的字节数，stderr 为标准误 (精确结果为 0)；probes 为随机下探次数，dirs 为实际枚举过的目录数；
+# known 为已经 stat 过的文件字节数之和，是真实大小的下限；
+# stratified 为 True 表示整棵树都已枚举、每个目录都有样本，按目录分层外推 (标准误可信)；
+# False 时是几次下探的平均或只有部分目录有样本 (标准误不可信，见 estimate_range)
+Estimate = namedtuple("Estimate", "size stderr probes dirs exact known stratified", defaults=(0, False))
+
+ESTIMATE_PER_DIR = 64     # 每次经过一个目录最多 stat 的文件数，其余按样本均值外推
+ESTIMATE_MAX_DEPTH = 1000
+ESTIMATE_FINISH_MIN_PROBES = 8   # 至少下探这么多次，对目录总数的估计才拿来决定是否直接走完整棵树
+ESTIMATE_SPREAD = 3.0     # 分层外推的结果报告范围取估计值 ± 这么多个标准误 (见 estimate_range)
+ESTIMATE_CHECK_EVERY = 1024  # 枚举单个目录时每读这么多条检查一次时限，超大目录也不会拖过预算
+
+class _DirSample:
+    """估算用的目录缓存：文件列表只枚举一次，已 stat 过的大小记下来，下次抽到同一个文件不再 stat。
+    给出 deadline 时枚举中途到时即停下，partial 为 True (只读到目录的一部分，不能当作完整的目录)。"""
+    __slots__ = ("files", "sizes", "known", "subs", "partial")
+
+    def __init__(self, path, deadline=None):
+        self.files = []; self.subs = []; self.partial = False
+        try:
+            with os.scandir(path) as it:
+                for i, e in enumerate(it):
+                    if deadline is not None and i % ESTIMATE_CHECK_EVERY == ESTIMATE_CHECK_EVERY - 1 and time.monotonic() >= deadline:
+                        self.partial = True; break
+                    try:
+                        if e.is_file(follow_symlinks=False): self.files.append(e)
+                        elif e.is_dir(follow_symlinks=False) and not is_link_entry(e): self.subs.append(e.path)
+                    except OSError: pass
+        except OSError: pass
+        self.sizes = [None] * len(self.files)
+        self.known = 0
+
+    def _size(self, i):
+        size = self.sizes[i]
+        if size is None:
+            try: size = self.files[i].stat(follow_symlinks=False).st_size
+            except OSError: size = 0
+            self.sizes[i] = size; self.known += 1
+        return size
+
+    def own(self, per_dir, rng):
+        """直属文件总字节数的一次估计：文件不多 (或都已 stat 过) 时是精确值，否则每次重新随机抽样外推"""
+        n = len(self.files)
+        if n <= per_dir or self.known == n: return sum(self._size(i) for i in range(n))
+        return sum(self._size(i) for i in rng.sample(range(n), per_dir)) * n / per_dir
+
+def _finish_walk(pending, cache, per_dir, max_dirs, deadline, stop, rng):
+    """把剩下的目录全部枚举，再把文件全部 stat；返回是否走完。
+    stat 分两轮：先按随机顺序给每个目录随机 stat 够 per_dir 个文件，再补其余的，
+    这样目录枚举完之后任何时候到时都能按目录分层外推 (见 _stratified)。
+    枚举过的目录超过 max_dirs (剩余的树比预计的大)、到时间或停止则中途放弃，已枚举的目录和 stat 过的文件仍留在缓存里供下探使用。"""
+    while pending:
+        if len(cache) >= max_dirs or stop() or time.monotonic() >= deadline: return False
+        d = pending.pop()
+        node = cache[d] = _DirSample(d, deadline)
+        pending.update(node.subs)
+        if node.partial: pending.add(d); return False
+    nodes = list(cache.values())
+    rng.shuffle(nodes)
+    rest = []
+    for node in nodes:
+        if stop() or time.monotonic() >= deadline: return False
+        if node.known == len(node.files): continue
+        todo = [i for i, s in enumerate(node.sizes) if s is None]
+        rng.shuffle(todo)
+        first = max(0, per_dir - node.known)
+        rest.append((node, todo[first:]))
+        for i in todo[:first]: node._size(i)
+    for node, todo in rest:
+        for k, i in enumerate(todo):
+            if k % 256 == 0 and (stop() or time.monotonic() >= deadline): return False
+            node._size(i)
+    return True
+
+def _mean_var(vals):
+    """样本均值和样本方差 (只有一个样本时方差取均值的平方，与下探结果的处理一致)"""
+    mean = sum(vals) / len(vals)
+    return mean, sum((x - mean) ** 2 for x in vals) / (len(vals) - 1) if len(vals) > 1 else mean * mean
+
+def _stratified(cache, probes):
+    """整棵树都已枚举时按目录分层外推：各目录未 stat 的文件按本目录样本均值计，还没有样本的目录按全部样本的均值计；
+    标准误按各层的样本方差 (含有限总体校正) 合成；全部 stat 过时就是精确值。"""
+    size = var = 0.0; known = 0; unsampled = 0
+    for node in cache.values():
+        n, k = len(node.files), node.known
+        if k == n: got = sum(node.sizes); known += got; size += got; continue
+        if k == 0: unsampled += n; continue
+        vals = [s for s in node.sizes if s is not None]
+        got = sum(vals); known += got
+        mean, s2 = _mean_var(vals)
+        size += got + (n - k) * mean
+        var += n * n * (1 - k / n) * s2 / k
+    if unsampled:
+        pooled = [s for node in cache.values() for s in node.sizes if s is not None]
+        mean, s2 = _mean_var(pooled)
+        size += unsampled * mean
+        var += unsampled * unsampled * s2 / len(pooled)
+    exact = all(node.known == len(node.files) for node in cache.values())
+    # 还有目录没有样本时，按全部样本均值外推的那部分误差很大 (不同目录的文件大小差得很远)，标准误不可信
+    return Estimate(int(size), math.sqrt(var), probes, len(cache), exact, known, not unsampled)
+
+def estimate_size(top, budget=1.0, per_dir=ESTIMATE_PER_DIR, should_stop=None, rng=None):
+    """在 budget 秒内估算 top 的总字节数 (逻辑大小)，返回 Estimate。
+    做法是反复从根随机下探到叶子 (Knuth 树规模估计)：沿途每层乘上该层的子目录数作为权重，
+    累加各层直属文件大小 (文件多的目录每次重新抽样 per_dir 个)，得到一次无偏估计；
+    多次下探取平均，标准误由各次结果的离散程度给出 (大小分布极不均匀的树上结果右偏，标准误偏乐观，通常是低估)。
+    枚举过的目录和 stat 过的文件都会缓存，越往后下探越快。下探同时估计目录总数，按目前的速度剩余预算的一半
+    就够枚举完剩下的目录时不再下探，改为把剩下的树走完：预算内走完即返回精确值，
+    只枚举完目录、文件没 stat 完时按目录分层外推 (比几次下探准得多)；树比预计的大时最多花掉剩余预算的一半就回到下探。"""
+    rng = rng or random.Random()
+    stop = should_stop or (lambda: False)
+    t0 = time.monotonic(); deadline = t0 + budget
+    cache = {}
+    results = []
+    dir_total = 0.0  # 各次下探对目录总数的估计之和
+    pending = {top}  # 已发现但还没枚举的目录，清空即整棵树都已枚举
+    while True:
+        d = top; weight = 1; total = 0.0; partial = False
+        for _ in range(ESTIMATE_MAX_DEPTH):
+            node = cache.get(d)
+            if node is None:
+                node = cache[d] = _DirSample(d, deadline)
+                if not node.partial: pending.discard(d)
+                pending.update(node.subs)
+            total += weight * node.own(per_dir, rng)
+            dir_total += weight
+            # 到时没读完的目录 (留在 pending 里) 只有一部分条目，这次下探偏小，已有其它结果时不计入
+            if node.partial: partial = True; break
+            if not node.subs: break
+            weight *= len(node.subs)
+            d = rng.choice(node.subs)
+        if not partial or not results: results.append(total)
+        now = time.monotonic()
+        if stop() or now >= deadline: break
+        if not pending or len(results) >= ESTIMATE_FINISH_MIN_PROBES:
+            # 按目前每秒枚举的目录数，剩余预算的一半能再枚举多少
+            affordable = len(cache) * (deadline - now) / max(now - t0, 1e-6) / 2
+            if dir_total / len(results) - len(cache) <= affordable and \
+                    _finish_walk(pending, cache, per_dir, len(cache) + affordable, deadline, stop, rng): break
+
+    # 整棵树都已枚举，且有样本可用 (或根本没有文件)
+    if not pending and (any(node.known for node in cache.values()) or not any(node.files for node in cache.values())):
+        return _stratified(cache, len(results))
+    known = sum(s for node in cache.values() for s in node.sizes if s is not None)
+    n = len(results)
+    mean = sum(results) / n
+    var = sum((x - mean) ** 2 for x in results) / (n - 1) if n > 1 else mean * mean
+    # 已 stat 过的部分是确定的，估计值不应比它还小
+    return Estimate(int(max(mean, known)), math.sqrt(var / n), n, len(cache), False, known)
+
+def estimate_range(est):
+    """估算值的大致范围 (low, high)，下限不低于已经 stat 过的字节数；仍只是参考范围，不是严格的置信区间。
+    分层外推的结果取 ±ESTIMATE_SPREAD 个标准误 (各目录的样本方差偏乐观，比正态近似的 ±1.96 放宽)；
+    只有下探结果时给不出上限，high 为 None：下探结果严重右偏，几次平均可能差出一个数量级，按标准误算的范围经常不含真实值。"""
+    if est.exact: return est.size, est.size
+    if not est.stratified: return est.known, None
+    margin = ESTIMATE_SPREAD * est.stderr
+    return int(max(est.known, est.size - margin)), int(est.size + margin)
+
+def estimate_targets(targets, budget=1.0, should_stop=None, pool_size=JUNK_SCAN_WORKERS, timer=None):
+    """并发估算各垃圾目标，按完成先后产出 (target, Estimate)；不存在的目标估计为 0。
+    timer 为 PhaseTimer 时用于让 cProfile 覆盖估算线程 (估算的耗时由调用方整体计入 "estimate")。"""
+    def run(path):
+        if not path or not os.path.exists(path): return Estimate(0, 0.0, 0, 0, True)
+        return estimate_size(path, budget, should_stop=should_stop)
+    if timer: run = timer.profiled(run)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(pool_size, len(targets)))) as pool:
+        futures = {pool.submit(run, t[2]): t for t in targets}
+        for fut in as_completed(futures):
+            try: est = fut.result()
+            except Exception: est = Estimate(0, 0.0, 0, 0, False)
+            yield futures[fut], est
+
+def format_estimate(est):
+    """如 "≈1.20 GB (约 0.85~1.75 GB)"，括号里是 estimate_range 给出的大致范围；给不出上限时为 "≈1.20 GB (≥0.31 GB)"；
+    精确结果不带前缀"""
+    if est.exact: return format_size(est.size)
+    low, high = estimate_range(est)
+    if high is None: return f"≈{format_size(est.size)} (≥{format_size(low)})"
+    unit = format_size(high).split()[1]
+    scale = 1024 ** ["B", "KB", "MB", "GB", "TB"].index(unit)
+    return f"≈{format_size(est.size)} (约 {low / scale:.2f}~{high / scale:.2f} {unit})"
+
+# ==========================================
+# 前 K 大文件 (固定容量最小堆)
+# ==========================================
+class TopK:
+    """只保留最大的 k 个文件，内存占用 O(k)。堆顶是当前入选的最小文件，
+    新文件不比它大时直接丢弃，所以堆满以后绝大多数文件只需一次比较。"""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def push(self, size, path):
+        """返回 (是否入选, 被挤出的路径)；未挤出任何文件时第二项为 None。"""
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (size, path))
+            return True, None
+        if size <= self.heap[0][0]: return False, None
+        return True, heapq.heapreplace(self.heap, (size, path))[1]
+
+    def items(self):
+        """按大小降序返回 [(size, path)]"""
+        return sorted(self.heap, reverse=True)
+
+# ==========================================
+# 持久化扫描索引 (SQLite，增量重扫)
+# ==========================================
+INDEX_DB = os.path.join(APP_DIR, "scan_index.db")
+
+# 同一个索引库的写入在进程内串行：多个垃圾目标并发 refresh 时，各自只在写一批时短暂持锁，
+# 不会有连接在整个遍历期间占着写事务，让其它目标等到 "database is locked"
+INDEX_BATCH_ROWS = 5000   # refresh 攒够这么多行 (文件 + 目录) 提交一次
+_index_locks = {}
+_index_locks_guard = threading.Lock()
+
+def _index_write_lock(db_path):
+    key = os.path.normcase(os.path.abspath(db_path))
+    with _index_locks_guard: return _index_locks.setdefault(key, threading.Lock())
+
+class ScanIndex:
+    """以路径为键缓存目录/文件的大小与修改时间。
+    重扫时只重新枚举修改时间变化的目录，其余目录直接复用库里的文件合计与子树总量，
+    未变化的目录每个只花一次 stat。
+    注意：文件原地增长不会改变所在目录的修改时间，这种变化要等目录本身变动后才会反映出来。"""
+
+    def __init__(self, db_path=INDEX_DB):
+        self.db_path = db_path
+        self.write_lock = _index_write_lock(db_path)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime REAL, own INTEGER, total INTEGER);
+                CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+                CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, dir TEXT, size INTEGER, mtime REAL);
+                CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+                CREATE INDEX IF NOT EXISTS files_size ON files(size);
+            """)
+            # 旧版索引没有分配大小列，补上后先用逻辑大小占位，目录下次变动时会重新写入
+            if "alloc" not in [r[1] for r in conn.execute("PRAGMA table_info(files)")]:
+                conn.execute("ALTER TABLE files ADD COLUMN alloc INTEGER")
+                conn.execute("UPDATE files SET alloc = size")
+            conn.execute("CREATE INDEX IF NOT EXISTS files_alloc ON files(alloc)")
+            # 按闲置天数筛选用 touched (修改/访问/创建时间中最晚的)，与直接遍历时的口径一致。
+            # 旧版索引没有这一列，无法补算，把所有目录标记为需要重新枚举
+            if "touched" not in [r[1] for r in conn.execute("PRAGMA table_info(files)")]:
+                conn.execute("ALTER TABLE files ADD COLUMN touched REAL")
+                conn.execute("UPDATE dirs SET mtime = -1")
+
+    def _connect(self):
+        # 每次调用独立连接，扫描线程之间互不共享
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _norm(path):
+        return os.path.normpath(os.path.abspath(path))
+
+    @staticmethod
+    def _subtree(path):
+        # path 自身及其所有后代的范围条件 (走主键索引，不用 LIKE)
+        prefix = path.rstrip(os.sep) + os.sep
+        return "(path = ? OR (path >= ? AND path < ?))", (path, prefix, prefix[:-1] + chr(ord(os.sep) + 1))
+
+    def refresh(self, top, should_stop=None, guard=None, throttle=None, timer=None):
+        """把 top 子树同步到索引并返回其总字节数；中途停止时返回已统计的部分。
+        重新枚举的目录按批 (INDEX_BATCH_ROWS 行) 在写锁下提交文件记录，目录汇总最后一次写入；
+        中途停止时已提交的文件记录保留，但这些目录的汇总行仍是旧的修改时间，下次刷新会重新枚举，不会用到不一致的数据。
+        guard 为 WalkGuard、throttle 为 Throttle，都只作用于需要重新枚举的目录；
+        timer 为 PhaseTimer 时记下枚举/stat 以及写库 ("index") 的时间。"""
+        top = self._norm(top)
+        guard = guard or WalkGuard()
+        guard.start(top)
+        cond, args = self._subtree(top)
+        conn = self._connect()
+        try:
+            known = {}; kids_of = {}
+            for path, parent, mtime, own in conn.execute(f"SELECT path, parent, mtime, own FROM dirs WHERE {cond}", args):
+                known[path] = (mtime, own)
+                kids_of.setdefault(parent, []).append(path)
+
+            pending = []; batched = [0]   # 待提交的 (目录, 文件行, 消失的子目录)
+
+            def flush():
+                if not pending: return
+                if timer: t = time.perf_counter()
+                with self.write_lock:
+                    for d, rows, gone in pending:
+                        conn.execute("DELETE FROM files WHERE dir = ?", (d,))
+                        conn.executemany("INSERT OR REPLACE INTO files (path, dir, size, mtime, alloc, touched) VALUES (?, ?, ?, ?, ?, ?)", rows)
+                        for g in gone:
+                            c, a = self._subtree(g)
+                            conn.execute(f"DELETE FROM dirs WHERE {c}", a)
+                            conn.execute(f"DELETE FROM files WHERE {c}", a)
+                    conn.commit()
+                pending.clear(); batched[0] = 0
+                if timer: timer.add("index", time.perf_counter() - t)
+
+            order = []; own_of = {}; mtime_of = {}; children = {}
+            stack = [top]
+            now = time.time()
+            while stack:
+                if should_stop and should_stop(): return sum(own_of.values())
+                d = stack.pop()
+                try: mtime = os.stat(d).st_mtime
+                except OSError: continue
+                old = known.get(d)
+                if old and old[0] == mtime:
+                    own = old[1]; kids = kids_of.get(d, [])
+                else:
+                    own = 0; kids = []; rows = []
+                    if throttle: throttle.gate(should_stop=should_stop)
+                    for ent in iter_dir(d, guard=guard, timer=timer):
+                        if ent.is_dir: kids.append(ent.path)
+                        else: own += ent.size; rows.append((ent.path, d, ent.size, ent.mtime, ent.alloc, ent.touched))
+                    pending.append((d, rows, set(kids_of.get(d, [])) - set(kids)))
+                    batched[0] += len(rows) + 1
+                    if batched[0] >= INDEX_BATCH_ROWS: flush()
+                    # 刚刚被修改过的目录在同一时间戳内可能还会变化，下次强制重新枚举
+                    if now - mtime < 2: mtime = -1
+                order.append(d); own_of[d] = own; mtime_of[d] = mtime; children[d] = kids
+                stack.extend(kids)
+
+            flush()
+            # 先序列表倒过来即保证子目录先于父目录汇总
+            if timer: t = time.perf_counter()
+            totals = {}
+            for d in reversed(order):
+                totals[d] = own_of[d] + sum(totals.get(k, 0) for k in children[d])
+            with self.write_lock:
+                conn.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?)",
+                                 [(d, os.path.dirname(d), mtime_of[d], own_of[d], totals[d]) for d in order])
+                conn.commit()
+            if timer: timer.add("index", time.perf_counter() - t)
+            return totals.get(top, 0)
+        finally:
+            conn.close()
+
+    def update_dirs(self, dirs):
+        """只重新枚举 dirs 里的目录 (监视器报告内容有变化的目录)，不 stat 其余目录。
+        新出现的子目录整棵补进索引，消失的子目录连同子树删掉，大小的变化量逐级加到各祖先的 total 上。
+        不在索引里的目录 (如刚建的) 改为更新其最近的已索引祖先。返回实际更新的目录列表。
+        每个目录用各自的 WalkGuard (防环路的记录只在一次遍历内有效)，链接一律不跟随。"""
+        conn = self._connect()
+        try:
+            def indexed(p):
+                while conn.execute("SELECT 1 FROM dirs WHERE path = ?", (p,)).fetchone() is None:
+                    parent = os.path.dirname(p)
+                    if parent == p: return None
+                    p = parent
+                return p
+            # 已经不存在的目录交给父目录处理
+            targets = {t for t in (indexed(self._norm(d)) for d in dirs) if t}
+            targets = {t if os.path.isdir(t) else os.path.dirname(t) for t in targets}
+            targets = {t for t in (indexed(t) for t in targets) if t}
+        finally:
+            conn.close()
+
+        done = []
+        # 先处理深层目录：父目录里新建的子目录整棵 refresh 后，不会再被当作目标重复计算
+        for d in sorted(targets, key=lambda p: p.count(os.sep), reverse=True):
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT own FROM dirs WHERE path = ?", (d,)).fetchone()
+                if row is None: continue
+                try: mtime = os.stat(d).st_mtime
+                except OSError: continue
+                old_kids = dict(conn.execute("SELECT path, total FROM dirs WHERE parent = ? AND path != ?", (d, d)))
+                own = 0; kids = []; rows = []
+                guard = WalkGuard(); guard.start(d)
+                for ent in iter_dir(d, guard=guard):
+                    if ent.is_dir: kids.append(ent.path)
+                    else: own += ent.size; rows.append((ent.path, d, ent.size, ent.mtime, ent.alloc, ent.touched))
+                delta = own - (row[0] or 0)
+                if time.time() - mtime < 2: mtime = -1
+                with self.write_lock:
+                    conn.execute("DELETE FROM files WHERE dir = ?", (d,))
+                    conn.executemany("INSERT OR REPLACE INTO files (path, dir, size, mtime, alloc, touched) VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    for gone in set(old_kids) - set(kids):
+                        delta -= old_kids[gone] or 0
+                        c, a = self._subtree(gone)
+                        conn.execute(f"DELETE FROM dirs WHERE {c}", a)
+                        conn.execute(f"DELETE FROM files WHERE {c}", a)
+                    conn.execute("UPDATE dirs SET mtime = ?, own = ? WHERE path = ?", (mtime, own, d))
+                    conn.commit()
+            finally:
+                conn.close()
+            # 新子目录由 refresh 单独建索引 (它自己开连接写库)
+            for new in set(kids) - set(old_kids):
+                delta += self.refresh(new)
+            conn = self._connect()
+            try:
+                p = d
+                with self.write_lock:
+                    while True:
+                        cur = conn.execute("UPDATE dirs SET total = total + ? WHERE path = ?", (delta, p))
+                        parent = os.path.dirname(p)
+                        if not cur.rowcount or parent == p: break
+                        p = parent
+                    conn.commit()
+            finally:
+                conn.close()
+            done.append(d)
+        return done
+
+    def total(self, path):
+        """直接读取已索引的子树总量，未索引返回 None。"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT total FROM dirs WHERE path = ?", (self._norm(path),)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def rollup(self, top, r=None):
+        """直接用索引里的数据填充 DirRollup (不访问磁盘)，需先 refresh。"""
+        top = self._norm(top)
+        cond, args = self._subtree(top)
+        if r is None: r = DirRollup(top)
+        r.top = top
+        conn = self._connect()
+        try:
+            for path, parent in conn.execute(f"SELECT path, parent FROM dirs WHERE {cond} ORDER BY path", args):
+                r.enter(path)
+                if path != top: r.add_dir(parent, path)
+            for d, size, files in conn.execute(f"SELECT dir, SUM(alloc), COUNT(*) FROM files WHERE {cond} GROUP BY dir", args):
+                r.own[d] = [size, files]
+        finally:
+            conn.close()
+        return r.finish()
+
+    def files(self, top):
+        """逐条产出 top 之下的所有文件 (path, size, alloc, mtime)，按路径排序，需先 refresh。"""
+        cond, args = self._subtree(self._norm(top))
+        conn = self._connect()
+        try:
+            yield from conn.execute(f"SELECT path, size, alloc, mtime FROM files WHERE {cond} ORDER BY path", args)
+        finally:
+            conn.close()
+
+    def stale_files(self, top, cutoff):
+        """返回 top 之下 touched (修改/访问/创建时间中最晚的) 早于 cutoff 的文件 [(path, size)]，需先 refresh。"""
+        cond, args = self._subtree(self._norm(top))
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT path, size FROM files WHERE touched < ? AND {cond}", (cutoff,) + args).fetchall()
+        finally:
+            conn.close()
+
+    def large_files(self, top, min_size, limit=None):
+        """返回 top 之下分配大小超过 min_size 的文件 [(path, size, alloc, mtime)]，按分配大小降序；limit 限制最多条数。"""
+        cond, args = self._subtree(self._norm(top))
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT path, size, alloc, mtime FROM files WHERE alloc > ? AND {cond} ORDER BY alloc DESC LIMIT ?",
+                                (min_size,) + args + (limit or -1,)).fetchall()
+        finally:
+            conn.close()
+
+# ==========================================
+# 垃圾目标 (单个文件的风险评估见 cleaner_risk)
+# ==========================================
+def junk_targets():
+    """垃圾扫描目标: [(分类, 名称, 路径, 默认勾选, 风险, 最少闲置天数)]
+    最少闲置天数 > 0 的目标只清理这么多天内没有修改/访问过的文件 (正在运行的安装程序刚解压的临时文件不动)，
+    0 表示整个目录清空。"""
+    local_app = os.environ.get('LOCALAPPDATA', '')
+    windir = os.environ.get('WINDIR', r'C:\Windows')
+    program_data = os.environ.get('ProgramData', r'C:\ProgramData')
+    return [
+        ("开发工具", "Pip 缓存", os.path.join(local_app, "pip", "Cache"), True, "🟢 低", 0),
+        ("开发工具", "uv 缓存", os.path.join(local_app, "uv", "cache"), True, "🟢 低", 0),
+        ("系统", "系统临时", os.path.join(windir, 'Temp'), True, "🟢 低", 2),
+        ("系统", "用户临时", os.environ.get('TEMP'), True, "🟢 低", 2),
+        ("系统", "错误报告", os.path.join(program_data, 'Microsoft/Windows/WER'), True, "🟢 低", 7),
+        ("浏览器", "Chrome缓存", os.path.join(local_app, r"Google\Chrome\User Data\Default\Cache\Cache_Data"), True, "🟢 低", 0),
+        ("浏览器", "Edge缓存", os.path.join(local_app, r"Microsoft\Edge\User Data\Default\Cache\Cache_Data"), True, "🟢 低", 0),
+        # 正在下载/等待安装的更新包也在这里
+        ("系统风险", "Win更新包", os.path.join(windir, 'SoftwareDistribution', 'Download'), False, "🟡 中", 10),
+        ("系统风险", "预读取", os.path.join(windir, 'Prefetch'), False, "🟡 中", 0),
+    ]
+
+def risk_tag(risk):
+    """风险文字 -> 列表颜色 tag"""
+    if "高" in risk: return 'danger'
+    if "中" in risk: return 'warn'
+    return 'safe'
+
+# ==========================================
+# 扫描
+# ==========================================
+def age_cutoff(days, now=None):
+    """最少闲置天数 -> 时间戳界限，0 天返回 None (不筛选)"""
+    return (now or time.time()) - days * 86400 if days else None
+
+def scan_junk(targets=None, index=None, should_stop=None, pool_size=JUNK_SCAN_WORKERS, guard=None, throttle=None,
+              timer=None, on_error=None):
+    """并发统计各垃圾目标，按完成先后产出 (target, 表观字节数, 去重后字节数, 过期文件列表)。
+    去重后字节数按 (st_dev, st_ino) 把硬链接只算一次 (uv 缓存等大量使用硬链接)；
+    index 为 ScanIndex 时走增量索引，索引不记录文件号，去重值为 None。
+    带闲置天数的目标在同一遍遍历里按缓存的 stat 时间筛选：大小只算过期文件，并给出这些文件的路径
+    (即清理时的删除范围)；不带的目标文件列表为 None，清理时整个目录清空。
+    停止后仍会产出剩余目标，但其大小只是部分统计。
+    guard 为所有目标共用的 WalkGuard，目标之间互相包含的目录也只统计一次；throttle、timer 同样由所有目标共用。
+    统计出错的目标不产出 (不能当成 0 字节)，改为在调用方线程里回调 on_error(target, 异常)；未传入 on_error 时抛出。"""
+    targets = junk_targets() if targets is None else targets
+    # 调用方中途放弃 (异常、Ctrl+C、break) 时 abandoned 置位，让还在跑的目标尽快退出，排队的目标不再开始
+    abandoned = threading.Event()
+    stop = (lambda: abandoned.is_set() or should_stop()) if should_stop else abandoned.is_set
+    # 多个目标同时统计，总耗时接近最慢的那个目标；线程预算在目标之间平分
+    n_pool = max(1, min(pool_size, len(targets)))
+    workers = max(2, ParallelSizer().workers // n_pool)
+
+    now = time.time()
+
+    def size_target(target):
+        path, cutoff = target[2], age_cutoff(target[5], now)
+        if not path or not os.path.exists(path) or stop(): return 0, 0, None if cutoff is None else []
+        if index:
+            total = index.refresh(path, stop, guard, throttle, timer)
+            if cutoff is None: return total, None, None
+            files = index.stale_files(path, cutoff)
+            return sum(size for _, size in files), None, [p for p, _ in files]
+        sizer = ParallelSizer(workers, stop, guard, throttle, timer)
+        if cutoff is None: return sizer.sizes(path) + (None,)
+        return sizer.stale_sizes(path, cutoff)
+
+    with ThreadPoolExecutor(max_workers=n_pool) as pool:
+        run = timer.profiled(size_target) if timer else size_target
+        futures = {pool.submit(run, t): t for t in targets}
+        try:
+            for fut in as_completed(futures):
+                try: sz, uniq, files = fut.result()
+                except Exception as e:
+                    if on_error is None: raise
+                    on_error(futures[fut], e); continue
+                yield futures[fut], sz, uniq, files
+        finally:
+            abandoned.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def iter_large_files(start_path, min_size, index=None, should_stop=None, limit=None, rollup=None, prune=None, guard=None,
+                     throttle=None, progress=None, snapshot=None, timer=None):
+    """产出 start_path 之下实际占用 (分配大小) 超过 min_size 字节的文件 (path, size, alloc, mtime)。
+    index 为 ScanIndex 时先增量刷新索引再从库里按大小降序取 (limit 限制条数)，否则边遍历边产出。
+    传入 DirRollup 时同一遍遍历顺带统计目录空间分布 (索引模式下由索引数据直接填充)，调用方结束后 finish()。
+    prune 为排除规则：遍历时直接不进入被排除的目录；索引里存的是完整数据，只能在取出结果后过滤。
+    guard 为 WalkGuard，可借此设置不跨文件系统并在结束后读取跳过统计；throttle 为 Throttle；
+    progress 为 ScanProgress (只在直接遍历时计数，索引模式不计)；
+    snapshot 为 cleaner_snapshot.SnapshotWriter，遍历到的所有文件 (不只是大文件) 都写进去，索引模式从库里转存；
+    timer 为 cleaner_perf.PhaseTimer，记录遍历各阶段的耗时。"""
+    if index:
+        index.refresh(start_path, should_stop, guard, throttle, timer)
+        if should_stop and should_stop(): return
+        if rollup: index.rollup(start_path, rollup)
+        if snapshot:
+            for fp, sz, alloc, mtime in index.files(start_path):
+                if not (prune and prune.covers(fp, start_path)): snapshot.add(fp, sz, alloc, mtime)
+        n = 0
+        for fp, sz, alloc, mtime in index.large_files(start_path, min_size, None if prune else limit):
+            if prune and prune.covers(fp, start_path): continue
+            yield fp, sz, alloc, mtime
+            n += 1
+            if limit and n >= limit: return
+        return
+    for e in walk_entries(start_path, should_stop, rollup, prune, guard, throttle, progress, timer):
+        if e.is_dir: continue
+        if snapshot:
+            if timer: t = time.perf_counter()
+            snapshot.add(e.path, e.size, e.alloc, e.mtime)
+            if timer: timer.add("snapshot", time.perf_counter() - t)
+        if e.alloc > min_size: yield e.path, e.size, e.alloc, e.mtime
+
+# ==========================================
+# 清理
+# ==========================================
+def remove_path(path, permanent=False):
+    """默认移入回收站 (仅 Windows)；permanent=True 时直接删除。"""
+    if not permanent:
+        if os.name != "nt": raise OSError("回收站仅支持 Windows，请改用直接删除")
+        return send_to_recycle_bin(path)
+    if os.path.isdir(path) and not os.path.islink(path): shutil.rmtree(path)
+    else: os.remove(path)
+    return True
+
+def stale_files(path, days, should_stop=None):
+    """path 之下 days 天内没有修改/访问过的文件路径 (命令行清理时没有扫描结果可用，单独遍历一次)"""
+    cutoff = age_cutoff(days)
+    return [e.path for e in walk_entries(path, should_stop) if not e.is_dir and (cutoff is None or e.touched < cutoff)]
+
+def recently_touched(path, cutoff):
+    """path 在 cutoff 之后修改/访问过 (或已不存在) 时返回 True；用于删除前复核扫描之后的变化"""
+    try: st = os.lstat(path)
+    except OSError: return True
+    return max(st.st_mtime, st.st_atime, st.st_ctime) >= cutoff
+
+def clean_files(root, files, backup_dir=None, permanent=False, timer=None, cutoff=None):
+    """只删除 root 之下的指定文件 (按闲置天数筛出的删除范围)，删完后移除因此变空的子目录，root 本身保留。
+    cutoff 为闲置时间界限：删除前逐个重新 stat，扫描之后又被修改/访问过的文件跳过 (在备份之前复核，备份读文件会更新访问时间)。
+    备份时按相对路径复制到 backup_dir 下以 root 名称 + 时间命名的目录。返回是否全部删除成功 (跳过的不算失败)。"""
+    root = os.path.normpath(root)
+    t = time.perf_counter()
+    if cutoff is not None:
+        kept = [f for f in files if not recently_touched(f, cutoff)]
+        if timer and len(kept) < len(files): timer.count("recently_touched", len(files) - len(kept))
+        files = kept
+    if backup_dir:
+        dst_root = os.path.join(backup_dir, os.path.basename(root) + "_" + time.strftime("%H%M%S"))
+        for f in files:
+            dst = os.path.join(dst_root, os.path.relpath(f, root))
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(f, dst)
+            except OSError: pass
+        if timer: timer.add("backup", time.perf_counter() - t); t = time.perf_counter()
+    ok = True; parents = set()
+    for f in files:
+        try:
+            ok = remove_path(f, permanent) and ok
+            parents.add(os.path.dirname(f))
+        except OSError: ok = False
+    # 从深到浅尝试删除空目录，非空 (还有新文件) 时 rmdir 失败，保持原样
+    for d in sorted(parents, key=len, reverse=True):
+        while len(d) > len(root) and d.startswith(root + os.sep):
+            try: os.rmdir(d)
+            except OSError: break
+            d = os.path.dirname(d)
+    if timer: timer.add("clean", time.perf_counter() - t, len(files))
+    return ok
+
+def clean_path(path, mode, backup_dir=None, permanent=False, files=None, timer=None, cutoff=None):
+    """清理一个条目：先按需备份，"large" 删除文件本身，"junk" 清空目录内容但保留目录。
+    junk 模式给出 files 时只删除这些文件 (见 clean_files，cutoff 为复核用的闲置时间界限)；
+    给了 cutoff (带闲置天数的目标) 却没有 files 时抛出 ValueError，不能退化成整个目录清空。
+    timer 为 PhaseTimer 时分别记下备份 ("backup") 和删除 ("clean") 的时间。"""
+    if mode == "junk" and files is not None: return clean_files(path, files, backup_dir, permanent, timer, cutoff)
+    if mode == "junk" and cutoff is not None: raise ValueError(f"{path} 只能清理过期文件，但没有删除范围 (未完成精确统计)")
+    if backup_dir:
+        t = time.perf_counter()
+        ts = time.strftime("%H%M%S")
+        dst = os.path.join(backup_dir, os.path.basename(path) + "_" + ts)
+        if os.path.isfile(path): shutil.copy2(path, dst)
+        else: shutil.copytree(path, dst, dirs_exist_ok=True)
+        if timer: timer.add("backup", time.perf_counter() - t)
+
+    t = time.perf_counter()
+    try:
+        if mode=="large": return remove_path(path, permanent)
+        if os.path.isdir(path):
+            ok = True
+            for e in os.scandir(path):
+                try: ok = remove_path(e.path, permanent) and ok
+                except OSError: ok = False
+            return ok
+        return remove_path(path, permanent)
+    finally:
+        if timer: timer.add("clean", time.perf_counter() - t)
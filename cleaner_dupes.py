@@ -0,0 +1,111 @@
+"""C盘深度清理专家 - 重复文件查找
+
+分三级筛选，越往后越贵、候选越少：
+  1. 按大小分组 (遍历时已有 stat 数据，零额外 IO)
+  2. 同大小的文件只读首尾各一块做部分哈希
+  3. 部分哈希仍相同的才在线程池里完整哈希
+"""
+import os
+import hashlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from cleaner_core import walk_entries
+
+BLOCK = 64 * 1024
+CHUNK = 1024 * 1024
+DUPE_WORKERS = 8
+
+# 一组内容完全相同的文件；reclaim 为只保留一份时可回收的字节数
+DupGroup = namedtuple("DupGroup", "size digest paths reclaim")
+
+
+def partial_hash(path, size):
+    """首尾各 BLOCK 字节的哈希；文件不超过两块时等于完整哈希。"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * BLOCK:
+            h.update(f.read())
+        else:
+            h.update(f.read(BLOCK))
+            f.seek(-BLOCK, os.SEEK_END)
+            h.update(f.read(BLOCK))
+    return h.digest()
+
+
+def full_hash(path, should_stop=None):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            if should_stop and should_stop(): return None
+            buf = f.read(CHUNK)
+            if not buf: break
+            h.update(buf)
+    return h.digest()
+
+
+def _hash_groups(groups, fn, workers, should_stop, throttle=None):
+    """groups: {key: [(path, size)]}，对每个文件计算 fn(path, size)，
+    返回 {(size, 哈希): [(path, size)]}，只保留 ≥2 个的组 (同一组内大小必然相同)"""
+    jobs = [(key, path, size) for key, files in groups.items() for path, size in files]
+
+    def run(job):
+        key, path, size = job
+        if should_stop and should_stop(): return job, None
+        if throttle: throttle.gate(should_stop=should_stop)
+        try: return job, fn(path, size)
+        except OSError: return job, None
+
+    out = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (key, path, size), digest in pool.map(run, jobs):
+            if digest is not None: out.setdefault((size, digest), []).append((path, size))
+    return {k: v for k, v in out.items() if len(v) > 1}
+
+
+def _collapse_links(ents):
+    """同一文件的多个硬链接只保留路径最小的一个 (它们共用同一份数据，删掉其中一个回收不了空间)，返回 [(path, size)]。
+    Windows 的遍历记录里没有文件号，对候选文件补一次 os.stat (只有大小撞车的文件才走到这里)。"""
+    seen = set(); out = []
+    for ent in sorted(ents, key=lambda e: e.path):
+        key = (ent.dev, ent.ino)
+        if os.name == "nt":
+            try: st = os.stat(ent.path)
+            except OSError: continue
+            key = (st.st_dev, st.st_ino)
+        if key != (0, 0):
+            if key in seen: continue
+            seen.add(key)
+        out.append((ent.path, ent.size))
+    return out
+
+
+def find_duplicates(top, min_size=1, should_stop=None, workers=DUPE_WORKERS, on_stage=None, prune=None, guard=None,
+                    throttle=None):
+    """返回 top 之下的重复文件组 [DupGroup]，按可回收字节数降序。
+    on_stage(阶段名, 候选文件数) 在每一级开始时回调，便于界面显示进度；prune 为目录排除规则，guard 为 WalkGuard，
+    throttle 为 Throttle (遍历和哈希都受其限速)。互为硬链接的路径只算一份，不会被当成重复文件。"""
+    by_size = {}
+    for ent in walk_entries(top, should_stop, prune=prune, guard=guard, throttle=throttle):
+        if ent.is_dir or ent.size < max(1, min_size): continue
+        by_size.setdefault(ent.size, []).append(ent)
+    if should_stop and should_stop(): return []
+    by_size = {k: _collapse_links(v) for k, v in by_size.items() if len(v) > 1}
+    by_size = {k: v for k, v in by_size.items() if len(v) > 1}
+
+    if on_stage: on_stage("部分哈希", sum(len(v) for v in by_size.values()))
+    by_partial = _hash_groups(by_size, partial_hash, workers, should_stop, throttle)
+
+    # 不超过两块的文件部分哈希就是完整哈希，无需再读
+    done = {k: v for k, v in by_partial.items() if k[0] <= 2 * BLOCK}
+    todo = {k: v for k, v in by_partial.items() if k[0] > 2 * BLOCK}
+    if on_stage: on_stage("完整哈希", sum(len(v) for v in todo.values()))
+    by_full = _hash_groups(todo, lambda p, s: full_hash(p, should_stop), workers, should_stop, throttle)
+    if should_stop and should_stop(): return []
+
+    groups = []
+    for (size, digest), files in list(done.items()) + list(by_full.items()):
+        paths = sorted(p for p, _ in files)
+        groups.append(DupGroup(size, digest.hex(), paths, size * (len(paths) - 1)))
+    groups.sort(key=lambda g: g.reclaim, reverse=True)
+    return groups
@@ -0,0 +1,115 @@
+"""C盘深度清理专家 - Prometheus 指标 (node_exporter 的 textfile collector)
+
+命令行加 --metrics-file 时，每次运行结束把结果写成 Prometheus 文本格式：
+    python cleaner_cli.py scan-junk --metrics-file /var/lib/node_exporter/textfile/sdc.prom
+所有样本都带 command 标签。多个命令可以共用一个文件：写入时只替换本命令的样本，其它命令上次写的原样保留。
+先写同目录下的临时文件 (不以 .prom 结尾，collector 不会读取) 再 os.replace，exporter 不会读到写了一半的文件。
+指标都是 gauge，值为最近一次运行的结果。
+"""
+import os
+import re
+import time
+
+# 指标名 -> (类型, 说明)；输出按这里的顺序
+METRICS = {
+    "sdc_junk_reclaimable_bytes": ("gauge", "各垃圾目标可清理的字节数 (带闲置天数的目标只算过期文件)"),
+    "sdc_junk_reclaimable_unique_bytes": ("gauge", "各垃圾目标可清理的字节数，硬链接只算一次 (增量索引模式无此值)"),
+    "sdc_large_files": ("gauge", "超过大小阈值的文件个数"),
+    "sdc_large_files_bytes": ("gauge", "超过大小阈值的文件实际占用的字节数合计"),
+    "sdc_dir_bytes": ("gauge", "目录累计占用的字节数 (scan-dirs 输出的各层目录)"),
+    "sdc_dupes_groups": ("gauge", "重复文件组数"),
+    "sdc_dupes_reclaimable_bytes": ("gauge", "删除重复副本可回收的字节数"),
+    "sdc_clean_items": ("gauge", "清理的条目数，按结果区分"),
+    "sdc_clean_reclaimed_bytes": ("gauge", "清理成功的条目按扫描结果记录的大小合计 (只有从 stdin 读入扫描结果时才有)"),
+    "sdc_run_entries": ("gauge", "遍历的条目数 (文件+目录)"),
+    "sdc_run_skipped": ("gauge", "跳过的条目数，reason 为 link/mount/loop (遍历规则) 或 error (无权限、已消失等)"),
+    "sdc_run_duration_seconds": ("gauge", "运行耗时 (秒)"),
+    "sdc_run_phase_seconds": ("gauge", "各阶段耗时 (秒)，多线程阶段为各线程累计"),
+    "sdc_run_stopped": ("gauge", "运行被中断时为 1，此时各项结果只是部分统计"),
+    "sdc_run_last_timestamp_seconds": ("gauge", "运行结束的时间 (Unix 时间戳)"),
+}
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? \S+$')
+_COMMAND = re.compile(r'[{,]command="((?:[^"\\]|\\.)*)"')
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if isinstance(value, bool): return "1" if value else "0"
+    if isinstance(value, int): return str(value)
+    return repr(float(value))
+
+
+class RunMetrics:
+    """一次运行的样本；set() 收集，finish() 补上通用的运行指标，write() 合并写出"""
+
+    def __init__(self, command):
+        self.command = command
+        self.samples = []   # (指标名, 标签, 值)
+
+    def set(self, name, value, **labels):
+        if name not in METRICS: raise KeyError(name)
+        self.samples.append((name, labels, value))
+
+    def finish(self, seconds, stopped, skipped=None, timer=None, entries=None):
+        """skipped 为 WalkGuard.skipped (不遍历目录的命令为 None)；timer 为 cleaner_perf.PhaseTimer，
+        取其中各阶段耗时，遍历时另取出错跳过的条目数"""
+        if skipped is not None:
+            reasons = dict(skipped)
+            if timer: reasons["error"] = timer.counters.get("errors", 0)
+            for reason, n in reasons.items(): self.set("sdc_run_skipped", n, reason=reason)
+        if entries is not None: self.set("sdc_run_entries", entries)
+        if timer:
+            for phase, (secs, _) in sorted(timer.phases.items()): self.set("sdc_run_phase_seconds", secs, phase=phase)
+        self.set("sdc_run_duration_seconds", seconds)
+        self.set("sdc_run_stopped", stopped)
+        self.set("sdc_run_last_timestamp_seconds", time.time())
+
+    def lines(self):
+        """本次运行的样本行，按指标名分组 {指标名: [行]}"""
+        out = {}
+        for name, labels, value in self.samples:
+            pairs = [("command", self.command)] + list(labels.items())
+            text = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+            out.setdefault(name, []).append(f"{name}{{{text}}} {_number(value)}")
+        return out
+
+    def render(self, keep=None):
+        """Prometheus 文本格式；keep 为要保留的其它命令的样本行 {指标名: [行]}"""
+        mine = self.lines(); keep = keep or {}
+        out = []
+        for name, (kind, help_text) in METRICS.items():
+            rows = keep.get(name, []) + mine.get(name, [])
+            if not rows: continue
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(rows)
+        return "\n".join(out) + "\n"
+
+    def write(self, path):
+        """合并已有文件里其它命令的样本后原子替换 path"""
+        keep = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    m = _SAMPLE.match(line)
+                    if not m or m.group(1) not in METRICS: continue
+                    c = _COMMAND.search(m.group(2) or "")
+                    if c and c.group(1) != _escape(self.command): keep.setdefault(m.group(1), []).append(line)
+        except OSError: pass
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+                f.write(self.render(keep))
+                f.flush(); os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
@@ -0,0 +1,120 @@
+"""C盘深度清理专家 - 文件风险评估 (大文件、重复文件等所有扫描模式共用)
+
+规则表一次编译，逐个文件只做一次扩展名集合查找和一次按目录缓存的前缀树查找：
+  扩展名    .sys/.dll/.exe/.vhdx 为高，.msi/.iso/.wim 为中
+  受保护路径 %WINDIR% (及 Windows.old、Windows10Upgrade) 为高；按路径分量建前缀树，最深的匹配生效 (可以给子目录开例外)
+最终风险取两者中较高的一级。
+用户规则 (JSON) 默认位于 %LOCALAPPDATA%\\SafeDiskCleaner\\risk_rules.json:
+  {"high_ext": [".pst"], "medium_ext": [], "low_ext": [".exe"],
+   "paths": {"D:\\\\Work": "high", "C:\\\\Windows\\\\Temp": "low"}}
+"""
+import os
+import json
+
+from cleaner_core import APP_DIR
+
+RISK_RULES_FILE = os.path.join(APP_DIR, "risk_rules.json")
+
+LOW, MEDIUM, HIGH = 0, 1, 2
+# 级别 -> (界面文字, 列表颜色 tag)
+LEVELS = [("🟢 低", 'safe'), ("🟡 中", 'warn'), ("🔴 高", 'danger')]
+LEVEL_NAMES = {"low": LOW, "medium": MEDIUM, "high": HIGH}
+
+DEFAULT_EXT = {
+    '.sys': HIGH, '.dll': HIGH, '.exe': HIGH, '.vhdx': HIGH,
+    '.msi': MEDIUM, '.iso': MEDIUM, '.wim': MEDIUM,
+}
+
+
+def default_paths(windir=None):
+    """默认受保护路径：%WINDIR%，以及同一级的 Windows.old (升级前的旧系统) 和 Windows10Upgrade。
+    前缀树按整个路径分量匹配，这两个目录不在 %WINDIR% 之下，要单独列出 (旧的子串匹配 "c:\\windows" 会顺带命中它们)"""
+    windir = windir or os.environ.get('WINDIR', r'C:\Windows')
+    parent = os.path.dirname(os.path.normpath(windir))
+    return {windir: HIGH, windir + ".old": HIGH, os.path.join(parent, "Windows10Upgrade"): HIGH}
+
+
+DEFAULT_PATHS = default_paths()
+
+_LEVEL = object()  # 前缀树节点上存放级别的键
+
+
+def _parts(path):
+    return [p for p in os.path.normcase(os.path.normpath(path)).split(os.sep) if p]
+
+
+class RiskClassifier:
+    def __init__(self, ext_levels=None, path_levels=None):
+        self.ext_levels = dict(DEFAULT_EXT if ext_levels is None else ext_levels)
+        self.trie = {}
+        for path, level in (DEFAULT_PATHS if path_levels is None else path_levels).items():
+            self.protect(path, level)
+        self._dir_cache = {}
+
+    def protect(self, path, level):
+        node = self.trie
+        for part in _parts(path):
+            node = node.setdefault(part, {})
+        node[_LEVEL] = level
+        self._dir_cache = {}
+
+    def dir_level(self, directory):
+        """目录所在受保护路径的级别 (最深匹配)，未命中为 LOW；结果按目录缓存"""
+        level = self._dir_cache.get(directory)
+        if level is not None: return level
+        level = LOW
+        node = self.trie
+        for part in _parts(directory):
+            node = node.get(part)
+            if node is None: break
+            level = node.get(_LEVEL, level)
+        # 缓存只为连续落在同一批目录的文件服务，过大就清空
+        if len(self._dir_cache) > 50000: self._dir_cache = {}
+        self._dir_cache[directory] = level
+        return level
+
+    def level(self, path):
+        directory, _, name = path.rpartition(os.sep)
+        dot = name.rfind('.')
+        ext = name[dot:].lower() if dot > 0 else ''
+        return max(self.ext_levels.get(ext, LOW), self.dir_level(directory))
+
+    def classify(self, path):
+        """返回 (风险文字, tag)"""
+        return LEVELS[self.level(path)]
+
+    def levels_many(self, paths):
+        """批量评估，返回级别列表 (0/1/2)，同目录的文件只查一次前缀树"""
+        ext_get = self.ext_levels.get
+        dir_level = self.dir_level
+        out = []
+        last_dir = None; last_level = LOW
+        for path in paths:
+            directory, _, name = path.rpartition(os.sep)
+            if directory != last_dir:
+                last_dir = directory; last_level = dir_level(directory)
+            dot = name.rfind('.')
+            e = ext_get(name[dot:].lower(), LOW) if dot > 0 else LOW
+            out.append(e if e > last_level else last_level)
+        return out
+
+    def classify_many(self, paths):
+        """批量评估，返回 [(风险文字, tag)]"""
+        return [LEVELS[lv] for lv in self.levels_many(paths)]
+
+
+def load_risk_rules(path=RISK_RULES_FILE):
+    """内置规则加上用户规则文件；文件不存在或格式错误时只用内置规则。"""
+    conf = {}
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f: conf = json.load(f)
+        except (OSError, ValueError): conf = {}
+    ext_levels = dict(DEFAULT_EXT)
+    for key, level in (("high_ext", HIGH), ("medium_ext", MEDIUM), ("low_ext", LOW)):
+        for ext in conf.get(key, []):
+            ext_levels[ext.lower() if ext.startswith('.') else '.' + ext.lower()] = level
+    path_levels = dict(DEFAULT_PATHS)
+    for p, name in conf.get("paths", {}).items():
+        if name in LEVEL_NAMES: path_levels[p] = LEVEL_NAMES[name]
+    return RiskClassifier(ext_levels, path_levels)
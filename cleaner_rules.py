@@ -0,0 +1,99 @@
+"""C盘深度清理专家 - 目录排除 (剪枝) 规则
+
+规则在遍历时按目录生效：命中的目录不会被枚举，整棵子树直接跳过。
+三类规则一次性编译：
+  prefixes  路径前缀，如 C:\\Windows\\WinSxS
+  globs     通配符，整条路径匹配，如 *\\node_modules
+  regexes   正则，search 语义
+规则文件 (JSON) 默认位于 %LOCALAPPDATA%\\SafeDiskCleaner\\prune_rules.json:
+  {"prefixes": [...], "globs": [...], "regexes": [...]}
+"""
+import os
+import re
+import json
+import fnmatch
+from collections import Counter
+
+from cleaner_core import APP_DIR
+
+RULES_FILE = os.path.join(APP_DIR, "prune_rules.json")
+
+# 组件存储，体积巨大且全是硬链接，清理工具不应碰
+DEFAULT_GLOBS = [os.path.join("*", "Windows", "WinSxS")]
+
+
+class PruneRules:
+    """编译后的排除规则。match() 只在目录上调用，返回命中的规则原文或 None；hits 统计各规则命中次数。"""
+
+    def __init__(self, prefixes=(), globs=(), regexes=()):
+        norm = os.path.normcase
+        self.prefixes = [norm(os.path.normpath(p)) for p in prefixes]
+        # 前缀判断用 str.startswith(tuple)，一次调用比对全部前缀
+        self._prefix_exact = set(self.prefixes)
+        self._prefix_tuple = tuple(p.rstrip(os.sep) + os.sep for p in self.prefixes)
+        self.globs = list(globs)
+        # 所有通配符合并成一个正则，用命名分组区分是哪条命中
+        self._glob_re = None
+        if self.globs:
+            parts = [f"(?P<g{i}>{fnmatch.translate(norm(g))})" for i, g in enumerate(self.globs)]
+            self._glob_re = re.compile("|".join(parts))
+        self.regexes = [(r, re.compile(r, re.IGNORECASE if os.name == "nt" else 0)) for r in regexes]
+        self.hits = Counter()
+        self._covered = {}   # covers() 的缓存: (top, 目录) -> 它所在的最外层被排除目录，不在其中为 None
+
+    def __bool__(self):
+        return bool(self.prefixes or self.globs or self.regexes)
+
+    def match(self, path):
+        rule = self._find(path)
+        if rule is not None: self.hits[rule] += 1
+        return rule
+
+    def _find(self, path):
+        p = os.path.normcase(path)
+        if self._prefix_tuple and (p in self._prefix_exact or p.startswith(self._prefix_tuple)):
+            return next(x for x in self.prefixes if p == x or p.startswith(x.rstrip(os.sep) + os.sep))
+        if self._glob_re:
+            m = self._glob_re.match(p)
+            if m: return self.globs[int(m.lastgroup[1:])]
+        for raw, rx in self.regexes:
+            if rx.search(path): return raw
+        return None
+
+    def covers(self, path, top):
+        """path 是否位于 top 之下某个被排除的目录里 (用于索引模式，结果已经取出后再过滤)。
+        与遍历时一样，只有最外层的被排除目录计入 hits，且每个目录只计一次；各目录的结论缓存下来，同一目录下的文件不再重复判断。"""
+        top = os.path.normpath(os.path.abspath(top))
+        d = os.path.dirname(path)
+        chain = []; outer = None
+        while len(d) > len(top):
+            if (top, d) in self._covered: outer = self._covered[top, d]; break
+            chain.append(d)
+            parent = os.path.dirname(d)
+            if parent == d: break
+            d = parent
+        # 从上往下：遍历会停在第一个命中的目录，它下面的目录都不会再被判断
+        for d in reversed(chain):
+            if outer is None and self.match(d) is not None: outer = d
+            self._covered[top, d] = outer
+        return outer is not None
+
+    def summary(self):
+        """命中统计，如 "跳过 3 个目录 (*\\Windows\\WinSxS ×1, ...)"；无命中返回空串"""
+        if not self.hits: return ""
+        detail = ", ".join(f"{rule} ×{n}" for rule, n in self.hits.most_common(5))
+        return f"跳过 {sum(self.hits.values())} 个目录 ({detail})"
+
+
+def load_rules(path=RULES_FILE, prefixes=(), globs=(), regexes=(), defaults=True):
+    """读取规则文件并与参数合并；文件不存在或格式错误时只用参数和默认规则。"""
+    conf = {}
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f: conf = json.load(f)
+        except (OSError, ValueError): conf = {}
+    return PruneRules(
+        list(conf.get("prefixes", [])) + list(prefixes),
+        (DEFAULT_GLOBS if defaults else []) + list(conf.get("globs", [])) + list(globs),
+        list(conf.get("regexes", [])) + list(regexes),
+    )
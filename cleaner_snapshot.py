@@ -0,0 +1,313 @@
+"""C盘深度清理专家 - 扫描快照 (紧凑二进制格式) 与两次扫描之间的差异
+
+文件格式 (版本 1，整数均为小端)：
+  头部   b"SDCSNAP\\0" + 版本 (1 字节) + 元数据长度 (u32) + 元数据 JSON (根目录、创建时间等)
+  数据块 条目数 n (u32) + 压缩后长度 (u32) + zlib 压缩的数据
+         解压后依次为 5 个 n 元素的列：与上一路径的公共前缀长度 (u32)、后缀长度 (u32)、
+         逻辑大小 (i64)、分配大小 (i64)、修改时间 (i64 秒)，最后是所有后缀拼接的字节串
+  结尾块 n = 0，随后是总条目数 (u64) 和总分配大小 (u64)；缺少结尾块说明文件不完整
+路径是相对根目录、以 "/" 分隔的 UTF-8 字节串，全文件按字节序排好；前缀压缩在每个数据块开头重置，
+各块可以独立解码。两个快照按路径归并即可逐条比较，不需要把任何一个整个读进内存。
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import heapq
+import struct
+import tempfile
+from array import array
+
+from cleaner_core import APP_DIR
+
+MAGIC = b"SDCSNAP\0"
+VERSION = 1
+BLOCK = 4096          # 每个数据块的条目数
+SPILL = 200000        # 写入时内存里最多缓存的条目数，超过后排序写成临时分段，结束时归并
+SNAPSHOT_DIR = os.path.join(APP_DIR, "snapshots")
+SNAPSHOT_KEEP = 10    # 默认位置下每个根目录保留的快照数
+
+_U32 = struct.Struct("<I")
+_BLOCK_HEAD = struct.Struct("<II")
+_TRAILER = struct.Struct("<QQ")
+
+
+def _to_le(arr):
+    if sys.byteorder == "big": arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode, data):
+    arr = array(typecode); arr.frombytes(data)
+    if sys.byteorder == "big": arr.byteswap()
+    return arr
+
+
+def _rel_key(path, root, prefix=None):
+    """绝对路径 -> 相对根目录、"/" 分隔的字节串；prefix 为 root 加分隔符，遍历产出的路径直接切片"""
+    rel = path[len(prefix):] if prefix and path.startswith(prefix) else os.path.relpath(path, root)
+    if os.sep != "/": rel = rel.replace(os.sep, "/")
+    return rel.encode("utf-8", "surrogateescape")
+
+
+def _decode(key):
+    return key.decode("utf-8", "surrogateescape")
+
+
+class SnapshotWriter:
+    """按任意顺序 add()，close() 时排序写出。条目超过 spill 个时先排序写成临时分段，最后归并，内存占用有上限。
+    先写到同目录的临时文件，完成后 os.replace，中途出错或 abort() 不会留下半个快照。"""
+
+    def __init__(self, path, root, spill=SPILL, meta=None):
+        self.path = path
+        self.root = os.path.normpath(os.path.abspath(root))
+        self.prefix = self.root.rstrip(os.sep) + os.sep
+        self.spill = spill
+        self.meta = {"root": self.root, "created": time.time(), "version": VERSION}
+        if meta: self.meta.update(meta)
+        self.buf = []
+        self.runs = []   # 临时分段文件
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None: self.close()
+        else: self.abort()
+
+    def add(self, path, size, alloc, mtime):
+        self.buf.append((_rel_key(path, self.root, self.prefix), size, alloc, int(mtime)))
+        self.count += 1
+        if len(self.buf) >= self.spill: self._spill()
+
+    def _spill(self):
+        # 首次扫描时默认目录可能还不存在
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".run", dir=directory)
+        os.close(fd)
+        self.buf.sort()
+        _write_file(tmp, self.meta, self.buf)
+        self.runs.append(tmp); self.buf = []
+
+    def close(self):
+        """写出快照，返回条目数"""
+        self.buf.sort()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        try:
+            if self.runs:
+                readers = [SnapshotReader(r) for r in self.runs]
+                rows = heapq.merge(self.buf, *readers)
+            else:
+                rows = self.buf
+            self.meta["entries"] = self.count
+            _write_file(tmp, self.meta, rows)
+            os.replace(tmp, self.path)
+        finally:
+            self._cleanup(tmp)
+        return self.count
+
+    def abort(self):
+        self._cleanup(self.path + ".tmp")
+
+    def _cleanup(self, tmp):
+        for f in self.runs + [tmp]:
+            try: os.remove(f)
+            except OSError: pass
+        self.runs = []; self.buf = []
+
+
+def _write_file(path, meta, rows):
+    """rows 为已按路径字节序排好的 (key, size, alloc, mtime)"""
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    total = count = 0
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes([VERSION]) + _U32.pack(len(meta_bytes)) + meta_bytes)
+        block = []
+        for row in rows:
+            block.append(row)
+            if len(block) >= BLOCK:
+                total += _write_block(f, block); count += len(block); block = []
+        if block: total += _write_block(f, block); count += len(block)
+        f.write(_BLOCK_HEAD.pack(0, 0) + _TRAILER.pack(count, total))
+
+
+def _write_block(f, block):
+    shared = array('I'); suflen = array('I')
+    sizes = array('q'); allocs = array('q'); mtimes = array('q')
+    parts = []
+    prev = b""
+    for key, size, alloc, mtime in block:
+        n = 0; limit = min(len(prev), len(key))
+        while n < limit and prev[n] == key[n]: n += 1
+        shared.append(n); suflen.append(len(key) - n); parts.append(key[n:])
+        sizes.append(size); allocs.append(alloc); mtimes.append(mtime)
+        prev = key
+    payload = zlib.compress(b"".join([_to_le(shared), _to_le(suflen), _to_le(sizes), _to_le(allocs), _to_le(mtimes)] + parts), 6)
+    f.write(_BLOCK_HEAD.pack(len(block), len(payload)) + payload)
+    return sum(allocs)
+
+
+class SnapshotReader:
+    """按路径字节序逐条产出 (key, size, alloc, mtime)，key 为相对根目录、"/" 分隔的字节串。
+    一次只解压一个数据块；meta 为头部元数据。文件不完整 (没有结尾块) 时迭代结束后抛 ValueError。"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            head = f.read(len(MAGIC) + 1 + _U32.size)
+            if head[:len(MAGIC)] != MAGIC: raise ValueError(f"不是快照文件: {path}")
+            if head[len(MAGIC)] > VERSION: raise ValueError(f"快照版本 {head[len(MAGIC)]} 过新: {path}")
+            meta_len = _U32.unpack_from(head, len(MAGIC) + 1)[0]
+            self.meta = json.loads(f.read(meta_len).decode("utf-8"))
+            self.offset = f.tell()
+        self.root = self.meta.get("root", "")
+        self.entries = None; self.total = None  # 读到结尾块后填上
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while True:
+                head = f.read(_BLOCK_HEAD.size)
+                if len(head) < _BLOCK_HEAD.size: raise ValueError(f"快照不完整: {self.path}")
+                n, length = _BLOCK_HEAD.unpack(head)
+                if n == 0:
+                    self.entries, self.total = _TRAILER.unpack(f.read(_TRAILER.size))
+                    return
+                data = zlib.decompress(f.read(length))
+                w4 = 4 * n; w8 = 8 * n
+                shared = _from_le('I', data[:w4]); suflen = _from_le('I', data[w4:2 * w4])
+                pos = 2 * w4
+                sizes = _from_le('q', data[pos:pos + w8]); allocs = _from_le('q', data[pos + w8:pos + 2 * w8])
+                mtimes = _from_le('q', data[pos + 2 * w8:pos + 3 * w8])
+                pos += 3 * w8
+                prev = b""
+                for i in range(n):
+                    key = prev[:shared[i]] + data[pos:pos + suflen[i]]
+                    pos += suflen[i]
+                    yield key, sizes[i], allocs[i], mtimes[i]
+                    prev = key
+
+    def path_of(self, key):
+        """相对字节串 -> 本机路径"""
+        rel = _decode(key)
+        return os.path.join(self.root, rel.replace("/", os.sep)) if rel != "." else self.root
+
+
+# ==========================================
+# 默认存放位置
+# ==========================================
+def _root_tag(root):
+    # 根目录 -> 可作文件名的标签，如 C:\Users\a -> C_Users_a
+    tag = "".join(c if c.isalnum() else "_" for c in os.path.normpath(os.path.abspath(root))).strip("_")
+    return tag[-80:] or "root"
+
+
+def snapshot_path(root, when=None, directory=SNAPSHOT_DIR):
+    """默认位置下 root 的新快照文件名 (按时间命名到微秒，排序即时间顺序；同一秒内的两次扫描不会互相覆盖)"""
+    when = when or time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(when)) + f"-{int(when % 1 * 1000000):06d}"
+    return os.path.join(directory, f"{_root_tag(root)}_{stamp}.snap")
+
+
+def list_snapshots(root, directory=SNAPSHOT_DIR):
+    """默认位置下 root 的历史快照，按时间先后"""
+    prefix = _root_tag(root) + "_"
+    # 按去掉扩展名的文件名排序：旧版本只到秒的文件名排在同一秒的新文件名之前
+    try: names = sorted((n for n in os.listdir(directory) if n.startswith(prefix) and n.endswith(".snap")), key=lambda n: n[:-5])
+    except OSError: return []
+    # 标签本身可能以另一个根目录的标签开头，再核对一下时间戳部分
+    lengths = (len("YYYYmmdd-HHMMSS.snap"), len("YYYYmmdd-HHMMSS-ffffff.snap"))
+    return [os.path.join(directory, n) for n in names if len(n) - len(prefix) in lengths]
+
+
+def prune_snapshots(root, keep=SNAPSHOT_KEEP, directory=SNAPSHOT_DIR):
+    """默认位置下 root 只保留最近 keep 个快照"""
+    for old in list_snapshots(root, directory)[:-keep or None]:
+        try: os.remove(old)
+        except OSError: pass
+
+
+# ==========================================
+# 差异
+# ==========================================
+class SnapshotDiff:
+    """两个快照的逐目录差异 (按分配大小)。
+    dirs: 相对目录 (字节串，根为 b"") -> [旧大小, 新大小]，已包含所有子目录的合计。"""
+
+    def __init__(self, old_meta, new_meta):
+        self.old_meta = old_meta; self.new_meta = new_meta
+        self.dirs = {}
+        self.added = self.removed = self.changed = self.same = 0
+        self.old_total = self.new_total = 0
+
+    def delta(self, d):
+        old, new = self.dirs[d]
+        return new - old
+
+    def top(self, n=20, grow=True, depth=None, concentrate=0.9):
+        """增长 (grow=True) 或缩减最多的 n 个目录 [(相对目录, 旧, 新)]。
+        某目录的变化有 concentrate 以上来自同一个子目录时不单独列出 (否则列表前面全是一串祖先目录)；
+        depth 限制只看前几层。"""
+        sign = 1 if grow else -1
+        best_child = {}
+        for d in self.dirs:
+            if not d: continue
+            parent = d.rpartition(b"/")[0]
+            v = sign * self.delta(d)
+            if v > best_child.get(parent, 0): best_child[parent] = v
+        out = []
+        for d, (old, new) in self.dirs.items():
+            v = sign * (new - old)
+            # 根目录的变化即 new_total - old_total，不占名额
+            if v <= 0 or not d: continue
+            if depth is not None and d.count(b"/") + 1 > depth: continue
+            if depth is None and best_child.get(d, 0) >= concentrate * v: continue
+            out.append((v, d, old, new))
+        return [(d, old, new) for _, d, old, new in heapq.nlargest(n, out)]
+
+
+def diff_snapshots(old_path, new_path):
+    """按路径归并两个快照，一遍得出每个目录的新旧合计和文件增删改数量"""
+    a = SnapshotReader(old_path); b = SnapshotReader(new_path)
+    res = SnapshotDiff(a.meta, b.meta)
+    own = {}   # 直属目录 -> [旧, 新]，结束后再逐级汇总到祖先
+    ia = iter(a); ib = iter(b)
+    ra = next(ia, None); rb = next(ib, None)
+    last_dir = None; cur = None
+    while ra is not None or rb is not None:
+        if rb is None or (ra is not None and ra[0] < rb[0]):
+            key, old, new = ra[0], ra[2], 0; res.removed += 1; ra = next(ia, None)
+        elif ra is None or rb[0] < ra[0]:
+            key, old, new = rb[0], 0, rb[2]; res.added += 1; rb = next(ib, None)
+        else:
+            key, old, new = ra[0], ra[2], rb[2]
+            if ra[1] != rb[1] or ra[3] != rb[3]: res.changed += 1
+            else: res.same += 1
+            ra = next(ia, None); rb = next(ib, None)
+        res.old_total += old; res.new_total += new
+        # 有序输入里同一目录的文件是连续的，缓存当前目录的累加槽
+        d = key.rpartition(b"/")[0]
+        if d != last_dir:
+            cur = own.get(d)
+            if cur is None: cur = own[d] = [0, 0]
+            last_dir = d
+        cur[0] += old; cur[1] += new
+    # 每个目录的直属合计加到自身和所有祖先上 (目录数远少于文件数)
+    dirs = res.dirs
+    for d, (o, n) in own.items():
+        while True:
+            slot = dirs.get(d)
+            if slot is None: slot = dirs[d] = [0, 0]
+            slot[0] += o; slot[1] += n
+            if not d: break
+            d = d.rpartition(b"/")[0]
+    return res
+
+
+def rel_display(key):
+    """相对目录字节串 -> 显示用文字 (根目录显示为 ".")"""
+    return _decode(key).replace("/", os.sep) if key else "."
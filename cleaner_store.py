@@ -0,0 +1,139 @@
+"""C盘深度清理专家 - 扫描结果列式存储
+
+百万级结果不再以格式化字符串存放在 Treeview 行里，而是按列存进 array：
+  size/alloc  array('q')    mtime  array('d')    risk  array('b')    dir  array('l')
+目录按路径分量驻留：每个目录只存 (父目录号, 分量名)，同一目录下的文件共用一个目录号，
+文件名单独一列。排序和筛选只在这些列上做，界面只取结果的前若干行显示。
+"""
+import os
+import sys
+import heapq
+from array import array
+
+# 可排序的列
+SORT_KEYS = ("size", "alloc", "mtime", "risk", "name", "path", "ext")
+
+
+class ResultStore:
+    """追加写入的结果表，行号即下标；删除只打标记 (alive)，不移动其它行。"""
+
+    def __init__(self):
+        self.size = array('q')
+        self.alloc = array('q')
+        self.mtime = array('d')
+        self.risk = array('b')
+        self.dir = array('l')
+        self.name = []
+        self.alive = bytearray()
+        self.dead = 0
+        # 目录表：dir_parent[i] 为父目录号 (-1 为根)，dir_seg[i] 为该级名称
+        self.dir_parent = array('l')
+        self.dir_seg = []
+        self._dir_child = {}   # (父目录号, 分量名) -> 目录号
+        self._dir_str = {}     # 目录号 -> 完整路径，按需生成
+        self._last = (None, -1)  # 遍历时文件按目录成批到达，缓存上一个目录
+
+    def __len__(self):
+        return len(self.alive) - self.dead
+
+    def _intern_dir(self, directory):
+        last_dir, last_id = self._last
+        if directory == last_dir: return last_id
+        node = -1
+        for seg in directory.split(os.sep):
+            key = (node, seg)
+            nid = self._dir_child.get(key)
+            if nid is None:
+                nid = len(self.dir_seg)
+                self._dir_child[key] = nid
+                self.dir_parent.append(node); self.dir_seg.append(sys.intern(seg))
+            node = nid
+        self._last = (directory, node)
+        return node
+
+    def add(self, path, size, alloc, mtime=0.0, risk=0):
+        """追加一个文件，返回行号"""
+        directory, _, name = path.rpartition(os.sep)
+        self.dir.append(self._intern_dir(directory))
+        self.name.append(name)
+        self.size.append(size); self.alloc.append(alloc); self.mtime.append(mtime); self.risk.append(risk)
+        self.alive.append(1)
+        return len(self.alive) - 1
+
+    def kill(self, row):
+        if self.alive[row]:
+            self.alive[row] = 0; self.dead += 1
+
+    def dir_path(self, d):
+        s = self._dir_str.get(d)
+        if s is None:
+            parts = []; node = d
+            while node >= 0:
+                parts.append(self.dir_seg[node]); node = self.dir_parent[node]
+            s = self._dir_str[d] = os.sep.join(reversed(parts))
+        return s
+
+    def path(self, row):
+        return self.dir_path(self.dir[row]) + os.sep + self.name[row]
+
+    def ext(self, row):
+        name = self.name[row]
+        dot = name.rfind('.')
+        return name[dot:].lower() if dot > 0 else ''
+
+    def rows(self):
+        """所有未删除的行号"""
+        if not self.dead: return list(range(len(self.alive)))
+        alive = self.alive
+        return [i for i in range(len(alive)) if alive[i]]
+
+    def _dir_rank(self):
+        """目录号 -> 按完整路径排序后的名次 (目录数远少于文件数，排一次很便宜)"""
+        rank = [0] * len(self.dir_seg)
+        for r, d in enumerate(sorted(range(len(rank)), key=self.dir_path)): rank[d] = r
+        return rank
+
+    def _key(self, key):
+        # 先整列转成 list，排序时按下标取值不必每次从 array 装箱
+        if key in ("size", "alloc", "mtime", "risk"): return getattr(self, key).tolist().__getitem__
+        if key == "name": return self.name.__getitem__
+        if key == "ext": return [n[n.rfind('.'):].lower() if n.rfind('.') > 0 else '' for n in self.name].__getitem__
+        raise ValueError(f"不支持的排序列: {key}")
+
+    def sorted_rows(self, key="alloc", reverse=True, limit=None, rows=None):
+        """按某列排序后的行号；limit 远小于总数时用堆只取前 limit 个"""
+        rows = self.rows() if rows is None else rows
+        if key == "path":
+            # 两次稳定排序 (先文件名、再目录名次)，比逐行构造 (目录, 文件名) 元组快
+            rank = self._dir_rank(); dirs = self.dir
+            rows = sorted(rows, key=self.name.__getitem__, reverse=reverse)
+            rows.sort(key=lambda i: rank[dirs[i]], reverse=reverse)
+            return rows[:limit] if limit else rows
+        k = self._key(key)
+        if limit and limit * 8 < len(rows):
+            return (heapq.nlargest if reverse else heapq.nsmallest)(limit, rows, key=k)
+        rows = sorted(rows, key=k, reverse=reverse)
+        return rows[:limit] if limit else rows
+
+    def filter(self, min_alloc=0, max_risk=None, ext=None, under=None, name=None, rows=None):
+        """按条件筛选行号：分配大小下限、风险上限、扩展名、目录前缀、文件名包含的文字 (不区分大小写)"""
+        rows = self.rows() if rows is None else rows
+        if min_alloc:
+            alloc = self.alloc; rows = [i for i in rows if alloc[i] >= min_alloc]
+        if max_risk is not None:
+            risk = self.risk; rows = [i for i in rows if risk[i] <= max_risk]
+        if ext:
+            ext = ext.lower() if ext.startswith('.') else '.' + ext.lower()
+            rows = [i for i in rows if self.ext(i) == ext]
+        if under:
+            prefix = os.path.normcase(os.path.normpath(under))
+            pre_sep = prefix.rstrip(os.sep) + os.sep
+            ok = bytearray(len(self.dir_seg))
+            for d in range(len(self.dir_seg)):
+                p = os.path.normcase(self.dir_path(d))
+                ok[d] = p == prefix or p.startswith(pre_sep)
+            dirs = self.dir; rows = [i for i in rows if ok[dirs[i]]]
+        if name:
+            name = name.lower(); names = self.name
+            rows = [i for i in rows if name in names[i].lower()]
+        return rows
@@ -0,0 +1,210 @@
+"""C盘深度清理专家 - 系统负载读数与扫描限速
+
+负载读数 (CPU / 内存 / I/O 压力，均为 0-100)：
+  Windows  GetSystemTimes + GlobalMemoryStatusEx (纯 WinAPI，无需 psutil)，暂无 I/O 读数
+  Linux    /proc/stat、/proc/meminfo；I/O 取 /proc/pressure/io，内核不支持 PSI 时退回 /proc/diskstats
+Throttle 按读数调节扫描/清理线程：超过上限时减半允许的并发数并在每个目录之间插入等待，
+回落后逐步恢复，尽量在不越线的前提下跑满。
+"""
+import os
+import time
+import threading
+import ctypes
+from ctypes import wintypes
+
+# ==========================================
+# Windows API 定义 (Kernel)
+# ==========================================
+# 1. 内存相关
+class MEMORYSTATUSEX(ctypes.Structure):
+    _fields_ = [
+        ("dwLength", wintypes.DWORD),
+        ("dwMemoryLoad", wintypes.DWORD),
+        ("ullTotalPhys", ctypes.c_ulonglong),
+        ("ullAvailPhys", ctypes.c_ulonglong),
+        ("ullTotalPageFile", ctypes.c_ulonglong),
+        ("ullAvailPageFile", ctypes.c_ulonglong),
+        ("ullTotalVirtual", ctypes.c_ulonglong),
+        ("ullAvailVirtual", ctypes.c_ulonglong),
+        ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+    ]
+    def __init__(self):
+        self.dwLength = ctypes.sizeof(self)
+
+# 2. CPU 相关
+class FILETIME(ctypes.Structure):
+    _fields_ = [("dwLowDateTime", wintypes.DWORD), ("dwHighDateTime", wintypes.DWORD)]
+
+# ==========================================
+# 系统监控类 (纯 WinAPI 实现，无需 psutil)
+# ==========================================
+class SystemMonitor:
+    def __init__(self):
+        self.last_idle = 0
+        self.last_kernel = 0
+        self.last_user = 0
+
+    def get_memory_usage(self):
+        stat = MEMORYSTATUSEX()
+        ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat))
+        return stat.dwMemoryLoad
+
+    def get_cpu_usage(self):
+        idle = FILETIME()
+        kernel = FILETIME()
+        user = FILETIME()
+        ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user))
+
+        def ft_to_int(ft):
+            return (ft.dwHighDateTime << 32) + ft.dwLowDateTime
+
+        idle_time = ft_to_int(idle)
+        kernel_time = ft_to_int(kernel)
+        user_time = ft_to_int(user)
+
+        if self.last_idle == 0:
+            self.last_idle = idle_time
+            self.last_kernel = kernel_time
+            self.last_user = user_time
+            return 0
+
+        usr_diff = user_time - self.last_user
+        ker_diff = kernel_time - self.last_kernel
+        idle_diff = idle_time - self.last_idle
+
+        sys_time = usr_diff + ker_diff
+
+        self.last_idle = idle_time
+        self.last_kernel = kernel_time
+        self.last_user = user_time
+
+        if sys_time == 0: return 0
+        return int((sys_time - idle_diff) * 100 / sys_time)
+
+    def get_io_pressure(self):
+        return 0
+
+# ==========================================
+# Linux 后端 (/proc)
+# ==========================================
+class ProcMonitor:
+    """与 SystemMonitor 相同的接口；CPU 和 I/O 都是距上次调用的区间值，首次调用返回 0。"""
+
+    def __init__(self, proc="/proc"):
+        self.proc = proc
+        self.last_cpu = None    # (忙碌, 总计) jiffies
+        self.last_io = None     # (累计量, 时刻)
+        self.io_source = "pressure" if os.path.exists(os.path.join(proc, "pressure", "io")) else "diskstats"
+
+    def _read(self, name):
+        with open(os.path.join(self.proc, name)) as f: return f.read()
+
+    def get_memory_usage(self):
+        info = {}
+        for line in self._read("meminfo").splitlines():
+            key, _, rest = line.partition(":")
+            info[key] = int(rest.split()[0]) if rest.split() else 0
+        total = info.get("MemTotal", 0)
+        if not total: return 0
+        avail = info.get("MemAvailable", info.get("MemFree", 0) + info.get("Cached", 0))
+        return int((total - avail) * 100 / total)
+
+    def get_cpu_usage(self):
+        # cpu  user nice system idle iowait irq softirq steal ...
+        fields = [int(x) for x in self._read("stat").split("\n", 1)[0].split()[1:]]
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields[:8])
+        last, self.last_cpu = self.last_cpu, (total - idle, total)
+        if last is None or total == last[1]: return 0
+        return int((total - idle - last[0]) * 100 / (total - last[1]))
+
+    def _io_counter(self):
+        if self.io_source == "pressure":
+            # some avg10=.. avg60=.. avg300=.. total=<微秒>
+            line = self._read(os.path.join("pressure", "io")).split("\n", 1)[0]
+            return int(line.rsplit("total=", 1)[1]) / 1e6
+        # 各块设备累计忙碌毫秒数 (第 13 列)，取最忙的一个
+        busy = 0
+        for line in self._read("diskstats").splitlines():
+            parts = line.split()
+            if len(parts) > 12 and not parts[2].startswith(("loop", "ram")):
+                busy = max(busy, int(parts[12]))
+        return busy / 1e3
+
+    def get_io_pressure(self):
+        """区间内因等待 I/O 而停顿的时间占比 (PSI some) 或最忙磁盘的忙碌占比"""
+        try: value = self._io_counter()
+        except (OSError, ValueError, IndexError): return 0
+        now = time.monotonic()
+        last, self.last_io = self.last_io, (value, now)
+        if last is None or now <= last[1]: return 0
+        return max(0, min(100, int((value - last[0]) * 100 / (now - last[1]))))
+
+def system_monitor():
+    """当前平台的负载读数器"""
+    return SystemMonitor() if os.name == "nt" else ProcMonitor()
+
+# ==========================================
+# 限速
+# ==========================================
+class Throttle:
+    """负载上限 (百分比) 之下尽量快地扫描。
+    工作线程每处理一个目录/文件前调用 gate()：最多每 interval 秒采样一次，
+    任一读数超过上限就把 scale (允许的并发比例) 减半、等待时间加倍；全部回落到上限的 90% 以下后
+    scale 每次加 0.25、等待时间减半。多个线程池可以共用同一个 Throttle。"""
+
+    def __init__(self, max_cpu=70, max_mem=90, max_io=60, interval=0.5, max_sleep=1.0, monitor=None):
+        self.limits = {"cpu": max_cpu, "mem": max_mem, "io": max_io}
+        self.interval = interval
+        self.max_sleep = max_sleep
+        self.monitor = monitor or system_monitor()
+        self.scale = 1.0
+        self.delay = 0.0
+        self.load = {"cpu": 0, "mem": 0, "io": 0}
+        self.throttled = 0.0  # 累计等待秒数
+        self.lock = threading.Lock()
+        self.last = 0.0
+        self._sample(force=True)
+
+    def _sample(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last < self.interval: return
+        with self.lock:
+            if not force and now - self.last < self.interval: return
+            self.last = now
+            try:
+                m = self.monitor
+                self.load = {"cpu": m.get_cpu_usage(), "mem": m.get_memory_usage(), "io": m.get_io_pressure()}
+            except Exception:
+                return
+            # 上限为 0 的读数不参与判断
+            over = max((self.load[k] / self.limits[k] for k in self.limits if self.limits[k]), default=0)
+            if over > 1:
+                self.scale = max(0.0, self.scale / 2)
+                self.delay = min(self.max_sleep, max(0.01, self.delay * 2))
+            elif over < 0.9:
+                self.scale = min(1.0, self.scale + 0.25)
+                self.delay = self.delay / 2 if self.delay > 0.01 else 0.0
+
+    def allowed(self, n):
+        """n 个线程里当前允许同时工作的个数 (至少 1 个)"""
+        return max(1, int(n * self.scale + 0.999))
+
+    def gate(self, idx=0, n=1, should_stop=None):
+        """第 idx 个 (共 n 个) 工作线程在处理下一项之前调用。
+        超出允许并发数的线程在这里暂停，直到负载回落或 should_stop；其余线程按当前等待时间睡一下。"""
+        self._sample()
+        waited = 0.0
+        while idx >= self.allowed(n) and not (should_stop and should_stop()):
+            time.sleep(self.interval); waited += self.interval
+            self._sample()
+        if self.delay:
+            time.sleep(self.delay); waited += self.delay
+        if waited:
+            with self.lock: self.throttled += waited
+
+    def summary(self):
+        """如 "各线程累计限速等待 12.5 秒 (CPU 65%, 内存 40%, I/O 10%)"；未等待返回空串"""
+        if not self.throttled: return ""
+        l = self.load
+        return f"各线程累计限速等待 {self.throttled:.1f} 秒 (CPU {l['cpu']}%, 内存 {l['mem']}%, I/O {l['io']}%)"
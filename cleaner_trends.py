@@ -0,0 +1,166 @@
+"""C盘深度清理专家 - 历史快照的增长趋势
+
+每个快照只读一遍：按目录汇总后写进聚合库 (默认 %LOCALAPPDATA%\\SafeDiskCleaner\\trends.db)，
+  runs       每次扫描一行 (根目录、快照文件、时间、总量)
+  dir_sizes  每次扫描 × 每个目录一行 (子树合计)，只存前 TREND_DEPTH 层和任意深度的缓存目录
+之后的查询 (几十次扫描的增长速度、缓存清理后回涨) 都只查这个库，不再打开快照。
+增长速度为各次扫描 (时间, 大小) 的最小二乘斜率，单位 字节/天，直接在 SQL 里用累加和算出。
+"""
+import os
+import sqlite3
+
+from cleaner_core import APP_DIR, junk_targets
+from cleaner_snapshot import SnapshotReader, list_snapshots
+
+TRENDS_DB = os.path.join(APP_DIR, "trends.db")
+TREND_DEPTH = 4
+# 这些名称的目录不论多深都记录，用于判断清理后是否很快又长回来
+CACHE_NAMES = {"cache", "cache_data", "code cache", "gpucache", ".cache", "caches", "__pycache__"}
+# 缩到原来的一半以下视为被清理过，之后回到清理前一半以上视为回涨
+CLEAN_DROP = 0.5
+REGROW_LEVEL = 0.5
+MIN_CACHE_SIZE = 1024 * 1024
+
+
+def junk_paths():
+    return {os.path.normcase(os.path.normpath(t[2])) for t in junk_targets() if t[2]}
+
+
+def is_cache_dir(path, junk=None):
+    """按目录名或垃圾目标路径判断是否为缓存目录；junk 为预先算好的 junk_paths()"""
+    if os.path.basename(path.rstrip("/\\")).lower() in CACHE_NAMES: return True
+    return os.path.normcase(os.path.normpath(path)) in (junk_paths() if junk is None else junk)
+
+
+class TrendIndex:
+    def __init__(self, db_path=TRENDS_DB, depth=TREND_DEPTH):
+        self.db_path = db_path
+        self.depth = depth
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, root TEXT, snapshot TEXT UNIQUE, created REAL, total INTEGER);
+                CREATE INDEX IF NOT EXISTS runs_root ON runs(root, created);
+                CREATE TABLE IF NOT EXISTS dir_sizes (run INTEGER, dir TEXT, size INTEGER, files INTEGER, PRIMARY KEY (run, dir));
+                CREATE INDEX IF NOT EXISTS dir_sizes_dir ON dir_sizes(dir);
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _norm(root):
+        return os.path.normpath(os.path.abspath(root))
+
+    # ---------------- 写入 ----------------
+    def ingest(self, snapshot):
+        """把一个快照汇总进库；已经收录过的返回 False"""
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM runs WHERE snapshot = ?", (os.path.abspath(snapshot),)).fetchone(): return False
+        reader = SnapshotReader(snapshot)
+        root = self._norm(reader.root)
+        own = {}   # 相对目录 (字节串) -> [大小, 文件数]
+        last = None; cur = None
+        for key, _, alloc, _ in reader:
+            d = key.rpartition(b"/")[0]
+            if d != last:
+                cur = own.get(d)
+                if cur is None: cur = own[d] = [0, 0]
+                last = d
+            cur[0] += alloc; cur[1] += 1
+        totals = {}
+        for d, (size, files) in own.items():
+            while True:
+                slot = totals.get(d)
+                if slot is None: slot = totals[d] = [0, 0]
+                slot[0] += size; slot[1] += files
+                if not d: break
+                d = d.rpartition(b"/")[0]
+        rows = []; junk = junk_paths()
+        for d, (size, files) in totals.items():
+            rel = d.decode("utf-8", "surrogateescape")
+            depth = rel.count("/") + 1 if rel else 0
+            if depth <= self.depth or is_cache_dir(os.path.join(root, rel), junk):
+                rows.append((rel, size, files))
+        with self._connect() as conn:
+            cur = conn.execute("INSERT INTO runs (root, snapshot, created, total) VALUES (?, ?, ?, ?)",
+                               (root, os.path.abspath(snapshot), reader.meta.get("created", 0), totals.get(b"", [0])[0]))
+            run = cur.lastrowid
+            conn.executemany("INSERT INTO dir_sizes VALUES (?, ?, ?, ?)", [(run, rel, size, files) for rel, size, files in rows])
+        return True
+
+    def sync(self, root):
+        """收录默认位置下 root 的所有新快照，返回新收录的个数。
+        快照文件只保留最近几次，库里的汇总不随之删除，趋势可以跨越更长的时间。"""
+        n = 0
+        for s in list_snapshots(root):
+            try:
+                if self.ingest(s): n += 1
+            except (OSError, ValueError): pass
+        return n
+
+    # ---------------- 查询 ----------------
+    def runs(self, root):
+        """root 的各次扫描 [(id, created, total)]，按时间先后"""
+        with self._connect() as conn:
+            return conn.execute("SELECT id, created, total FROM runs WHERE root = ? ORDER BY created", (self._norm(root),)).fetchall()
+
+    def growth(self, root, top=20, since=None, min_runs=3, concentrate=0.9):
+        """增长最快的目录 [(相对目录, 字节/天, 最近大小, 扫描次数)]。
+        斜率 = (nΣts - ΣtΣs) / (nΣt² - (Σt)²)，t 为距首次扫描的天数；出现次数少于 min_runs 的目录不参与。
+        与 SnapshotDiff.top 一样，增长几乎全部来自某个子目录的父目录不单独列出。"""
+        root = self._norm(root)
+        with self._connect() as conn:
+            base = conn.execute("SELECT MIN(created) FROM runs WHERE root = ? AND created >= ?", (root, since or 0)).fetchone()[0]
+            if base is None: return []
+            rows = conn.execute("""
+                SELECT d.dir, COUNT(*) AS n, SUM(t), SUM(d.size), SUM(t * t), SUM(t * d.size)
+                FROM dir_sizes d JOIN (SELECT id, created, (created - ?) / 86400.0 AS t FROM runs WHERE root = ? AND created >= ?) r
+                ON d.run = r.id GROUP BY d.dir HAVING n >= ?""", (base, root, since or 0, min_runs)).fetchall()
+            latest = dict(conn.execute("""
+                SELECT d.dir, d.size FROM dir_sizes d
+                WHERE d.run = (SELECT id FROM runs WHERE root = ? ORDER BY created DESC LIMIT 1)""", (root,)).fetchall())
+        slopes = {}
+        for d, n, st, ss, stt, sts in rows:
+            den = n * stt - st * st
+            if den > 0: slopes[d] = (n * sts - st * ss) / den
+        best_child = {}
+        for d, v in slopes.items():
+            if d: best_child[d.rpartition("/")[0]] = max(best_child.get(d.rpartition("/")[0], 0), v)
+        counts = {r[0]: r[1] for r in rows}
+        out = [(v, d) for d, v in slopes.items() if v > 0 and d and best_child.get(d, 0) < concentrate * v]
+        out.sort(reverse=True)
+        return [(d, v, latest.get(d, 0), counts[d]) for v, d in out[:top]]
+
+    def regrowth(self, root):
+        """缓存目录的清理/回涨记录 [(相对目录, 清理次数, 回涨次数, 平均回涨天数, 最近大小)]。
+        快照里只有文件，清空后的目录不会出现，所以首次出现之后缺席的扫描按 0 计。"""
+        root = self._norm(root)
+        runs = self.runs(root)
+        if len(runs) < 2: return []
+        order = {rid: i for i, (rid, _, _) in enumerate(runs)}
+        series = {}; junk = junk_paths()
+        with self._connect() as conn:
+            for rid, d, size in conn.execute(
+                    "SELECT d.run, d.dir, d.size FROM dir_sizes d JOIN runs r ON d.run = r.id WHERE r.root = ?", (root,)):
+                if d and is_cache_dir(os.path.join(root, d), junk):
+                    series.setdefault(d, {})[order[rid]] = size
+        out = []
+        for d, by_run in series.items():
+            first = min(by_run)
+            sizes = [by_run.get(i, 0) for i in range(first, len(runs))]
+            times = [runs[i][1] for i in range(first, len(runs))]
+            cleans = regrows = 0; days = []
+            for i in range(1, len(sizes)):
+                before = sizes[i - 1]
+                if before < MIN_CACHE_SIZE or sizes[i] >= before * CLEAN_DROP: continue
+                cleans += 1
+                for j in range(i + 1, len(sizes)):
+                    if sizes[j] >= before * REGROW_LEVEL:
+                        regrows += 1; days.append((times[j] - times[i]) / 86400); break
+            if cleans:
+                out.append((d, cleans, regrows, sum(days) / len(days) if days else None, sizes[-1]))
+        out.sort(key=lambda r: (-r[2], -r[4]))
+        return out
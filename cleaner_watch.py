@@ -0,0 +1,347 @@
+"""C盘深度清理专家 - 目录变化监视 (扫描结果实时更新)
+
+三种后端，统一接口：
+  Linux    inotify (ctypes 调 libc)，每个目录一个 watch，新建的子目录自动补上
+  Windows  ReadDirectoryChangesW，每个根目录一个线程，整棵子树一次监视
+  其它     轮询：定时 stat 已知目录的修改时间，只有变化的目录才重新列举
+变化按目录汇总、去抖后回调 on_change(root, dirs)，dirs 为内容有变化的目录集合；
+事件丢失 (队列溢出) 或根目录本身被删/移走时 dirs 为 None，表示整棵树都要重新核对。回调在监视线程里执行。
+"""
+import os
+import sys
+import time
+import struct
+import select
+import threading
+import ctypes
+import ctypes.util
+from ctypes import wintypes
+
+from cleaner_core import is_link_entry
+
+# 同一批变化在最后一个事件之后再等这么久才回调，连续写入时最多攒这么久
+DEBOUNCE = 1.0
+MAX_LATENCY = 5.0
+POLL_INTERVAL = 10.0
+
+
+class _Batcher:
+    """按根目录攒变化目录，去抖后回调"""
+
+    def __init__(self, on_change, debounce=DEBOUNCE, max_latency=MAX_LATENCY):
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self.pending = {}   # root -> [目录集合, 首个事件时刻, 最后事件时刻]
+        self.lock = threading.Lock()
+
+    def add(self, root, d):
+        """d 为 None 表示整棵树"""
+        now = time.monotonic()
+        with self.lock:
+            item = self.pending.get(root)
+            if item is None: item = self.pending[root] = [set(), now, now]
+            if d is None or item[0] is None: item[0] = None
+            else: item[0].add(d)
+            item[2] = now
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        ready = []
+        with self.lock:
+            for root, (dirs, first, last) in list(self.pending.items()):
+                if force or now - last >= self.debounce or now - first >= self.max_latency:
+                    ready.append((root, dirs)); del self.pending[root]
+        for root, dirs in ready:
+            try: self.on_change(root, dirs)
+            except Exception: pass
+
+
+class Watcher:
+    """监视器基类：watch(roots) 开始，stop() 结束；子类实现 _run()"""
+
+    def __init__(self, on_change, debounce=DEBOUNCE):
+        self.batch = _Batcher(on_change, debounce)
+        self.roots = []
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def watch(self, roots):
+        self.roots = [os.path.normpath(os.path.abspath(r)) for r in roots if r and os.path.isdir(r)]
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread: self.thread.join(timeout=2)
+
+    def _root_of(self, path):
+        for r in self.roots:
+            if path == r or path.startswith(r.rstrip(os.sep) + os.sep): return r
+        return None
+
+    def _run(self):
+        raise NotImplementedError
+
+
+# ==========================================
+# 轮询 (所有平台可用)
+# ==========================================
+class PollingWatcher(Watcher):
+    """每 interval 秒对已知目录各 stat 一次；修改时间变化的目录重新列举子目录，发现新目录随之加入。"""
+
+    def __init__(self, on_change, debounce=DEBOUNCE, interval=POLL_INTERVAL):
+        super().__init__(on_change, debounce)
+        self.interval = interval
+
+    @staticmethod
+    def _subdirs(d):
+        out = []
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False) and not is_link_entry(e): out.append(e.path)
+                    except OSError: pass
+        except OSError: pass
+        return out
+
+    def _snapshot(self, root):
+        snap = {}
+        stack = [root]
+        while stack and not self.stopping.is_set():
+            d = stack.pop()
+            try: snap[d] = os.stat(d).st_mtime
+            except OSError: continue
+            stack.extend(self._subdirs(d))
+        return snap
+
+    def _run(self):
+        snaps = {r: self._snapshot(r) for r in self.roots}
+        while not self.stopping.wait(self.interval):
+            for root, snap in snaps.items():
+                kids = {}
+                for k in snap:
+                    if k != root: kids.setdefault(os.path.dirname(k), []).append(k)
+                new = {}
+                stack = [root]
+                while stack and not self.stopping.is_set():
+                    d = stack.pop()
+                    try: mtime = os.stat(d).st_mtime
+                    except OSError:
+                        if d in snap: self.batch.add(root, os.path.dirname(d))
+                        continue
+                    new[d] = mtime
+                    if snap.get(d) != mtime:
+                        self.batch.add(root, d)
+                        stack.extend(self._subdirs(d))
+                    else:
+                        # 目录本身未变，子目录列表沿用上次快照 (消失的子目录会改动父目录的修改时间)
+                        stack.extend(kids.get(d, ()))
+                snaps[root] = new
+            self.batch.flush(force=True)
+
+
+# ==========================================
+# Linux inotify
+# ==========================================
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher(Watcher):
+    """inotify 不支持递归，每个目录单独加 watch；超出 max_user_watches 时该根目录改为轮询兜底。"""
+
+    def __init__(self, on_change, debounce=DEBOUNCE):
+        super().__init__(on_change, debounce)
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        # libc 没有 inotify 时这里抛 AttributeError，由 make_watcher 退回轮询；fd 到监视线程里才打开
+        self._init = self.libc.inotify_init1
+        self.fd = -1
+        self.wds = {}   # wd -> 目录
+        self.fallback = None
+
+    def _add_tree(self, top):
+        """给 top 及其所有子目录加 watch；返回 False 表示 watch 数量用尽"""
+        stack = [top]
+        while stack:
+            d = stack.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(d), WATCH_MASK)
+            if wd < 0:
+                if ctypes.get_errno() == 28: return False  # ENOSPC
+                continue
+            self.wds[wd] = d
+            stack.extend(PollingWatcher._subdirs(d))
+        return True
+
+    def _run(self):
+        # inotify 实例只在监视线程里打开、退出时关闭：watch() 之前就停止的监视器不会留下打开的 fd
+        self.fd = self._init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            # 实例数用尽 (max_user_instances) 等，整体改为轮询
+            self.fallback = PollingWatcher(self.batch.on_change, self.batch.debounce).watch(self.roots)
+            self.stopping.wait(); self.fallback.stop()
+            return
+        try:
+            overflowed = [r for r in self.roots if not self._add_tree(r)]
+            if overflowed:
+                self.fallback = PollingWatcher(self.batch.on_change, self.batch.debounce).watch(overflowed)
+            while not self.stopping.is_set():
+                ready, _, _ = select.select([self.fd], [], [], 0.2)
+                if ready: self._read_events()
+                self.batch.flush()
+            self.batch.flush(force=True)
+        finally:
+            if self.fallback: self.fallback.stop()
+            os.close(self.fd); self.fd = -1
+
+    def _read_events(self):
+        try: buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError: return
+        pos = 0
+        while pos + _EVENT.size <= len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, pos)
+            name = buf[pos + _EVENT.size: pos + _EVENT.size + length].rstrip(b"\0")
+            pos += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                for r in self.roots: self.batch.add(r, None)
+                continue
+            d = self.wds.get(wd)
+            if d is None: continue
+            if mask & IN_IGNORED:
+                self.wds.pop(wd, None); continue
+            root = self._root_of(d)
+            if root is None: continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self.batch.add(root, os.path.dirname(d) if d != root else None); continue
+            self.batch.add(root, d)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(os.path.join(d, os.fsdecode(name)))
+
+
+# ==========================================
+# Windows ReadDirectoryChangesW
+# ==========================================
+FILE_LIST_DIRECTORY = 0x0001
+FILE_SHARE_ALL = 0x1 | 0x2 | 0x4
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_NOTIFY_FILTER = 0x1 | 0x2 | 0x8 | 0x10   # 文件名、目录名、大小、最后写入时间
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+
+class WinWatcher(Watcher):
+    """每个根目录一个线程，同步调用 ReadDirectoryChangesW (bWatchSubtree=TRUE)；stop() 用 CancelIoEx 打断。
+    缓冲区溢出时 (返回 0 字节) 报告整个根目录。"""
+
+    def __init__(self, on_change, debounce=DEBOUNCE):
+        super().__init__(on_change, debounce)
+        self.k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self.k32.CreateFileW.restype = wintypes.HANDLE
+        self.handles = []
+
+    def _run(self):
+        threads = [threading.Thread(target=self._watch_root, args=(r,), daemon=True) for r in self.roots]
+        for th in threads: th.start()
+        while not self.stopping.wait(0.2): self.batch.flush()
+        self.batch.flush(force=True)
+
+    def _watch_root(self, root):
+        h = self.k32.CreateFileW(root, FILE_LIST_DIRECTORY, FILE_SHARE_ALL, None, OPEN_EXISTING,
+                                 FILE_FLAG_BACKUP_SEMANTICS, None)
+        if h in (None, INVALID_HANDLE_VALUE): return
+        self.handles.append(h)
+        buf = ctypes.create_string_buffer(64 * 1024)
+        got = wintypes.DWORD()
+        try:
+            while not self.stopping.is_set():
+                ok = self.k32.ReadDirectoryChangesW(h, buf, len(buf), True, FILE_NOTIFY_FILTER,
+                                                    ctypes.byref(got), None, None)
+                if not ok: break
+                if got.value == 0:
+                    self.batch.add(root, None); continue
+                pos = 0
+                while True:
+                    nxt, _, length = struct.unpack_from("III", buf.raw, pos)
+                    name = buf.raw[pos + 12: pos + 12 + length].decode("utf-16-le")
+                    self.batch.add(root, os.path.dirname(os.path.join(root, name)))
+                    if not nxt: break
+                    pos += nxt
+        finally:
+            self.k32.CloseHandle(h)
+
+    def stop(self):
+        self.stopping.set()
+        for h in self.handles:
+            try: self.k32.CancelIoEx(h, None)
+            except Exception: pass
+        super().stop()
+
+
+def make_watcher(on_change, debounce=DEBOUNCE, polling=False):
+    """当前平台最合适的监视器；原生接口不可用时退回轮询"""
+    if not polling:
+        try:
+            if os.name == "nt": return WinWatcher(on_change, debounce)
+            if sys.platform.startswith("linux"): return InotifyWatcher(on_change, debounce)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(on_change, debounce)
+
+
+# ==========================================
+# 把变化同步到扫描索引
+# ==========================================
+class LiveIndex:
+    """监视若干根目录，把变化增量写入 ScanIndex 并回调 on_update(root, total)。
+    只有报告变化的目录会被重新枚举 (ScanIndex.update_dirs)；事件丢失时对该根目录做一次 refresh
+    (未变化的目录各一次 stat)。根目录互相包含时，变化会同时更新所有受影响的根目录。"""
+
+    def __init__(self, index, on_update, debounce=DEBOUNCE, polling=False):
+        self.index = index
+        self.on_update = on_update
+        self.watcher = make_watcher(self._changed, debounce, polling)
+        self.roots = []
+
+    def start(self, roots, should_stop=None):
+        """先把各根目录同步到索引 (已索引的只是增量核对) 并回调一次当前总量，再开始监视"""
+        self.roots = [os.path.normpath(os.path.abspath(r)) for r in roots if r and os.path.isdir(r)]
+        for r in self.roots:
+            if should_stop and should_stop(): return self
+            self.on_update(r, self.index.refresh(r, should_stop))
+        self.watcher.watch(self.roots)
+        return self
+
+    def stop(self):
+        self.watcher.stop()
+
+    def _changed(self, root, dirs):
+        if dirs is None:
+            self.index.refresh(root); dirs = {root}
+        else:
+            self.index.update_dirs(dirs)
+        for r in self.roots:
+            pre = r.rstrip(os.sep) + os.sep
+            # 变化落在 r 之内，或 r 位于被整体核对的目录之下
+            if any(d == r or d.startswith(pre) or r.startswith(d.rstrip(os.sep) + os.sep) for d in dirs):
+                total = self.index.total(r)
+                if total is not None: self.on_update(r, total)
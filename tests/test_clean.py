@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from cleaner_core import ParallelSizer, clean_files, clean_path, recently_touched
+
+
+class CleanFilesTest(unittest.TestCase):
+    # Linux 上 ctime 总是刚刚 (创建文件即更新)，这里把界限放在将来，再把"扫描后又用过"的文件的访问时间改到界限之后
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "Temp")
+        self.cutoff = time.time() + 1000
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, *parts):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f: f.write(b"x" * 100)
+        return path
+
+    def use(self, path):
+        st = os.stat(path)
+        os.utime(path, (self.cutoff + 50, st.st_mtime))
+
+    def test_recently_touched(self):
+        old = self.write("old.tmp")
+        self.assertFalse(recently_touched(old, self.cutoff))
+        self.use(old)
+        self.assertTrue(recently_touched(old, self.cutoff))
+        self.assertTrue(recently_touched(os.path.join(self.root, "gone.tmp"), self.cutoff))
+
+    def test_age_filter_and_recheck_before_delete(self):
+        old = self.write("a", "old.tmp")
+        fresh = self.write("b", "fresh.tmp")
+        self.use(fresh)
+        _, _, files = ParallelSizer(2).stale_sizes(self.root, self.cutoff)
+        self.assertEqual(files, [old])
+
+        # 扫描之后 old 又被打开过：删除前复核时跳过，不算失败
+        later = self.write("c", "later.tmp")
+        self.use(old)
+        self.assertTrue(clean_files(self.root, [old, later], permanent=True, cutoff=self.cutoff))
+        self.assertTrue(os.path.exists(old))
+        self.assertFalse(os.path.exists(later))
+        # 删空的子目录移除，root 本身保留
+        self.assertFalse(os.path.exists(os.path.join(self.root, "c")))
+        self.assertTrue(os.path.isdir(self.root))
+
+    def test_junk_with_cutoff_but_no_file_list_is_refused(self):
+        keep = self.write("keep.tmp")
+        with self.assertRaises(ValueError):
+            clean_path(self.root, "junk", permanent=True, files=None, cutoff=self.cutoff)
+        self.assertTrue(os.path.exists(keep))
+        # 不带闲置天数的目标仍按原样整个清空
+        self.assertTrue(clean_path(self.root, "junk", permanent=True))
+        self.assertEqual(os.listdir(self.root), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
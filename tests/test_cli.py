@@ -0,0 +1,47 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cleaner_cli.py")
+
+
+class CleanStdinTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.env = dict(os.environ, LOCALAPPDATA=os.path.join(self.tmp, "appdata"))
+        self.big = os.path.join(self.tmp, "data", "sys", "driver.sys")
+        os.makedirs(os.path.dirname(self.big))
+        with open(self.big, "wb") as f: f.write(b"x" * (2 * 1024 * 1024))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def run_cli(self, *args, stdin=""):
+        out = subprocess.run([sys.executable, CLI] + list(args), input=stdin, capture_output=True, text=True, env=self.env, check=True)
+        return [json.loads(line) for line in out.stdout.splitlines()]
+
+    def test_large_records_need_all(self):
+        recs = self.run_cli("scan-large", os.path.join(self.tmp, "data"), "--min-mb", "1")
+        large = [r for r in recs if r["type"] == "large"]
+        self.assertEqual([r["path"] for r in large], [self.big])
+        self.assertFalse(large[0]["selected"])
+        stdin = "".join(json.dumps(r) + "\n" for r in recs)
+
+        self.run_cli("clean", "--stdin", "--permanent", stdin=stdin)
+        self.assertTrue(os.path.exists(self.big))
+        self.run_cli("clean", "--stdin", "--permanent", "--all", stdin=stdin)
+        self.assertFalse(os.path.exists(self.big))
+
+    def test_record_without_selected_is_skipped(self):
+        stdin = json.dumps({"type": "large", "path": self.big}) + "\n"
+        summary = self.run_cli("clean", "--stdin", "--permanent", stdin=stdin)[-1]
+        self.assertEqual(summary["cleaned"], 0)
+        self.assertTrue(os.path.exists(self.big))
+
+
+if __name__ == "__main__":
+    unittest.main()
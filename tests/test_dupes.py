@@ -0,0 +1,37 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from cleaner_dupes import find_duplicates
+
+
+class HardLinkTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f: f.write(data)
+        return path
+
+    def test_hard_links_are_not_duplicates(self):
+        a = self.write("a.bin", b"x" * 5000)
+        os.link(a, os.path.join(self.tmp, "a-link.bin"))
+        self.assertEqual(find_duplicates(self.tmp), [])
+
+    def test_hard_link_counts_once_in_a_real_group(self):
+        a = self.write("a.bin", b"y" * 5000)
+        os.link(a, os.path.join(self.tmp, "b-link.bin"))
+        c = self.write("c.bin", b"y" * 5000)
+        groups = find_duplicates(self.tmp)
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].paths, [a, c])
+        self.assertEqual(groups[0].reclaim, 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
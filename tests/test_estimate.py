@@ -0,0 +1,51 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from cleaner_core import Estimate, estimate_size, estimate_range
+
+
+class EstimateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_small_tree_is_walked_exactly(self):
+        # 文件数超过 per_dir 的目录也要走完，给出精确值而不是抽样外推
+        rng = random.Random(1); total = 0
+        for i in range(30):
+            d = os.path.join(self.tmp, f"d{i % 5}", f"s{i}")
+            os.makedirs(d, exist_ok=True)
+            for j in range(rng.choice([0, 3, 200])):
+                size = int(rng.lognormvariate(6, 2))
+                with open(os.path.join(d, f"f{j}"), "wb") as f: f.truncate(size)
+                total += size
+        est = estimate_size(self.tmp, budget=5.0, rng=random.Random(0))
+        self.assertTrue(est.exact)
+        self.assertEqual(est.size, total)
+        self.assertEqual(estimate_range(est), (total, total))
+
+    def test_range_is_wider_than_normal_and_above_known_bytes(self):
+        low, high = estimate_range(Estimate(1000, 100.0, 20, 10, False, 850, True))
+        self.assertEqual(low, 850)
+        self.assertGreater(high, 1000 + 1.96 * 100)
+
+    def test_probe_only_estimate_has_no_upper_bound(self):
+        self.assertEqual(estimate_range(Estimate(1000, 10.0, 20, 10, False, 300, False)), (300, None))
+
+    def test_deadline_checked_inside_large_directory(self):
+        for i in range(50): open(os.path.join(self.tmp, f"f{i}"), "wb").close()
+        with mock.patch("cleaner_core.ESTIMATE_CHECK_EVERY", 8):
+            est = estimate_size(self.tmp, budget=0.0)
+        # 只读了 8 条就到时，不能当作走完了整个目录
+        self.assertFalse(est.exact)
+        self.assertEqual((est.probes, est.dirs), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+from cleaner_perf import PhaseTimer
+
+
+def busy_in_worker():
+    return sum(i * i for i in range(20000))
+
+
+class WorkerProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_worker_threads_merged_into_profile(self):
+        timer = PhaseTimer("test", profile=True).start()
+        threads = [threading.Thread(target=timer.profiled(busy_in_worker)) for _ in range(3)]
+        for th in threads: th.start()
+        for th in threads: th.join()
+        timer.stop()
+        with open(timer.dump(self.tmp), encoding="utf-8") as f: data = json.load(f)
+        self.assertTrue(any("busy_in_worker" in line for line in data["profile"]["top"]))
+
+    def test_profiled_is_identity_without_profile(self):
+        timer = PhaseTimer("test").start()
+        self.assertIs(timer.profiled(busy_in_worker), busy_in_worker)
+        timer.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
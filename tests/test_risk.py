@@ -0,0 +1,19 @@
+import os
+import unittest
+
+from cleaner_risk import HIGH, LOW, RiskClassifier, default_paths
+
+
+class DefaultPathsTest(unittest.TestCase):
+    def test_windows_siblings_are_protected(self):
+        windir = os.path.abspath(os.path.join("C", "Windows"))
+        risk = RiskClassifier(path_levels=default_paths(windir))
+        top = os.path.dirname(windir)
+        self.assertEqual(risk.level(os.path.join(windir, "System32", "a.txt")), HIGH)
+        self.assertEqual(risk.level(os.path.join(top, "Windows.old", "Users", "a.txt")), HIGH)
+        self.assertEqual(risk.level(os.path.join(top, "Windows10Upgrade", "a.txt")), HIGH)
+        self.assertEqual(risk.level(os.path.join(top, "Users", "a.txt")), LOW)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import os
+import unittest
+
+from cleaner_rules import PruneRules
+
+
+class CoversTest(unittest.TestCase):
+    def test_counts_each_outermost_pruned_dir_once(self):
+        top = os.path.abspath("root")
+        rules = PruneRules(globs=[os.path.join("*", "node_modules")])
+        files = [os.path.join(top, "a", "node_modules", "x.bin"),
+                 os.path.join(top, "a", "node_modules", "pkg", "node_modules", "y.bin"),
+                 os.path.join(top, "a", "node_modules", "z.bin"),
+                 os.path.join(top, "b", "node_modules", "w.bin"),
+                 os.path.join(top, "b", "keep.bin")]
+        self.assertEqual([rules.covers(f, top) for f in files], [True, True, True, True, False])
+        self.assertEqual(rules.hits, {os.path.join("*", "node_modules"): 2})
+
+    def test_top_itself_is_not_checked(self):
+        top = os.path.abspath(os.path.join("root", "node_modules"))
+        rules = PruneRules(globs=[os.path.join("*", "node_modules")])
+        self.assertFalse(rules.covers(os.path.join(top, "x.bin"), top))
+        self.assertFalse(rules.hits)
+
+
+if __name__ == "__main__":
+    unittest.main()
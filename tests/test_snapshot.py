@@ -0,0 +1,50 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from cleaner_snapshot import SnapshotWriter, SnapshotReader, snapshot_path, list_snapshots
+
+
+class SnapshotSpillTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "root")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_spill_round_trip_into_missing_directory(self):
+        # 快照目录还不存在、且条目数超过 spill 时分段写临时文件，合并后应与逐条写入的完全一致
+        out = os.path.join(self.tmp, "not", "yet", "a.snap")
+        rng = random.Random(0)
+        rows = {}
+        for i in range(95):
+            rel = f"d{rng.randint(0, 9)}/sub{rng.randint(0, 3)}/f{i}.bin"
+            rows[rel.encode()] = (rng.randint(0, 10 ** 9), rng.randint(0, 10 ** 9), rng.randint(0, 2 ** 31))
+        w = SnapshotWriter(out, self.root, spill=10)
+        for rel, (size, alloc, mtime) in rows.items():
+            w.add(os.path.join(self.root, *rel.decode().split("/")), size, alloc, mtime)
+        self.assertGreater(len(w.runs), 0)
+        self.assertEqual(w.close(), len(rows))
+
+        reader = SnapshotReader(out)
+        got = [(k, s, a, m) for k, s, a, m in reader]
+        self.assertEqual(got, sorted((k,) + v for k, v in rows.items()))
+        self.assertEqual(reader.entries, len(rows))
+        self.assertEqual(reader.total, sum(a for _, a, _ in rows.values()))
+        # 分段临时文件都已删除
+        self.assertEqual(os.listdir(os.path.dirname(out)), ["a.snap"])
+
+    def test_default_names_unique_within_a_second(self):
+        a = snapshot_path(self.root, 1700000000.25, self.tmp)
+        b = snapshot_path(self.root, 1700000000.75, self.tmp)
+        self.assertNotEqual(a, b)
+        legacy = os.path.join(self.tmp, os.path.basename(a)[:-len("-250000.snap")] + ".snap")
+        for p in (b, a, legacy): open(p, "wb").close()
+        self.assertEqual(list_snapshots(self.root, self.tmp), [legacy, a, b])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from cleaner_core import ScanIndex
+from cleaner_watch import InotifyWatcher, LiveIndex
+
+
+def inotify_fds():
+    n = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            if os.readlink(os.path.join("/proc/self/fd", fd)) == "anon_inode:inotify": n += 1
+        except OSError: pass
+    return n
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify 只在 Linux 上有")
+class InotifyLifetimeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp, "Temp")
+        os.makedirs(self.root)
+        self.index = ScanIndex(os.path.join(self.tmp, "index.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_stopped_before_watch_leaks_no_fd(self):
+        before = inotify_fds()
+        for _ in range(5):
+            live = LiveIndex(self.index, lambda root, total: None)
+            live.start([self.root], should_stop=lambda: True)
+            live.stop()
+        self.assertEqual(inotify_fds(), before)
+
+    def test_fd_closed_after_watching(self):
+        before = inotify_fds()
+        changed = threading.Event()
+        watcher = InotifyWatcher(lambda root, dirs: changed.set(), debounce=0.05).watch([self.root])
+        # watch 在监视线程里才加上，等它加好再改文件
+        for _ in range(500):
+            if watcher.wds: break
+            time.sleep(0.01)
+        with open(os.path.join(self.root, "a.tmp"), "wb") as f: f.write(b"x")
+        self.assertTrue(changed.wait(5))
+        watcher.stop()
+        self.assertEqual(inotify_fds(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()